@@ -0,0 +1,87 @@
+"""Compares the per-row cost of converting accounts to and from DataFrames
+row by row (as ig_bot.data did before) with the column-wise paths.
+
+Usage: python -m benchmarks.account_conversion [ROWS ...]
+"""
+from dataclasses import fields
+from datetime import datetime
+import sys
+import time
+
+import pandas as pd
+
+from ig_bot.data import (
+    Account,
+    accounts_from_dataframe,
+    accounts_to_dataframe,
+    AccountTable,
+)
+
+
+def _rowwise_accounts_from_dataframe(data: pd.DataFrame):
+    for row in data.itertuples(index=False):
+        row_data = row._asdict()
+        if pd.isnull(row_data["date_scraped"]):
+            row_data["date_scraped"] = None
+        yield Account(**row_data)
+
+
+def _rowwise_accounts_to_dataframe(accounts):
+    data = {
+        field.name: [getattr(account, field.name) for account in accounts]
+        for field in fields(Account)
+    }
+    index = [account.identifier for account in accounts]
+    return pd.DataFrame(data, index)
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def _accounts(row_count: int):
+    scraped = datetime(2020, 10, 4)
+    return [
+        Account(identifier=str(i),
+                username=f'user{i}',
+                full_name=f'User {i}',
+                centrality=1 / (i + 1),
+                date_scraped=scraped if i % 3 == 0 else None)
+        for i in range(row_count)
+    ]
+
+
+def _report(name: str, seconds: float, row_count: int):
+    print(f'  {name}: {seconds:.3f}s ({seconds / row_count * 1e9:.0f} ns/row)')
+
+
+def benchmark(row_count: int):
+    accounts = _accounts(row_count)
+    print(f'{row_count} accounts')
+
+    data, seconds = _timed(_rowwise_accounts_to_dataframe, accounts)
+    _report('to DataFrame, row-wise', seconds, row_count)
+    _, seconds = _timed(accounts_to_dataframe, accounts)
+    _report('to DataFrame, column-wise', seconds, row_count)
+
+    table = AccountTable.from_accounts(accounts)
+    _, seconds = _timed(table.to_dataframe)
+    _report('to DataFrame, from AccountTable', seconds, row_count)
+    _, seconds = _timed(lambda: table.to_dataframe(copy=False))
+    _report('to DataFrame, from AccountTable without copying',
+            seconds,
+            row_count)
+
+    _, seconds = _timed(lambda: list(_rowwise_accounts_from_dataframe(data)))
+    _report('from DataFrame, row-wise', seconds, row_count)
+    _, seconds = _timed(lambda: list(accounts_from_dataframe(data)))
+    _report('from DataFrame, column-wise', seconds, row_count)
+    _, seconds = _timed(AccountTable.from_dataframe, data)
+    _report('from DataFrame, to AccountTable', seconds, row_count)
+
+
+if __name__ == '__main__':
+    for count in map(int, sys.argv[1:] or ['100000', '1000000']):
+        benchmark(count)
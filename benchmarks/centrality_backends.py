@@ -0,0 +1,82 @@
+"""Compares networkx, sparse and parallel centrality backends on random
+follow graphs. The parallel backend uses one process per CPU.
+
+Usage: python -m benchmarks.centrality_backends [NODES ...]
+"""
+import sys
+import time
+
+import networkx as nx
+
+from ig_bot import sparse
+from ig_bot.graph import (
+    centrality_function,
+    EIGENVECTOR_CENTRALITY,
+    IN_DEGREE_CENTRALITY,
+    KATZ_CENTRALITY,
+    NETWORKX_BACKEND,
+    PAGERANK_CENTRALITY,
+    PARALLEL_BACKEND,
+    SPARSE_BACKEND,
+)
+
+
+ALGORITHMS = (
+    IN_DEGREE_CENTRALITY,
+    EIGENVECTOR_CENTRALITY,
+    PAGERANK_CENTRALITY,
+    KATZ_CENTRALITY,
+)
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def _follow_graph(node_count: int) -> nx.DiGraph:
+    graph = nx.scale_free_graph(node_count, seed=1)
+    graph = nx.DiGraph(graph)
+    graph.remove_edges_from(nx.selfloop_edges(graph))
+    return nx.relabel_nodes(graph, {n: str(n) for n in graph})
+
+
+def benchmark(node_count: int):
+    graph = _follow_graph(node_count)
+    print(f'{node_count} nodes, {graph.number_of_edges()} edges')
+
+    adjacency_matrix, build_seconds = _timed(sparse.AdjacencyMatrix.from_graph,
+                                             graph)
+    print(f'  CSR build: {build_seconds:.3f}s')
+
+    for algorithm in ALGORITHMS:
+        try:
+            expected, networkx_seconds = _timed(
+                centrality_function(algorithm, NETWORKX_BACKEND), graph
+            )
+            result, sparse_seconds = _timed(
+                centrality_function(algorithm, SPARSE_BACKEND),
+                adjacency_matrix,
+            )
+            _, parallel_seconds = _timed(
+                centrality_function(algorithm, PARALLEL_BACKEND),
+                adjacency_matrix,
+            )
+        except nx.PowerIterationFailedConvergence:
+            print(f'  {algorithm}: did not converge')
+            continue
+
+        max_error = max(abs(result[n] - expected[n]) for n in expected)
+        print(
+            f'  {algorithm}: networkx {networkx_seconds:.3f}s, '
+            f'sparse {sparse_seconds:.3f}s '
+            f'({networkx_seconds / sparse_seconds:.1f}x), '
+            f'parallel {parallel_seconds:.3f}s, '
+            f'max abs error {max_error:.2e}'
+        )
+
+
+if __name__ == '__main__':
+    for count in map(int, sys.argv[1:] or ['10000', '100000']):
+        benchmark(count)
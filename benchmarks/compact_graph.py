@@ -0,0 +1,62 @@
+"""Compares the memory and time taken to build a follow graph as a
+``nx.DiGraph`` and as a ``CompactGraph``, one account's follows at a time as
+in a crawl.
+
+Usage: python -m benchmarks.compact_graph [EDGES ...]
+"""
+import sys
+import time
+import tracemalloc
+
+import networkx as nx
+import numpy as np
+
+from ig_bot.data import Account
+from ig_bot.graph import add_edges, add_nodes, CompactGraph
+
+FOLLOWS_PER_ACCOUNT = 200
+
+
+def _crawl(edge_count: int):
+    """Batches of (source, followed accounts)."""
+    account_count = max(edge_count // 20, FOLLOWS_PER_ACCOUNT)
+    accounts = [Account(str(i), f'user{i}', f'User {i}')
+                for i in range(account_count)]
+    random = np.random.default_rng(0)
+    for source in range(edge_count // FOLLOWS_PER_ACCOUNT):
+        followed = random.choice(account_count,
+                                 FOLLOWS_PER_ACCOUNT,
+                                 replace=False)
+        yield accounts[source], [accounts[i] for i in followed.tolist()]
+
+
+def _build(graph, crawl):
+    for source, followed in crawl:
+        add_nodes(graph, *followed)
+        add_edges(graph, source, followed)
+    if isinstance(graph, CompactGraph):
+        graph.compact()
+    return graph
+
+
+def benchmark(edge_count: int):
+    crawl = list(_crawl(edge_count))
+    print(f'{edge_count} edges')
+    for name, graph in (('nx.DiGraph', nx.DiGraph()),
+                        ('CompactGraph', CompactGraph())):
+        tracemalloc.start()
+        start = time.perf_counter()
+        graph = _build(graph, crawl)
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'  {name}: {seconds:.2f}s, {size / 2 ** 20:.0f} MiB '
+              f'({size / graph.number_of_edges():.0f} bytes/edge, '
+              f'peak {peak / 2 ** 20:.0f} MiB)')
+        del graph
+
+
+if __name__ == '__main__':
+    for count in map(int, sys.argv[1:] or ['100000', '1000000']):
+        benchmark(count)
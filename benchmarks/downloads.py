@@ -0,0 +1,62 @@
+"""Compares downloading images one at a time with bare ``requests.get``, as
+media scraping used to, with a ``DownloadEngine``, from a local server
+taking a fixed latency per request.
+
+Usage: python -m benchmarks.downloads [IMAGES] [LATENCY_SECONDS]
+"""
+import logging
+from os import path
+import sys
+import tempfile
+import time
+
+import requests
+
+from ig_bot.downloads import DownloadEngine
+from ig_bot.fakes import FileServer
+
+IMAGE_BYTES = 200 * 1024
+
+
+def _serial(server, names, directory):
+    for name in names:
+        response = requests.get(server.url(name))
+        with open(path.join(directory, name.lstrip('/')), 'wb') as file_obj:
+            file_obj.write(response.content)
+
+
+def _engine(workers, per_host):
+    def download(server, names, directory):
+        with DownloadEngine(logging.getLogger(__name__),
+                            workers=workers,
+                            per_host=per_host) as downloads:
+            futures = [
+                downloads.download(path.join(directory, name.lstrip('/')),
+                                   server.url(name))
+                for name in names
+            ]
+            for future in futures:
+                future.result()
+    return download
+
+
+def benchmark(image_count: int, latency: float):
+    files = {f'/{i}.jpg': bytes(IMAGE_BYTES) for i in range(image_count)}
+    print(f'{image_count} images of {IMAGE_BYTES // 1024} KiB, '
+          f'{latency * 1000:.0f}ms latency')
+    for name, download in (('requests.get', _serial),
+                           ('engine, 1 worker', _engine(1, 1)),
+                           ('engine, 4 workers', _engine(4, 4)),
+                           ('engine, 8 workers', _engine(8, 8))):
+        with FileServer(files, latency) as server, \
+                tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            download(server, list(files), directory)
+            seconds = time.perf_counter() - start
+            print(f'  {name}: {seconds:.2f}s, '
+                  f'{server.connections} connections')
+
+
+if __name__ == '__main__':
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+              float(sys.argv[2]) if len(sys.argv) > 2 else 0.02)
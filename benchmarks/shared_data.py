@@ -0,0 +1,56 @@
+"""Compares finding the shared data of saved post pages by parsing them with
+BeautifulSoup, as media scraping used to, with slicing it from the page's
+bytes, whole and as streamed in chunks.
+
+Usage: python -m benchmarks.shared_data [REPEATS]
+"""
+import glob
+import json
+from os import path
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from ig_bot.shared_data import scan_shared_data, shared_data_from_bytes
+
+POST_PAGES = path.join(path.dirname(__file__), '..', 'ig_bot', 'tests',
+                       'data', 'post_pages', '*.html')
+CHUNK_BYTES = 64 * 1024
+
+
+def _parsed(content: bytes):
+    html = BeautifulSoup(content.decode('utf-8'), features='html.parser')
+    for script in html.find_all('script'):
+        for line in script.contents:
+            if 'window._sharedData = ' in line:
+                return json.loads(line[20:-1])
+
+
+def _streamed(content: bytes):
+    chunks = (content[i:i + CHUNK_BYTES]
+              for i in range(0, len(content), CHUNK_BYTES))
+    data, _ = scan_shared_data(chunks)
+    return data
+
+
+def benchmark(repeats: int):
+    for filepath in sorted(glob.glob(POST_PAGES)):
+        with open(filepath, 'rb') as file_obj:
+            content = file_obj.read()
+        print(f'{path.basename(filepath)}, {len(content) // 1024} KiB')
+
+        expected = _parsed(content)
+        for name, extract in (('BeautifulSoup', _parsed),
+                              ('bytes', shared_data_from_bytes),
+                              ('streamed', _streamed)):
+            assert extract(content) == expected
+            start = time.perf_counter()
+            for _ in range(repeats):
+                extract(content)
+            milliseconds = (time.perf_counter() - start) / repeats * 1000
+            print(f'  {name}: {milliseconds:.3f}ms per page')
+
+
+if __name__ == '__main__':
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,100 @@
+"""Typed, columnar accounts files.
+
+An accounts file is an uncompressed NumPy ``.npz`` archive holding one array
+per ``Account`` field: centrality as float64 (NaN when unknown), date scraped
+as datetime64 (NaT when unscraped) and each string column as the UTF-8 bytes
+of its values joined by NUL characters, with a mask of missing values.
+Changes made after a file is written are kept in an ``AccountJournal``.
+"""
+import os
+from typing import List
+
+import numpy as np
+
+from ig_bot.data import AccountTable
+
+
+ACCOUNTS_FILE_EXTENSION = '.npz'
+VERSION = 1
+
+_SEPARATOR = '\0'
+_STRING_COLUMNS = ('identifier', 'username', 'full_name')
+
+
+class AccountsFormatError(Exception):
+    """File is not an accounts file this version can read."""
+
+
+def account_journal_path(filepath: str) -> str:
+    """Where changes to the accounts in a file are journalled."""
+    return f'{os.path.splitext(filepath)[0]}.journal.jsonl'
+
+
+def _encode_strings(values: np.ndarray) -> dict:
+    missing = np.array([value is None for value in values], dtype=bool)
+    strings = ['' if value is None else str(value) for value in values]
+    joined = _SEPARATOR.join(strings)
+    if joined.count(_SEPARATOR) != max(len(strings) - 1, 0):
+        raise ValueError('Account strings cannot contain NUL characters.')
+    return {
+        'data': np.frombuffer(joined.encode('utf-8'), dtype=np.uint8),
+        'missing': missing,
+    }
+
+
+def _decode_strings(data: np.ndarray, missing: np.ndarray) -> List[str]:
+    if not len(missing):
+        return []
+    strings = data.tobytes().decode('utf-8').split(_SEPARATOR)
+    for index in np.flatnonzero(missing):
+        strings[index] = None
+    return strings
+
+
+def write_accounts(table: AccountTable, filepath: str):
+    """Writes the table to a temporary file moved into place, so that an
+    interrupted write leaves any previous file intact."""
+    arrays = {
+        'version': np.array(VERSION),
+        'centrality': table.centralities,
+        'date_scraped': table.dates_scraped,
+    }
+    for name, values in zip(_STRING_COLUMNS,
+                            (table.identifiers,
+                             table.usernames,
+                             table.full_names)):
+        encoded = _encode_strings(values)
+        arrays[f'{name}_data'] = encoded['data']
+        arrays[f'{name}_missing'] = encoded['missing']
+
+    temporary_filepath = f'{filepath}.tmp'
+    with open(temporary_filepath, 'wb') as file_obj:
+        np.savez(file_obj, **arrays)
+        file_obj.flush()
+        os.fsync(file_obj.fileno())
+    os.replace(temporary_filepath, filepath)
+
+
+def read_accounts(filepath: str) -> AccountTable:
+    try:
+        with np.load(filepath, allow_pickle=False) as archive:
+            if int(archive['version']) != VERSION:
+                raise AccountsFormatError(
+                    f'Unsupported accounts file version {archive["version"]}.'
+                )
+            strings = {
+                name: _decode_strings(archive[f'{name}_data'],
+                                      archive[f'{name}_missing'])
+                for name in _STRING_COLUMNS
+            }
+            centralities = archive['centrality']
+            dates_scraped = archive['date_scraped']
+    except (KeyError, ValueError) as error:
+        raise AccountsFormatError(f'{filepath} is not an accounts file.') \
+            from error
+
+    return AccountTable.from_columns(strings['identifier'],
+                                     strings['username'],
+                                     strings['full_name'],
+                                     centralities,
+                                     dates_scraped)
@@ -0,0 +1,159 @@
+"""Asyncio counterparts of the functions in ``ig_bot.scraping``.
+
+Client methods may be coroutines (as on ``ig_bot.fakes.AsyncFakeClient``)
+or blocking calls (as on ``instagrapi.Client``), which are run in the event
+loop's default executor so that sleeping and waiting never block the loop.
+``scrape_following_graph --asyncio`` crawls with these, one task per client.
+"""
+import asyncio
+import functools
+import logging
+from random import random
+from typing import AsyncIterator, Iterator
+
+import instagrapi
+
+from ig_bot.data import Account, account_from_obj
+from ig_bot.scraping import (
+    FollowsPage,
+    limit_page,
+    RateLimitingRetries,
+)
+
+
+async def _call(method, *args, **kwargs):
+    if asyncio.iscoroutinefunction(method):
+        return await method(*args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, functools.partial(method, *args, **kwargs)
+    )
+
+
+async def get_authenticated_client(username: str, password: str):
+    """Gets an authenticated client instance without blocking the loop."""
+    client = instagrapi.Client()
+    await _call(client.login, username, password)
+    return client
+
+
+async def random_sleep(minimum: float,
+                       maximum: float,
+                       logger: logging.Logger):
+    duration = round(minimum + (random() * (maximum - minimum)), 2)
+    logger.info(f'Sleeping for {duration} seconds...')
+    await asyncio.sleep(duration)
+
+
+async def exponential_sleep(exponent: int,
+                            base: float,
+                            offset: float,
+                            logger: logging.Logger):
+    duration = (base ** exponent) + offset
+    duration_rounded = round(duration, 2)
+    logger.info(f'Sleeping for {duration_rounded} seconds...')
+    await asyncio.sleep(duration_rounded)
+
+
+def retry_on_rate_limiting(func):
+    """As ``ig_bot.scraping.retry_on_rate_limiting``, awaiting tokens and
+    sleeps."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, config, logger, rate_limiter=None, **kwargs):
+        retries = RateLimitingRetries(func.__name__, config, logger,
+                                      rate_limiter)
+        for attempt_number in retries.attempt_numbers:
+            if rate_limiter:
+                await rate_limiter.acquire_async(retries.endpoint, logger)
+            try:
+                result = await func(*args, config=config, logger=logger,
+                                    **kwargs)
+            except instagrapi.exceptions.ClientError as exception:
+                backoff = retries.failed(exception, attempt_number)
+                if backoff:
+                    await exponential_sleep(*backoff, logger)
+            else:
+                retries.succeeded()
+                return result
+
+        raise retries.exhausted()
+
+    return wrapper
+
+
+@retry_on_rate_limiting
+async def followed_accounts(
+        follower: Account,
+        client: instagrapi.Client,
+        config: dict,
+        logger: logging.Logger
+) -> Iterator[Account]:
+    results = await _call(client.user_following_gql,
+                          follower.identifier,
+                          amount=config['max_followed_scraped'])
+    return (account_from_obj(account) for account in results)
+
+
+@retry_on_rate_limiting
+async def followed_accounts_page(follower: Account,
+                                 client: instagrapi.Client,
+                                 config: dict,
+                                 logger: logging.Logger,
+                                 end_cursor: str = None) -> FollowsPage:
+    results, next_cursor = await _call(
+        client.user_following_gql_chunk,
+        follower.identifier,
+        max_amount=config['follows_page_size'],
+        end_cursor=end_cursor,
+    )
+    return FollowsPage([account_from_obj(account) for account in results],
+                       next_cursor or '')
+
+
+async def followed_account_pages(
+    follower: Account,
+    client: instagrapi.Client,
+    config: dict,
+    logger: logging.Logger,
+    end_cursor: str = None,
+    scraped: int = 0,
+    **kwargs
+) -> AsyncIterator[FollowsPage]:
+    """As ``ig_bot.scraping.followed_account_pages``, without the response
+    cache."""
+    remaining = config['max_followed_scraped'] - scraped
+
+    while remaining > 0:
+        page = await followed_accounts_page(follower,
+                                            client,
+                                            config=config,
+                                            logger=logger,
+                                            end_cursor=end_cursor,
+                                            **kwargs)
+        limited, remaining = limit_page(page, remaining, config)
+        yield limited
+        if not limited.end_cursor:
+            return
+        end_cursor = page.end_cursor
+
+
+@retry_on_rate_limiting
+async def account_by_id(identifier: str,
+                        client: instagrapi.Client,
+                        config: dict,
+                        logger: logging.Logger) -> Account:
+
+    return account_from_obj(await _call(client.user_info, identifier))
+
+
+@retry_on_rate_limiting
+async def account_by_username(username: str,
+                              client: instagrapi.Client,
+                              config: dict,
+                              logger: logging.Logger) -> Account:
+
+    return account_from_obj(
+        await _call(client.user_info_by_username, username)
+    )
@@ -0,0 +1,160 @@
+"""On-disk cache of scraped responses, so that re-crawls replay data already
+downloaded instead of requesting it again.
+
+Entries are JSON files named by the SHA-256 of their (endpoint, identifier,
+amount) key, expire after ``ttl_seconds`` and are evicted, least recently
+written first, once the cache exceeds ``max_bytes``. Expired entries are
+deleted when looked up. The size and write time of each entry are indexed
+in memory, in the order written, so neither lookups nor eviction stat the
+cache's files.
+"""
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Optional, Tuple, Union
+
+Payload = Union[dict, list]
+
+
+def cache_key(endpoint: str, identifier: str, amount: int = None) -> str:
+    key = json.dumps([endpoint, str(identifier), amount])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+
+    def __init__(self,
+                 directory: str,
+                 ttl_seconds: float = None,
+                 max_bytes: int = None,
+                 clock: Callable[[], float] = time.time):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+        # Size and modification time of each entry, oldest first
+        self._entries: 'OrderedDict[str, Tuple[int, float]]' = OrderedDict()
+        self._size = 0
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        for modified, filepath, size in sorted(entries):
+            self._entries[filepath] = (size, modified)
+            self._size += size
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def _path(self, endpoint: str, identifier: str, amount: int) -> str:
+        return os.path.join(
+            self.directory, f'{cache_key(endpoint, identifier, amount)}.json'
+        )
+
+    def _remove(self, filepath: str):
+        size, _ = self._entries.pop(filepath)
+        self._size -= size
+        try:
+            os.remove(filepath)
+        except OSError:
+            pass
+
+    def _fresh(self, filepath: str) -> bool:
+        """Whether the entry exists and is unexpired, deleting it if it has
+        expired."""
+        with self._lock:
+            entry = self._entries.get(filepath)
+            if entry is None:
+                return False
+            _, modified = entry
+            if (
+                self.ttl_seconds is not None
+                and self._clock() - modified > self.ttl_seconds
+            ):
+                self._remove(filepath)
+                return False
+            return True
+
+    def contains(self,
+                 endpoint: str,
+                 identifier: str,
+                 amount: int = None) -> bool:
+        """Whether an unexpired entry exists for the key."""
+        return self._fresh(self._path(endpoint, identifier, amount))
+
+    def get(self,
+            endpoint: str,
+            identifier: str,
+            amount: int = None) -> Optional[Payload]:
+        filepath = self._path(endpoint, identifier, amount)
+        payload = None
+        if self._fresh(filepath):
+            try:
+                with open(filepath, 'r', encoding='utf-8') as file_obj:
+                    payload = json.load(file_obj)
+            except (OSError, ValueError):
+                payload = None
+
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return payload
+
+    def put(self,
+            endpoint: str,
+            identifier: str,
+            payload: Payload,
+            amount: int = None):
+        filepath = self._path(endpoint, identifier, amount)
+        data = json.dumps(payload).encode('utf-8')
+        tmp_path = f'{filepath}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as file_obj:
+            file_obj.write(data)
+        now = self._clock()
+        os.utime(tmp_path, (now, now))
+        os.replace(tmp_path, filepath)
+
+        with self._lock:
+            previous = self._entries.pop(filepath, None)
+            if previous is not None:
+                self._size -= previous[0]
+            self._entries[filepath] = (len(data), now)
+            self._size += len(data)
+            self._evict()
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+
+        while self._size > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+
+
+def response_cache_from_config(config: dict,
+                               data_dir: str) -> Optional[ResponseCache]:
+    """The cache configured by the optional ``response_cache`` section, in
+    a directory relative to ``data_dir`` unless an absolute one is given."""
+    cache_config = config.get('response_cache')
+    if not cache_config:
+        return None
+
+    max_megabytes = cache_config.get('max_megabytes')
+    return ResponseCache(
+        os.path.join(data_dir, cache_config.get('directory', 'cache')),
+        ttl_seconds=cache_config.get('ttl_seconds'),
+        max_bytes=(
+            None if max_megabytes is None else int(max_megabytes * 1024 ** 2)
+        ),
+    )
@@ -0,0 +1,152 @@
+"""On-disk cache of centrality computed from a graph file, so that scripts
+ranking the accounts of an unchanged graph load the result rather than
+recomputing it.
+
+Entries are kept in a directory next to the graph, as ``.npz`` files of node
+keys and centrality values named by the graph's version and by the SHA-256
+of the algorithm name and parameters. Callers pass the backend computing the
+centrality as a parameter, since backends' results differ within their
+tolerances. The version is a digest of the graph file's content, rehashed
+only once its size, modification time or inode changes. Entries for any
+other version are evicted as soon as they are found, since the graph they
+were computed from no longer exists.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+VERSION_FILENAME = 'version.json'
+ENTRY_EXTENSION = '.npz'
+
+Centrality = Dict[str, float]
+
+
+def centrality_key(algorithm: str, **parameters) -> str:
+    key = json.dumps([algorithm, parameters], sort_keys=True)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def file_digest(filepath: str, chunk_size: int = 2 ** 20) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as file_obj:
+        for chunk in iter(lambda: file_obj.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CentralityCache:
+
+    def __init__(self, graph_path: str, directory: str = None):
+        self.graph_path = graph_path
+        self.directory = directory or f'{graph_path}.centrality'
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _stat(self) -> Optional[list]:
+        try:
+            stat = os.stat(self.graph_path)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+    def graph_version(self) -> Optional[str]:
+        """Digest of the graph file's content, or ``None`` if it doesn't
+        exist."""
+        stat = self._stat()
+        if stat is None:
+            return None
+
+        version_path = os.path.join(self.directory, VERSION_FILENAME)
+        try:
+            with open(version_path, 'r', encoding='utf-8') as file_obj:
+                version = json.load(file_obj)
+            if version['stat'] == stat:
+                return version['digest']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        digest = file_digest(self.graph_path)
+        # The file may have been replaced while it was being hashed
+        if self._stat() != stat:
+            return None
+
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f'{version_path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file_obj:
+            json.dump({'stat': stat, 'digest': digest}, file_obj)
+        os.replace(tmp_path, version_path)
+        self._evict(digest)
+        return digest
+
+    def _path(self, version: str, algorithm: str, parameters: dict) -> str:
+        key = centrality_key(algorithm, **parameters)
+        return os.path.join(self.directory,
+                            f'{version}-{key}{ENTRY_EXTENSION}')
+
+    def get(self, algorithm: str, **parameters) -> Optional[Centrality]:
+        """Centrality stored for the current graph, by algorithm and
+        parameters."""
+        version = self.graph_version()
+        centrality = None
+        if version is not None:
+            try:
+                with np.load(self._path(version, algorithm, parameters),
+                             allow_pickle=False) as entry:
+                    centrality = dict(zip(entry['nodes'].tolist(),
+                                          entry['values'].tolist()))
+            except (OSError, ValueError, KeyError):
+                centrality = None
+
+        with self._lock:
+            if centrality is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return centrality
+
+    def put(self, algorithm: str, centrality: Centrality, **parameters):
+        """Stores centrality computed from the current graph. Only string
+        node keys are stored, as written by the scraper; other graphs aren't
+        cached."""
+        version = self.graph_version()
+        if version is None or not all(isinstance(node, str)
+                                      for node in centrality):
+            return
+
+        filepath = self._path(version, algorithm, parameters)
+        tmp_path = f'{filepath}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as file_obj:
+            np.savez(file_obj,
+                     nodes=np.array(list(centrality), dtype=str),
+                     values=np.fromiter(centrality.values(),
+                                        dtype=np.float64,
+                                        count=len(centrality)))
+        os.replace(tmp_path, filepath)
+
+    def get_or_compute(self,
+                       algorithm: str,
+                       compute: Callable[[], Centrality],
+                       **parameters) -> Centrality:
+        """Stored centrality, or the result of ``compute``, which is then
+        stored."""
+        centrality = self.get(algorithm, **parameters)
+        if centrality is None:
+            centrality = compute()
+            self.put(algorithm, centrality, **parameters)
+        return centrality
+
+    def _evict(self, version: str):
+        for entry in os.scandir(self.directory):
+            if (
+                entry.name.endswith(ENTRY_EXTENSION)
+                and not entry.name.startswith(f'{version}-')
+            ):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
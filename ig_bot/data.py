@@ -1,7 +1,10 @@
 from dataclasses import dataclass, fields
 from datetime import datetime
-from typing import Generator, Iterable, List
+from operator import attrgetter
+import sys
+from typing import Dict, Generator, Iterable, List, Sequence, Union
 
+import numpy as np
 import pandas as pd
 
 
@@ -86,28 +89,327 @@ def account_details_from_obj(obj):
     )
 
 
+ACCOUNT_FIELD_NAMES = tuple(field.name for field in fields(Account))
+
+
 def accounts_from_dataframe(
     data: pd.DataFrame
 ) -> Generator[Account, None, None]:
-    for row in data.itertuples(index=False):
-        row_data = row._asdict()
+    columns = [data[name].tolist() for name in ACCOUNT_FIELD_NAMES[:-1]]
+    columns.append(_dates_to_objects(data['date_scraped']))
+    return (Account(*values) for values in zip(*columns))
 
-        # Dealing with Pandas NaT values
-        if pd.isnull(row_data["date_scraped"]):
-            row_data["date_scraped"] = None
 
-        yield (Account(**row_data))
+def _dates_to_objects(dates: pd.Series) -> list:
+    """Dates as ``datetime`` objects, with None for Pandas NaT values."""
+    if dates.dtype.kind != 'M' or dates.dt.tz is not None:
+        return dates.astype(object).where(dates.notnull(), None).tolist()
 
+    array = dates.to_numpy(dtype='datetime64[us]').astype(object)
+    array[dates.isnull().to_numpy()] = None
+    return array.tolist()
 
-def _getattr_from(name: str, objs: Iterable) -> Generator[object, None, None]:
-    for obj in objs:
-        yield getattr(obj, name)
 
+def accounts_to_dataframe(
+    accounts: Union[List[Account], 'AccountTable']
+) -> pd.DataFrame:
+    if isinstance(accounts, AccountTable):
+        return accounts.to_dataframe()
 
-def accounts_to_dataframe(accounts: List[Account]) -> pd.DataFrame:
     data = {
-        field.name: list(_getattr_from(field.name, accounts))
-        for field in fields(Account)
+        name: list(map(attrgetter(name), accounts))
+        for name in ACCOUNT_FIELD_NAMES
     }
-    index = [account.identifier for account in accounts]
-    return pd.DataFrame(data, index)
+    return pd.DataFrame(data, data['identifier'])
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _intern_all(values: Iterable) -> list:
+    values = list(values)
+    try:
+        return list(map(sys.intern, values))
+    except TypeError:
+        # Not all strings, e.g. missing names or integer identifiers
+        return [_intern(value) for value in values]
+
+
+def _to_float64(values: Sequence) -> np.ndarray:
+    array = np.asarray(values)
+    if array.dtype.kind in 'biuf':
+        return array.astype(float, copy=False)
+    # Empty strings are how missing values are read back from CSV
+    return pd.to_numeric(
+        pd.Series(array, dtype=object).replace('', np.nan)
+    ).to_numpy(dtype=float)
+
+
+def _to_datetime64(values: Sequence) -> np.ndarray:
+    array = np.asarray(values)
+    if array.dtype.kind == 'M':
+        return array.astype('datetime64[us]', copy=False)
+    # Empty strings are how missing dates are read back from CSV
+    timestamps = pd.to_datetime(
+        pd.Series([value if value != '' else None for value in values],
+                  dtype=object),
+        utc=True,
+    )
+    return timestamps.dt.tz_localize(None).to_numpy(dtype='datetime64[us]')
+
+
+class AccountRow:
+    """A view of one row of an ``AccountTable``."""
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table: 'AccountTable', row: int):
+        self._table = table
+        self._row = row
+
+    @property
+    def identifier(self):
+        return self._table._identifiers[self._row]
+
+    @property
+    def username(self) -> str:
+        return self._table._usernames[self._row]
+
+    @property
+    def full_name(self) -> str:
+        return self._table._full_names[self._row]
+
+    @property
+    def centrality(self) -> float:
+        centrality = self._table._centralities[self._row]
+        return None if np.isnan(centrality) else float(centrality)
+
+    @property
+    def date_scraped(self) -> datetime:
+        date_scraped = self._table._dates_scraped[self._row]
+        return None if np.isnat(date_scraped) else date_scraped.item()
+
+    def to_account(self) -> Account:
+        return Account(identifier=self.identifier,
+                       username=self.username,
+                       full_name=self.full_name,
+                       centrality=self.centrality,
+                       date_scraped=self.date_scraped)
+
+    def __repr__(self) -> str:
+        return f'AccountRow({self.to_account()!r})'
+
+
+class AccountTable:
+    """Accounts stored column-wise: strings interned in object arrays,
+    centrality as floats (NaN when unknown) and date scraped as
+    ``datetime64`` (NaT when unscraped). Rows are found by identifier in
+    constant time and never move, so their indices stay valid as the table
+    grows.
+    """
+
+    _INITIAL_CAPACITY = 16
+
+    def __init__(self, capacity: int = _INITIAL_CAPACITY):
+        capacity = max(capacity, 1)
+        self._size = 0
+        self._rows: Dict[object, int] = {}
+        self._identifiers = np.empty(capacity, dtype=object)
+        self._usernames = np.empty(capacity, dtype=object)
+        self._full_names = np.empty(capacity, dtype=object)
+        self._centralities = np.full(capacity, np.nan)
+        self._dates_scraped = np.full(capacity,
+                                      np.datetime64('NaT'),
+                                      dtype='datetime64[us]')
+
+    @classmethod
+    def from_accounts(cls, accounts: Iterable[Account]) -> 'AccountTable':
+        accounts = list(accounts)
+        table = cls(len(accounts))
+        table.extend(accounts)
+        return table
+
+    @classmethod
+    def from_dataframe(cls, data: pd.DataFrame) -> 'AccountTable':
+        return cls.from_columns(
+            identifiers=data['identifier'].tolist(),
+            usernames=data['username'].tolist(),
+            full_names=data['full_name'].tolist(),
+            centralities=data['centrality'].to_numpy(),
+            dates_scraped=data['date_scraped'].to_numpy(),
+        )
+
+    @classmethod
+    def from_columns(cls,
+                     identifiers: Sequence,
+                     usernames: Sequence[str],
+                     full_names: Sequence[str],
+                     centralities: Sequence[float],
+                     dates_scraped: Sequence) -> 'AccountTable':
+        """Builds a table from column values, skipping repeated
+        identifiers."""
+        table = cls(len(identifiers))
+        table._append_columns(identifiers,
+                              usernames,
+                              full_names,
+                              centralities,
+                              dates_scraped)
+        return table
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, identifier) -> bool:
+        return identifier in self._rows
+
+    def __getitem__(self, identifier) -> AccountRow:
+        return AccountRow(self, self._rows[identifier])
+
+    def __iter__(self) -> Iterable[AccountRow]:
+        return (AccountRow(self, row) for row in range(self._size))
+
+    def row(self, identifier) -> int:
+        return self._rows[identifier]
+
+    def rows(self, identifiers: Iterable) -> np.ndarray:
+        return np.fromiter((self._rows[identifier]
+                            for identifier in identifiers),
+                           dtype=np.intp)
+
+    @property
+    def identifiers(self) -> np.ndarray:
+        return self._identifiers[:self._size]
+
+    @property
+    def usernames(self) -> np.ndarray:
+        return self._usernames[:self._size]
+
+    @property
+    def full_names(self) -> np.ndarray:
+        return self._full_names[:self._size]
+
+    @property
+    def centralities(self) -> np.ndarray:
+        return self._centralities[:self._size]
+
+    @property
+    def dates_scraped(self) -> np.ndarray:
+        return self._dates_scraped[:self._size]
+
+    def account(self, identifier) -> Account:
+        return self[identifier].to_account()
+
+    def extend(self, accounts: Iterable[Account]) -> int:
+        """Appends accounts whose identifiers are not already present,
+        returning the number added."""
+        accounts = [
+            account for account in accounts if account.identifier not in self
+        ]
+        return self._append_columns(
+            [account.identifier for account in accounts],
+            [account.username for account in accounts],
+            [account.full_name for account in accounts],
+            [account.centrality for account in accounts],
+            [account.date_scraped for account in accounts],
+        )
+
+    def upsert(self, accounts: Iterable[Account]):
+        """Appends new accounts and overwrites the fields of existing ones."""
+        accounts = list(accounts)
+        existing = [
+            account for account in accounts if account.identifier in self
+        ]
+        if existing:
+            rows = self.rows(account.identifier for account in existing)
+            self._usernames[rows] = _intern_all(
+                account.username for account in existing
+            )
+            self._full_names[rows] = _intern_all(
+                account.full_name for account in existing
+            )
+            self._centralities[rows] = _to_float64(
+                [account.centrality for account in existing]
+            )
+            self._dates_scraped[rows] = _to_datetime64(
+                [account.date_scraped for account in existing]
+            )
+        self.extend(accounts)
+
+    def _append_columns(self,
+                        identifiers: Sequence,
+                        usernames: Sequence[str],
+                        full_names: Sequence[str],
+                        centralities: Sequence[float],
+                        dates_scraped: Sequence) -> int:
+        identifiers = _intern_all(identifiers)
+        rows = self._rows
+        new_rows = []
+        for index, identifier in enumerate(identifiers):
+            if identifier not in rows:
+                rows[identifier] = self._size + len(new_rows)
+                new_rows.append(index)
+        if not new_rows:
+            return 0
+
+        def select(values):
+            if len(new_rows) == len(identifiers):
+                return values
+            return [values[index] for index in new_rows]
+
+        self._reserve(self._size + len(new_rows))
+        start, end = self._size, self._size + len(new_rows)
+        self._identifiers[start:end] = select(identifiers)
+        self._usernames[start:end] = _intern_all(select(usernames))
+        self._full_names[start:end] = _intern_all(select(full_names))
+        self._centralities[start:end] = _to_float64(select(centralities))
+        self._dates_scraped[start:end] = _to_datetime64(select(dates_scraped))
+        self._size = end
+        return len(new_rows)
+
+    def _reserve(self, size: int):
+        capacity = len(self._identifiers)
+        if size <= capacity:
+            return
+
+        while capacity < size:
+            capacity *= 2
+        for name in ('_identifiers', '_usernames', '_full_names',
+                     '_centralities', '_dates_scraped'):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            if column.dtype == float:
+                grown[len(column):] = np.nan
+            elif column.dtype.kind == 'M':
+                grown[len(column):] = np.datetime64('NaT')
+            setattr(self, name, grown)
+
+    def set_centralities(self, identifiers: Iterable, centralities):
+        """Sets the centrality of each identified account."""
+        self._centralities[self.rows(identifiers)] = centralities
+
+    def set_dates_scraped(self, identifiers: Iterable, date_scraped):
+        """Sets the date scraped of each identified account."""
+        self._dates_scraped[self.rows(identifiers)] = np.datetime64(
+            date_scraped, 'us'
+        )
+
+    def to_accounts(self) -> List[Account]:
+        return [row.to_account() for row in self]
+
+    def to_dataframe(self, copy: bool = True) -> pd.DataFrame:
+        """The accounts as a DataFrame indexed by identifier, like
+        ``accounts_to_dataframe``. Without ``copy``, the DataFrame shares the
+        table's arrays, so later updates to the table show through it."""
+        return pd.DataFrame(
+            {
+                'identifier': self.identifiers,
+                'username': self.usernames,
+                'full_name': self.full_names,
+                'centrality': self.centralities,
+                'date_scraped': self.dates_scraped,
+            },
+            index=pd.Index(self.identifiers, copy=copy),
+            copy=copy,
+        )
@@ -0,0 +1,248 @@
+"""Concurrent file downloads over a pooled HTTP session.
+
+Requests share one ``requests.Session``, so connections to a host are kept
+alive and reused rather than opened, with a TLS handshake, per file. Files
+are downloaded on a pool of threads, with at most ``per_host`` requests to
+any one host in flight. Pacing, whether by a rate limiter or by sleeping
+after each download, then applies to each of a host's slots rather than to
+the whole run.
+
+Responses are streamed in chunks to a ``.part`` file beside the target,
+which is renamed into place only once its size, and hash if one is
+expected, are checked. A file at the target is not downloaded again if it
+has the expected size or, when none is given, the length a HEAD request
+reports, so that files truncated by earlier, unchecked downloads are
+replaced. An interrupted download resumes from the end of its ``.part``
+file with an HTTP Range request.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
+import logging
+import os
+from os import path
+from pathlib import Path
+import threading
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ig_bot.rate_limiting import CredentialRateLimiter
+
+CHUNK_BYTES = 64 * 1024
+PART_SUFFIX = '.part'
+
+
+class IncompleteDownload(Exception):
+    """Downloaded content is not the size or hash expected."""
+
+
+# Failures after which a download resumes from what was written
+_INTERRUPTIONS = (
+    IncompleteDownload,
+    requests.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+def pooled_session(connections: int) -> requests.Session:
+    """A session keeping up to ``connections`` connections alive per
+    host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=connections,
+                          pool_maxsize=connections)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class DownloadEngine:
+    """Saves the content at URLs to files on a pool of worker threads.
+
+    With a rate limiter, each request first acquires a token for
+    ``endpoint``. Otherwise ``pace``, if given, is called after each
+    download while its host slot is still held. Interrupted downloads are
+    resumed up to ``resume_attempts`` times before failing. Call ``close``,
+    or use as a context manager, to wait for downloads and stop the workers.
+    """
+
+    def __init__(self,
+                 logger: logging.Logger,
+                 workers: int = 4,
+                 per_host: int = 2,
+                 rate_limiter: CredentialRateLimiter = None,
+                 endpoint: str = 'image',
+                 pace: Callable[[], None] = None,
+                 resume_attempts: int = 2,
+                 session: requests.Session = None):
+        self.logger = logger
+        self.per_host = per_host
+        self.rate_limiter = rate_limiter
+        self.endpoint = endpoint
+        self.pace = pace
+        self.resume_attempts = resume_attempts
+        self.session = session or pooled_session(workers)
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._hosts: Dict[str, threading.BoundedSemaphore] = {}
+        self._hosts_lock = threading.Lock()
+
+    def _host_slots(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._hosts_lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+            return self._hosts[host]
+
+    def download(self,
+                 filepath: str,
+                 url: str,
+                 headers: Optional[dict] = None,
+                 size: int = None,
+                 sha256: str = None) -> 'Future[str]':
+        """Schedules a download, returning a future of the file's path.
+        ``size`` and ``sha256``, if known, are checked as well as the
+        response's length. An existing file of another size than ``size``,
+        or if it isn't known of the length the server reports, is
+        replaced."""
+        return self._executor.submit(
+            self._download, filepath, url, headers, size, sha256
+        )
+
+    def _download(self,
+                  filepath: str,
+                  url: str,
+                  headers: Optional[dict],
+                  size: Optional[int],
+                  sha256: Optional[str]) -> str:
+        if path.exists(filepath) and path.getsize(filepath) == size:
+            self.logger.debug(f'Skipping {url}, already saved to {filepath}')
+            return filepath
+
+        with self._host_slots(url):
+            if path.exists(filepath) and size is None:
+                size = self._remote_size(url, headers)
+                if size is None or path.getsize(filepath) == size:
+                    self.logger.debug(
+                        f'Skipping {url}, already saved to {filepath}'
+                    )
+                    return filepath
+                self.logger.info(f'Replacing {filepath}, which has '
+                                 f'{path.getsize(filepath)} bytes, not {size}')
+
+            if self.rate_limiter:
+                self.rate_limiter.acquire(self.endpoint, self.logger)
+
+            Path(path.dirname(filepath)).mkdir(parents=True, exist_ok=True)
+            part_path = f'{filepath}{PART_SUFFIX}'
+            for attempt in range(self.resume_attempts + 1):
+                try:
+                    total = self._stream(part_path, url, dict(headers or {}))
+                    _check(part_path, size if total is None else total, sha256)
+                    break
+                except _INTERRUPTIONS:
+                    if attempt == self.resume_attempts:
+                        raise
+                    self.logger.warning(f'Download of {url} interrupted. '
+                                        f'Resuming...')
+            os.replace(part_path, filepath)
+            self.logger.debug(f'Saved {url} to {filepath}')
+
+            if not self.rate_limiter and self.pace:
+                self.pace()
+        return filepath
+
+    def _remote_size(self,
+                     url: str,
+                     headers: Optional[dict]) -> Optional[int]:
+        """The length of the content at the URL, as reported by a HEAD
+        request, if it is reported and not that of an encoding."""
+        if self.rate_limiter:
+            self.rate_limiter.acquire(self.endpoint, self.logger)
+        response = self.session.head(url,
+                                     headers=headers,
+                                     allow_redirects=True)
+        response.raise_for_status()
+        return _content_length(response)
+
+    def _stream(self,
+                part_path: str,
+                url: str,
+                headers: dict) -> Optional[int]:
+        """Writes the response to the part file, resuming from its end if
+        the server supports ranges, and returns the full size, if given."""
+        offset = path.getsize(part_path) if path.exists(part_path) else 0
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+
+        with self.session.get(url, headers=headers, stream=True) as response:
+            if response.status_code == 416 and headers.pop('Range', None):
+                # The part file is no prefix of the content; start again,
+                # without a range, so at most once
+                os.remove(part_path)
+                return self._stream(part_path, url, headers)
+            response.raise_for_status()
+
+            resumed = response.status_code == 206
+            if resumed:
+                # Content-Range: bytes <first>-<last>/<total or *>
+                first, total = _content_range(response)
+                if first != offset:
+                    raise IncompleteDownload(
+                        f'{url} resumed at byte {first}, not {offset}.'
+                    )
+            else:
+                if offset:
+                    self.logger.debug(f'Restarting download of {url}')
+                total = _content_length(response)
+
+            mode = 'ab' if resumed else 'wb'
+            with open(part_path, mode) as file_handle:
+                for chunk in response.iter_content(CHUNK_BYTES):
+                    file_handle.write(chunk)
+        return total
+
+    def close(self):
+        self._executor.shutdown()
+        self.session.close()
+
+    def __enter__(self) -> 'DownloadEngine':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _content_range(response: requests.Response) -> Tuple[int, Optional[int]]:
+    unit_range, _, total = response.headers['Content-Range'].partition('/')
+    first = unit_range.split()[-1].split('-')[0]
+    return int(first), None if total == '*' else int(total)
+
+
+def _content_length(response: requests.Response) -> Optional[int]:
+    length = response.headers.get('Content-Length')
+    # The length of encoded content isn't the length written
+    encoded = response.headers.get('Content-Encoding',
+                                   'identity') != 'identity'
+    return None if length is None or encoded else int(length)
+
+
+def _check(part_path: str, size: Optional[int], sha256: Optional[str]):
+    """Removes and raises for a part file of the wrong size or hash. A part
+    file short of the size is kept to be resumed."""
+    part_size = path.getsize(part_path)
+    if size is not None and part_size != size:
+        if part_size > size:
+            os.remove(part_path)
+        raise IncompleteDownload(
+            f'{part_path} has {part_size} bytes, not {size}.'
+        )
+
+    if sha256 is not None:
+        digest = hashlib.sha256()
+        with open(part_path, 'rb') as file_handle:
+            for chunk in iter(lambda: file_handle.read(CHUNK_BYTES), b''):
+                digest.update(chunk)
+        if digest.hexdigest() != sha256:
+            os.remove(part_path)
+            raise IncompleteDownload(f'{part_path} has the wrong SHA-256.')
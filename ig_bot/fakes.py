@@ -0,0 +1,231 @@
+"""In-process stand-ins for ``instagrapi.Client`` serving a fixed follow
+graph, and for web servers serving fixed files, for exercising scraping code
+without the network."""
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import socket
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from instagrapi.exceptions import ClientError
+from instagrapi.types import UserShort
+
+from ig_bot.data import Account
+
+
+class FakeClient:
+    """Serves accounts and their follows like ``instagrapi.Client``.
+
+    ``failures`` is the number of calls that raise a rate-limiting
+    ``ClientError`` before calls start succeeding.
+    """
+
+    def __init__(self,
+                 accounts: Iterable[Account],
+                 following: Dict[str, List[str]] = None,
+                 failures: int = 0):
+        self.users = {
+            account.identifier: UserShort(pk=account.identifier,
+                                          username=account.username,
+                                          full_name=account.full_name)
+            for account in accounts
+        }
+        self.following = following or {}
+        self.failures = failures
+        self.calls = []
+
+    def _record(self, name: str, *args):
+        self.calls.append((name, *args))
+        if self.failures:
+            self.failures -= 1
+            raise ClientError('429 Client Error: Too Many Requests')
+
+    def _user(self, identifier: str) -> UserShort:
+        try:
+            return self.users[identifier]
+        except KeyError:
+            raise ClientError(f'404 Client Error: Not Found for {identifier}')
+
+    def login(self, username: str, password: str) -> bool:
+        self._record('login', username)
+        return True
+
+    def user_info(self, user_id: str) -> UserShort:
+        self._record('user_info', user_id)
+        return self._user(user_id)
+
+    def user_info_by_username(self, username: str) -> UserShort:
+        self._record('user_info_by_username', username)
+        for user in self.users.values():
+            if user.username == username:
+                return user
+        raise ClientError(f'404 Client Error: Not Found for {username}')
+
+    def user_following_gql(self,
+                           user_id: str,
+                           amount: int = 0) -> List[UserShort]:
+        self._record('user_following_gql', user_id, amount)
+        followed = [
+            self._user(identifier)
+            for identifier in self.following.get(self._user(user_id).pk, [])
+        ]
+        return followed[:amount] if amount else followed
+
+    def user_following_gql_chunk(
+        self, user_id: str, max_amount: int = 0, end_cursor: str = None
+    ) -> Tuple[List[UserShort], str]:
+        """Pages of ``max_amount`` follows, with the offset of the next page
+        as the cursor and an empty cursor after the last page."""
+        self._record('user_following_gql_chunk', user_id, max_amount, end_cursor)
+        followed = self.following.get(self._user(user_id).pk, [])
+        start = int(end_cursor or 0)
+        end = start + max_amount if max_amount else len(followed)
+        page = [self._user(identifier) for identifier in followed[start:end]]
+        return page, str(end) if end < len(followed) else ''
+
+
+class AsyncFakeClient(FakeClient):
+    """``FakeClient`` whose methods are coroutines taking ``latency`` seconds,
+    to simulate waiting on the network."""
+
+    def __init__(self, *args, latency: float = 0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latency = latency
+
+    async def login(self, username: str, password: str) -> bool:
+        await asyncio.sleep(self.latency)
+        return super().login(username, password)
+
+    async def user_info(self, user_id: str) -> UserShort:
+        await asyncio.sleep(self.latency)
+        return super().user_info(user_id)
+
+    async def user_info_by_username(self, username: str) -> UserShort:
+        await asyncio.sleep(self.latency)
+        return super().user_info_by_username(username)
+
+    async def user_following_gql(self,
+                                 user_id: str,
+                                 amount: int = 0) -> List[UserShort]:
+        await asyncio.sleep(self.latency)
+        return super().user_following_gql(user_id, amount)
+
+    async def user_following_gql_chunk(
+        self, user_id: str, max_amount: int = 0, end_cursor: str = None
+    ) -> Tuple[List[UserShort], str]:
+        await asyncio.sleep(self.latency)
+        return super().user_following_gql_chunk(user_id, max_amount, end_cursor)
+
+
+class FileServer:
+    """Serves fixed content over HTTP/1.1 on a local port, in a background
+    thread, taking ``latency`` seconds per request. Single byte ranges are
+    served to requests for them, and the first ``interruptions`` responses
+    are cut off halfway. HEAD requests are answered with the headers alone.
+
+    Counts the requests and connections made to it, and the most requests
+    in flight at once, and records the method and headers of each request. Use as a
+    context manager to start and stop it.
+    """
+
+    def __init__(self,
+                 files: Dict[str, bytes],
+                 latency: float = 0,
+                 interruptions: int = 0):
+        self.files = files
+        self.latency = latency
+        self.interruptions = interruptions
+        self.headers = []
+        self.methods = []
+        self.requests = 0
+        self.connections = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        kwargs={'poll_interval': 0.01},
+                                        daemon=True)
+
+    def url(self, filepath: str) -> str:
+        host, port = self._server.server_address
+        return f'http://{host}:{port}{filepath}'
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                    server.methods.append(self.command)
+                    server.headers.append(dict(self.headers))
+                    server._in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight,
+                                               server._in_flight)
+                try:
+                    time.sleep(server.latency)
+                    self._respond()
+                finally:
+                    with server._lock:
+                        server._in_flight -= 1
+
+            def _respond(self):
+                content = server.files.get(self.path)
+                if content is None:
+                    self.send_error(404)
+                    return
+
+                size = len(content)
+                first = 0
+                byte_range = self.headers.get('Range')
+                if byte_range:
+                    first = int(byte_range[len('bytes='):].split('-')[0])
+                    if first >= size:
+                        self.send_error(416)
+                        return
+                    self.send_response(206)
+                    self.send_header('Content-Range',
+                                     f'bytes {first}-{size - 1}/{size}')
+                else:
+                    self.send_response(200)
+                body = content[first:]
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if self.command == 'HEAD':
+                    return
+
+                with server._lock:
+                    interrupted = server.interruptions > 0
+                    server.interruptions -= interrupted
+                if interrupted:
+                    self.wfile.write(body[:len(body) // 2])
+                    self.wfile.flush()
+                    self.close_connection = True
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                    return
+                self.wfile.write(body)
+
+            do_HEAD = do_GET
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> 'FileServer':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
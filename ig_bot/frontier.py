@@ -0,0 +1,263 @@
+from bisect import bisect_left, insort
+from datetime import datetime
+from itertools import count
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ig_bot.data import Account, AccountTable
+
+
+class Frontier:
+    """Accounts tracked by a crawl, ordered by centrality.
+
+    Unscraped accounts sit in an indexed max-heap so that the top scraping
+    candidate is found in constant time and a change of centrality or a
+    scrape costs O(log n). Centralities of scraped accounts are kept sorted
+    so the candidate's rank among all tracked accounts can be found by
+    bisection. Ties are broken by the order accounts were added.
+
+    Concurrent scrapers ``claim`` candidates, which leave the heap but still
+    count towards ranks, until they are marked scraped or released. Claimed
+    accounts that cannot be scraped are ``set_aside`` for the rest of the
+    crawl, and likewise still count towards ranks.
+
+    The centralities of all nodes of the crawl's graph, tracked or not, are
+    kept sorted too, updated only for the nodes whose centrality changed, so
+    that ``newly_relevant`` finds untracked nodes ranking among the most
+    central without scanning the graph.
+
+    The accounts themselves are held in an ``AccountTable``.
+    """
+
+    # Fraction of ranked nodes changing at once beyond which they are
+    # re-sorted together rather than moved one by one
+    RESORT_FRACTION = 0.25
+
+    def __init__(self, accounts: Iterable[Account] = ()):
+        self._accounts = AccountTable()
+        self._keys: Dict[str, Tuple[float, int]] = {}
+        self._heap: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._scraped_keys: List[Tuple[float, int]] = []
+        self._claimed: Set[str] = set()
+        self._set_aside: Set[str] = set()
+        self._changed: Set[str] = set()
+        self._sequence = count()
+        self._rank_keys: Dict[str, Tuple[float, int]] = {}
+        self._ranked: List[Tuple[float, int, str]] = []
+        self._rank_sequence = count()
+        self.add(*accounts)
+        self._changed.clear()
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    def __contains__(self, identifier: str) -> bool:
+        return identifier in self._accounts
+
+    def __getitem__(self, identifier: str) -> Account:
+        return self._accounts.account(identifier)
+
+    @property
+    def table(self) -> AccountTable:
+        return self._accounts
+
+    @property
+    def claimed(self) -> int:
+        """Number of claimed accounts not yet scraped or released."""
+        return len(self._claimed)
+
+    def _scraped(self, row: int) -> bool:
+        return not np.isnat(self._accounts.dates_scraped[row])
+
+    def _out_of_heap(self, identifier: str) -> bool:
+        return (
+            self._scraped(self._accounts.row(identifier))
+            or identifier in self._claimed
+            or identifier in self._set_aside
+        )
+
+    def add(self, *accounts: Account):
+        """Tracks accounts not already in the frontier."""
+        first_row = len(self._accounts)
+        self._accounts.extend(accounts)
+        table = self._accounts
+        for row in range(first_row, len(table)):
+            identifier = table.identifiers[row]
+            centrality = table.centralities[row]
+            key = (_negated(centrality), next(self._sequence))
+            self._keys[identifier] = key
+            self._changed.add(identifier)
+            if self._scraped(row):
+                insort(self._scraped_keys, key)
+            else:
+                self._heap_push(identifier)
+
+    def update_centrality(self, centrality: Dict[str, float]):
+        """Sets the centrality of the graph's nodes present in
+        ``centrality``, tracked or not. Every entry is looked up, so callers
+        pass only the centralities that changed, such as those from
+        ``IncrementalCentrality.updated``."""
+        self._rank(centrality)
+
+        table = self._accounts
+        changed = [
+            identifier for identifier, value in centrality.items()
+            if identifier in table
+            and value != table.centralities[table.row(identifier)]
+        ]
+        table.set_centralities(
+            changed, [centrality[identifier] for identifier in changed]
+        )
+
+        self._changed.update(changed)
+
+        for identifier in changed:
+            old_key = self._keys[identifier]
+            new_key = (-centrality[identifier], old_key[1])
+            self._keys[identifier] = new_key
+
+            if self._out_of_heap(identifier):
+                del self._scraped_keys[bisect_left(self._scraped_keys,
+                                                   old_key)]
+                insort(self._scraped_keys, new_key)
+            elif new_key < old_key:
+                self._sift_up(self._positions[identifier])
+            else:
+                self._sift_down(self._positions[identifier])
+
+    def newly_relevant(self, poorest_rank: int) -> List[Tuple[str, float]]:
+        """Identifiers and centralities of untracked nodes ranking no lower
+        than ``poorest_rank`` among all nodes of the graph."""
+        return [
+            (identifier, -negated)
+            for negated, _, identifier in self._ranked[:poorest_rank]
+            if identifier not in self._accounts
+        ]
+
+    def _rank(self, centrality: Dict[str, float]):
+        resort = len(centrality) > len(self._ranked) * self.RESORT_FRACTION
+        rank_keys, ranked = self._rank_keys, self._ranked
+        for identifier, value in centrality.items():
+            old_key = rank_keys.get(identifier)
+            sequence = (next(self._rank_sequence) if old_key is None
+                        else old_key[1])
+            key = (_negated(value), sequence)
+            if key == old_key:
+                continue
+            rank_keys[identifier] = key
+            if resort:
+                continue
+            if old_key is not None:
+                del ranked[bisect_left(ranked, (*old_key, identifier))]
+            insort(ranked, (*key, identifier))
+
+        if resort:
+            self._ranked = sorted(
+                (*key, identifier) for identifier, key in rank_keys.items()
+            )
+
+    def mark_scraped(self, identifier: str, date_scraped: datetime = None):
+        if not self._out_of_heap(identifier):
+            self._heap_remove(identifier)
+            insort(self._scraped_keys, self._keys[identifier])
+        self._claimed.discard(identifier)
+        self._changed.add(identifier)
+        self._accounts.set_dates_scraped([identifier],
+                                         date_scraped or datetime.utcnow())
+
+    def pop_changed(self) -> List[str]:
+        """Identifiers of accounts added or changed since the frontier was
+        created or this was last called."""
+        changed = list(self._changed)
+        self._changed.clear()
+        return changed
+
+    def top_candidate(self, poorest_rank: int) -> Optional[Account]:
+        """The most central unscraped account, if it ranks no lower than
+        ``poorest_rank`` among all tracked accounts."""
+        if not self._heap:
+            return None
+
+        identifier = self._heap[0]
+        scraped_above = bisect_left(self._scraped_keys, self._keys[identifier])
+        if scraped_above + 1 > poorest_rank:
+            return None
+        return self[identifier]
+
+    def claim(self, poorest_rank: int) -> Optional[Account]:
+        """Takes the top candidate so that no one else is offered it."""
+        account = self.top_candidate(poorest_rank)
+        if account:
+            self._heap_remove(account.identifier)
+            insort(self._scraped_keys, self._keys[account.identifier])
+            self._claimed.add(account.identifier)
+        return account
+
+    def release(self, identifier: str):
+        """Returns a claimed account that was not scraped to the heap."""
+        self._claimed.remove(identifier)
+        key = self._keys[identifier]
+        del self._scraped_keys[bisect_left(self._scraped_keys, key)]
+        self._heap_push(identifier)
+
+    def set_aside(self, identifier: str):
+        """Gives up on a claimed account, which is neither offered again nor
+        marked scraped."""
+        self._claimed.remove(identifier)
+        self._set_aside.add(identifier)
+
+    def accounts(self) -> List[Account]:
+        """All tracked accounts in descending order of centrality."""
+        return [
+            self[identifier]
+            for identifier in sorted(self._keys, key=self._keys.__getitem__)
+        ]
+
+    def _heap_push(self, identifier: str):
+        self._heap.append(identifier)
+        self._positions[identifier] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def _heap_remove(self, identifier: str):
+        position = self._positions.pop(identifier)
+        last = self._heap.pop()
+        if position < len(self._heap):
+            self._heap[position] = last
+            self._positions[last] = position
+            self._sift_up(position)
+            self._sift_down(self._positions[last])
+
+    def _swap(self, i: int, j: int):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._positions[heap[i]] = i
+        self._positions[heap[j]] = j
+
+    def _sift_up(self, position: int):
+        keys, heap = self._keys, self._heap
+        while position > 0:
+            parent = (position - 1) // 2
+            if keys[heap[position]] >= keys[heap[parent]]:
+                break
+            self._swap(position, parent)
+            position = parent
+
+    def _sift_down(self, position: int):
+        keys, heap = self._keys, self._heap
+        while True:
+            smallest = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(heap) and keys[heap[child]] < keys[heap[smallest]]:
+                    smallest = child
+            if smallest == position:
+                return
+            self._swap(position, smallest)
+            position = smallest
+
+
+def _negated(centrality: float) -> float:
+    """Centrality negated so that the natural ordering puts high centrality
+    first, with no centrality ranking as zero."""
+    return 0.0 if np.isnan(centrality) else -float(centrality)
@@ -0,0 +1,237 @@
+"""Streaming reader for GML graph files.
+
+``nx.read_gml`` parses a whole file into memory before a graph is built from
+it. ``iter_gml`` instead tokenizes a file line by line and yields each graph
+attribute, node and edge as soon as it has been read, so a graph can be
+filtered, converted or exported while the file is still being read, keeping
+in memory only the ids of nodes already seen.
+
+Nodes are keyed by their label, as by ``nx.read_gml``, or by their id if
+unlabelled. Strings may not span lines, which holds for files written by
+``nx.write_gml``, and nodes must precede the edges between them.
+"""
+import html
+import re
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import networkx as nx
+
+
+# Leading whitespace is consumed with each token, and any other character
+# that starts no token is matched as an error.
+_TOKEN = re.compile(r'''
+    \s*(?:
+    (?P<key>[A-Za-z][0-9A-Za-z_]*)\b
+  | (?P<real>[+-]?(?:[0-9]*\.[0-9]+|[0-9]+\.[0-9]*|INF)(?:[Ee][+-]?[0-9]+)?)
+  | (?P<int>[+-]?[0-9]+)
+  | (?P<string>".*?")
+  | (?P<open>\[)
+  | (?P<close>\])
+  | (?P<skip>\#.*)
+  | (?P<error>\S)
+    )
+''', re.VERBOSE)
+
+_SPECIAL_REALS = ('NAN', 'INF')
+
+Token = Tuple[str, str, int]
+NodeFilter = Callable[[Any, dict], bool]
+
+
+class GmlFormatError(Exception):
+    """File is not GML this reader can stream."""
+
+
+class GraphAttribute(NamedTuple):
+    key: str
+    value: Any
+
+
+class GmlNode(NamedTuple):
+    key: Any
+    attributes: dict
+
+
+class GmlEdge(NamedTuple):
+    source: Any
+    target: Any
+    attributes: dict
+
+
+GmlItem = Union[GraphAttribute, GmlNode, GmlEdge]
+
+
+def _tokens(lines: Iterable[str]) -> Iterator[Token]:
+    for line_number, line in enumerate(lines, 1):
+        for match in _TOKEN.finditer(line):
+            kind = match.lastgroup
+            if kind == 'skip':
+                continue
+            if kind == 'error':
+                raise GmlFormatError(
+                    f'Unexpected {match.group(kind)!r} on line {line_number}.'
+                )
+            yield kind, match.group(kind), line_number
+
+
+def _next_token(tokens: Iterator[Token]) -> Token:
+    token = next(tokens, None)
+    if token is None:
+        raise GmlFormatError('Unexpected end of file.')
+    return token
+
+
+def _value(token: Token, tokens: Iterator[Token]) -> Any:
+    kind, text, line_number = token
+    if kind == 'string':
+        text = text[1:-1]
+        return html.unescape(text) if '&' in text else text
+    if kind == 'int':
+        return int(text)
+    if kind == 'real' or (kind == 'key' and text in _SPECIAL_REALS):
+        return float(text)
+    if kind == 'open':
+        return _block(tokens)
+    raise GmlFormatError(f'Expected a value on line {line_number}.')
+
+
+def _add(block: dict, key: str, value: Any):
+    """Repeated keys collect their values in a list, as in ``nx.read_gml``."""
+    if key not in block:
+        block[key] = value
+    elif isinstance(block[key], list):
+        block[key].append(value)
+    else:
+        block[key] = [block[key], value]
+
+
+def _block(tokens: Iterator[Token]) -> dict:
+    """Reads key-value pairs up to the bracket closing the current block."""
+    block = {}
+    for kind, text, line_number in tokens:
+        if kind == 'close':
+            return block
+        if kind != 'key':
+            raise GmlFormatError(f'Expected a key on line {line_number}.')
+        _add(block, text, _value(_next_token(tokens), tokens))
+    raise GmlFormatError('Unexpected end of file.')
+
+
+def _pop(block: dict, key: str, kind: str) -> Any:
+    try:
+        return block.pop(key)
+    except KeyError:
+        raise GmlFormatError(f'{kind} without {key}: {block}') from None
+
+
+def iter_gml(filepath: str,
+             nodes: Collection = None,
+             node_filter: NodeFilter = None,
+             node_attributes: Collection[str] = None) -> Iterator[GmlItem]:
+    """Yields the graph attributes, nodes and edges of a GML file in the
+    order they appear.
+
+    Only nodes whose keys are in ``nodes`` and for which
+    ``node_filter(key, attributes)`` is true are yielded, and only edges
+    between such nodes. ``node_attributes`` limits the attributes yielded
+    with nodes, and is applied after ``node_filter``.
+    """
+    with open(filepath, 'r', encoding='utf-8') as file_obj:
+        tokens = _tokens(file_obj)
+        kind, text, line_number = _next_token(tokens)
+        if (kind, text) != ('key', 'graph') \
+                or _next_token(tokens)[0] != 'open':
+            raise GmlFormatError(f'Expected "graph [" on line {line_number}.')
+
+        keys_by_id: Dict[Any, Any] = {}
+        omitted_ids = set()
+        for kind, text, line_number in tokens:
+            if kind == 'close':
+                return
+            if kind != 'key':
+                raise GmlFormatError(f'Expected a key on line {line_number}.')
+
+            token = _next_token(tokens)
+            if text not in ('node', 'edge') or token[0] != 'open':
+                yield GraphAttribute(text, _value(token, tokens))
+                continue
+
+            block = _block(tokens)
+            if text == 'node':
+                identifier = _pop(block, 'id', 'Node')
+                if identifier in keys_by_id or identifier in omitted_ids:
+                    raise GmlFormatError(f'Node id {identifier} is repeated.')
+                key = block.pop('label', identifier)
+                if (
+                    (nodes is None or key in nodes)
+                    and (node_filter is None or node_filter(key, block))
+                ):
+                    keys_by_id[identifier] = key
+                    if node_attributes is not None:
+                        block = {name: value for name, value in block.items()
+                                 if name in node_attributes}
+                    yield GmlNode(key, block)
+                else:
+                    omitted_ids.add(identifier)
+                continue
+
+            endpoints = (_pop(block, 'source', 'Edge'),
+                         _pop(block, 'target', 'Edge'))
+            for identifier in endpoints:
+                if identifier not in keys_by_id \
+                        and identifier not in omitted_ids:
+                    raise GmlFormatError(
+                        f'Edge on line {line_number} precedes node '
+                        f'{identifier}.'
+                    )
+            source, target = endpoints
+            if source in keys_by_id and target in keys_by_id:
+                yield GmlEdge(keys_by_id[source], keys_by_id[target], block)
+
+        raise GmlFormatError('Unexpected end of file.')
+
+
+def read_gml(filepath: str,
+             nodes: Collection = None,
+             node_filter: NodeFilter = None,
+             node_attributes: Collection[str] = None) -> nx.Graph:
+    """Builds a graph from a GML file as it is streamed, filtered as by
+    ``iter_gml``. Equivalent to ``nx.read_gml`` when unfiltered, except
+    that multigraphs are not supported."""
+    graph: Optional[nx.Graph] = None
+    graph_attributes = {}
+    for item in iter_gml(filepath, nodes, node_filter, node_attributes):
+        if isinstance(item, GraphAttribute):
+            _add(graph_attributes, item.key, item.value)
+            if item.key == 'multigraph' and item.value:
+                raise GmlFormatError('Multigraphs are not supported.')
+            continue
+
+        if graph is None:
+            graph = (nx.DiGraph() if graph_attributes.get('directed')
+                     else nx.Graph())
+        if isinstance(item, GmlNode):
+            graph.add_node(item.key, **item.attributes)
+        else:
+            graph.add_edge(item.source, item.target, **item.attributes)
+
+    directed = graph_attributes.pop('directed', False)
+    graph_attributes.pop('multigraph', None)
+    if graph is None:
+        graph = nx.DiGraph() if directed else nx.Graph()
+    elif graph.is_directed() != bool(directed):
+        # Only when the directed attribute follows the first node or edge
+        graph = graph.to_directed() if directed else graph.to_undirected()
+    graph.graph.update(graph_attributes)
+    return graph
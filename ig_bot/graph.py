@@ -1,35 +1,543 @@
 from collections import defaultdict
-from typing import Generator, Iterable, Tuple
+from dataclasses import astuple, dataclass
+from functools import partial
+from operator import attrgetter
+import os
+from typing import (
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+import weakref
 
 import networkx as nx
+import numpy as np
 
-from ig_bot.data import Account, account_to_camel_case
+from ig_bot import pagerank, sparse
+from ig_bot.data import Account
 
 
 IN_DEGREE_CENTRALITY = 'IN_DEGREE_CENTRALITY'
 EIGENVECTOR_CENTRALITY = 'EIGENVECTOR_CENTRALITY'
+PAGERANK_CENTRALITY = 'PAGERANK_CENTRALITY'
+KATZ_CENTRALITY = 'KATZ_CENTRALITY'
+# PageRank of walks restarting at the root of the crawl, as recorded by
+# set_root
+PERSONALIZED_PAGERANK_CENTRALITY = 'PERSONALIZED_PAGERANK_CENTRALITY'
+APPROXIMATE_PAGERANK_CENTRALITY = 'APPROXIMATE_PAGERANK_CENTRALITY'
 
 CENTRALITY_METRIC_FUNCTIONS = {
     IN_DEGREE_CENTRALITY: nx.in_degree_centrality,
     EIGENVECTOR_CENTRALITY: nx.eigenvector_centrality,
+    PAGERANK_CENTRALITY: nx.pagerank,
+    KATZ_CENTRALITY: nx.katz_centrality,
+    PERSONALIZED_PAGERANK_CENTRALITY: pagerank.personalized_pagerank,
+    APPROXIMATE_PAGERANK_CENTRALITY: pagerank.approximate_pagerank,
 }
 
+SPARSE_CENTRALITY_METRIC_FUNCTIONS = {
+    IN_DEGREE_CENTRALITY: sparse.in_degree_centrality,
+    EIGENVECTOR_CENTRALITY: sparse.eigenvector_centrality,
+    PAGERANK_CENTRALITY: sparse.pagerank,
+    KATZ_CENTRALITY: sparse.katz_centrality,
+    PERSONALIZED_PAGERANK_CENTRALITY: sparse.personalized_pagerank,
+    APPROXIMATE_PAGERANK_CENTRALITY: sparse.approximate_pagerank,
+}
 
-def add_nodes(graph: nx.DiGraph, *accounts: Tuple[Account]):
-    """Adds nodes to graph for Account instance if not already present. """
-    graph.add_nodes_from(
-        (account.identifier, account_to_camel_case(account))
-        for account in accounts
+NETWORKX_BACKEND = 'NETWORKX'
+SPARSE_BACKEND = 'SPARSE'
+# Sparse, with power iteration's products split across worker processes
+PARALLEL_BACKEND = 'PARALLEL'
+CENTRALITY_BACKENDS = (NETWORKX_BACKEND, SPARSE_BACKEND, PARALLEL_BACKEND)
+
+# Algorithms computed by power iteration that accept a starting vector
+WARM_STARTABLE_ALGORITHMS = {
+    EIGENVECTOR_CENTRALITY,
+    PAGERANK_CENTRALITY,
+    KATZ_CENTRALITY,
+    PERSONALIZED_PAGERANK_CENTRALITY,
+}
+
+# Algorithms whose sparse functions split their products across ``workers``
+# processes
+PARALLEL_ALGORITHMS = {
+    EIGENVECTOR_CENTRALITY,
+    PAGERANK_CENTRALITY,
+    KATZ_CENTRALITY,
+    PERSONALIZED_PAGERANK_CENTRALITY,
+}
+
+
+def centrality_function(centrality_algorithm: str,
+                        backend: str = NETWORKX_BACKEND,
+                        workers: int = None):
+    """Looks up the function computing an algorithm with a backend. The
+    parallel backend uses ``workers`` processes, or one per CPU."""
+    functions_by_backend = {
+        NETWORKX_BACKEND: CENTRALITY_METRIC_FUNCTIONS,
+        SPARSE_BACKEND: SPARSE_CENTRALITY_METRIC_FUNCTIONS,
+        PARALLEL_BACKEND: SPARSE_CENTRALITY_METRIC_FUNCTIONS,
+    }
+    function = functions_by_backend[backend][centrality_algorithm]
+    if (
+        backend == PARALLEL_BACKEND
+        and centrality_algorithm in PARALLEL_ALGORITHMS
+    ):
+        return partial(function, workers=workers or os.cpu_count())
+    return function
+
+
+@dataclass
+class IngestCounts:
+    """What ingesting scrape results changed in a graph. As a crawl
+    saturates, fewer of the accounts it finds are new."""
+    new_nodes: int = 0
+    updated_nodes: int = 0
+    unchanged_nodes: int = 0
+    new_edges: int = 0
+
+    def __add__(self, other: 'IngestCounts') -> 'IngestCounts':
+        return IngestCounts(*(
+            mine + theirs for mine, theirs in zip(astuple(self),
+                                                  astuple(other))
+        ))
+
+    @property
+    def saturation(self) -> float:
+        """Fraction of ingested nodes that were already in the graph."""
+        ingested = self.new_nodes + self.updated_nodes + self.unchanged_nodes
+        return 1 - self.new_nodes / ingested if ingested else 0.0
+
+
+# Changes made to each graph by the functions below, by which results
+# computed from a graph tell whether it is still as it was. Keys are weak so
+# that graphs are not kept alive by having been counted.
+_changes = weakref.WeakKeyDictionary()
+
+
+def changes(graph: 'FollowGraph') -> int:
+    """Number of times nodes or edges were added to the graph by ingesting,
+    or changes were recorded with ``record_change``."""
+    return _changes.get(graph, 0)
+
+
+def record_change(graph: 'FollowGraph'):
+    """Records a change to the graph's nodes or edges made other than by
+    the ingest functions, such as by calling ``nx.DiGraph`` methods."""
+    _changes[graph] = changes(graph) + 1
+
+
+def ingest_nodes(graph: 'FollowGraph',
+                 identifiers: Sequence,
+                 usernames: Sequence[str],
+                 full_names: Sequence[str]) -> IngestCounts:
+    """Adds nodes for accounts given as columns, writing attributes only for
+    new nodes and those whose username or full name changed. Repeated
+    identifiers take their last values."""
+    if isinstance(graph, CompactGraph):
+        return graph.ingest_nodes(identifiers, usernames, full_names)
+
+    columns = dict(zip(identifiers, zip(usernames, full_names)))
+    nodes = graph.nodes
+    new_nodes = []
+    updated = unchanged = 0
+    for identifier, (username, full_name) in columns.items():
+        if identifier not in nodes:
+            new_nodes.append((identifier, {
+                'identifier': identifier,
+                'username': username,
+                'fullName': full_name,
+            }))
+            continue
+
+        data = nodes[identifier]
+        if (
+            data.get('username') == username
+            and data.get('fullName') == full_name
+            and data.get('identifier') == identifier
+        ):
+            unchanged += 1
+        else:
+            data.update(identifier=identifier,
+                        username=username,
+                        fullName=full_name)
+            updated += 1
+
+    graph.add_nodes_from(new_nodes)
+    if new_nodes:
+        record_change(graph)
+    return IngestCounts(new_nodes=len(new_nodes),
+                        updated_nodes=updated,
+                        unchanged_nodes=unchanged)
+
+
+def ingest_edges(graph: 'FollowGraph',
+                 source,
+                 destinations: Sequence) -> IngestCounts:
+    """Adds edges from the source identifier to each destination, counting
+    those not already present."""
+    if isinstance(graph, CompactGraph):
+        return IngestCounts(new_edges=graph.add_edges(source, destinations))
+
+    new_destinations = set(destinations).difference(
+        graph.succ[source] if source in graph else ()
+    )
+    graph.add_edges_from((source, destination)
+                         for destination in destinations)
+    if new_destinations:
+        record_change(graph)
+    return IngestCounts(new_edges=len(new_destinations))
+
+
+_account_columns = attrgetter('identifier', 'username', 'full_name')
+
+
+def ingest_follows(graph: 'FollowGraph',
+                   source: Account,
+                   followed: Sequence[Account]) -> IngestCounts:
+    """Adds a scraped page of followed accounts and the edges to them."""
+    identifiers, usernames, full_names = (
+        zip(*map(_account_columns, followed)) if followed else ((), (), ())
     )
+    counts = ingest_nodes(graph, identifiers, usernames, full_names)
+    return counts + ingest_edges(graph, source.identifier, identifiers)
+
+
+def add_nodes(graph: 'FollowGraph', *accounts: Tuple[Account]):
+    """Adds nodes to graph for Account instance if not already present. """
+    ingest_nodes(graph,
+                 [account.identifier for account in accounts],
+                 [account.username for account in accounts],
+                 [account.full_name for account in accounts])
+
 
+def set_root(graph: 'FollowGraph', account: Account):
+    """Adds the root of a crawl and records it in the graph's attributes,
+    where personalized PageRank restarts its walks."""
+    add_nodes(graph, account)
+    graph.graph[pagerank.ROOT_ATTRIBUTE] = account.identifier
+    record_change(graph)
 
-def add_edges(graph: nx.DiGraph,
+
+def add_edges(graph: 'FollowGraph',
               source: Account,
               destinations: Iterable[Account]):
-    graph.add_edges_from(
-        (source.identifier, destination.identifier)
-        for destination in destinations
-    )
+    ingest_edges(graph,
+                 source.identifier,
+                 [destination.identifier for destination in destinations])
+
+
+class CompactGraph:
+    """Directed follow graph with nodes numbered densely from zero in the
+    order they are added.
+
+    New edges are appended to growable int32 arrays, which are merged into
+    CSR arrays (each node's successors in the order added) once
+    ``compact_every`` edges are pending, and node attributes are held in
+    columns. An edge then takes four bytes rather than the hundreds of a
+    ``nx.DiGraph``. As in a ``nx.DiGraph``, repeated edges are ignored,
+    edges add any nodes missing from the graph, without attributes, and
+    graph attributes are kept in ``graph``.
+    """
+
+    _INITIAL_CAPACITY = 16
+
+    def __init__(self, compact_every: int = 2 ** 18):
+        self.compact_every = compact_every
+        self.graph = {}
+        self._ids: Dict[object, int] = {}
+        self._identifiers = np.empty(self._INITIAL_CAPACITY, dtype=object)
+        self._usernames = np.empty(self._INITIAL_CAPACITY, dtype=object)
+        self._full_names = np.empty(self._INITIAL_CAPACITY, dtype=object)
+        self._described = np.zeros(self._INITIAL_CAPACITY, dtype=bool)
+
+        # Rows beyond the end of indptr belong to nodes added since the last
+        # compaction, which have no compacted successors
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.empty(0, dtype=np.int32)
+        self._pending_sources = np.empty(self._INITIAL_CAPACITY,
+                                         dtype=np.int32)
+        self._pending_destinations = np.empty(self._INITIAL_CAPACITY,
+                                              dtype=np.int32)
+        self._pending_count = 0
+        self._pending_edges = set()
+
+    @classmethod
+    def from_networkx(cls, graph: nx.DiGraph, **kwargs) -> 'CompactGraph':
+        compact_graph = cls(**kwargs)
+        compact_graph.graph.update(graph.graph)
+        for identifier in graph:
+            compact_graph._add_node(identifier)
+        compact_graph.add_nodes(
+            Account(identifier, data['username'], data.get('fullName'))
+            for identifier, data in graph.nodes(data=True)
+            if 'username' in data
+        )
+        for identifier in graph:
+            compact_graph.add_edges(identifier, graph.succ[identifier])
+        compact_graph.compact()
+        return compact_graph
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, identifier) -> bool:
+        return identifier in self._ids
+
+    def __iter__(self) -> Iterator:
+        return iter(self._ids)
+
+    def number_of_nodes(self) -> int:
+        return len(self._ids)
+
+    def number_of_edges(self) -> int:
+        return len(self._indices) + self._pending_count
+
+    def node_id(self, identifier) -> int:
+        return self._ids[identifier]
+
+    @property
+    def identifiers(self) -> np.ndarray:
+        return self._identifiers[:len(self)]
+
+    @property
+    def usernames(self) -> np.ndarray:
+        return self._usernames[:len(self)]
+
+    @property
+    def full_names(self) -> np.ndarray:
+        return self._full_names[:len(self)]
+
+    def _reserve(self, size: int):
+        capacity = len(self._identifiers)
+        if size <= capacity:
+            return
+
+        while capacity < size:
+            capacity *= 2
+        for name in ('_identifiers', '_usernames', '_full_names',
+                     '_described'):
+            column = getattr(self, name)
+            # Object columns start as None, the bool column as False
+            grown = (np.empty if column.dtype == object else np.zeros)(
+                capacity, dtype=column.dtype
+            )
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def _add_node(self, identifier) -> int:
+        node_id = self._ids.get(identifier)
+        if node_id is None:
+            node_id = self._ids[identifier] = len(self._ids)
+            self._reserve(node_id + 1)
+            self._identifiers[node_id] = identifier
+        return node_id
+
+    def add_nodes(self, accounts: Iterable[Account]):
+        """Adds accounts' nodes, or updates their attributes if present."""
+        accounts = list(accounts)
+        self.ingest_nodes([account.identifier for account in accounts],
+                          [account.username for account in accounts],
+                          [account.full_name for account in accounts])
+
+    def ingest_nodes(self,
+                     identifiers: Sequence,
+                     usernames: Sequence[str],
+                     full_names: Sequence[str]) -> IngestCounts:
+        """As ``ingest_nodes``, comparing and writing attributes a column at
+        a time."""
+        columns = dict(zip(identifiers, zip(usernames, full_names)))
+        identifiers = list(columns)
+        usernames = np.empty(len(columns), dtype=object)
+        full_names = np.empty(len(columns), dtype=object)
+        if columns:
+            usernames[:], full_names[:] = zip(*columns.values())
+
+        node_ids = np.fromiter((self._ids.get(identifier, -1)
+                                for identifier in identifiers),
+                               dtype=np.int64,
+                               count=len(identifiers))
+        existing = node_ids >= 0
+        existing_ids = node_ids[existing]
+        changed = (
+            ~self._described[existing_ids]
+            | (self._usernames[existing_ids] != usernames[existing])
+            | (self._full_names[existing_ids] != full_names[existing])
+        )
+        changed_ids = existing_ids[changed]
+        self._usernames[changed_ids] = usernames[existing][changed]
+        self._full_names[changed_ids] = full_names[existing][changed]
+        self._described[changed_ids] = True
+
+        new = ~existing
+        new_identifiers = [
+            identifier for identifier, is_new
+            in zip(identifiers, new.tolist()) if is_new
+        ]
+        start = len(self._ids)
+        end = start + len(new_identifiers)
+        self._reserve(end)
+        self._ids.update(zip(new_identifiers, range(start, end)))
+        self._identifiers[start:end] = new_identifiers
+        self._usernames[start:end] = usernames[new]
+        self._full_names[start:end] = full_names[new]
+        self._described[start:end] = True
+        if new_identifiers:
+            record_change(self)
+
+        updated = int(changed.sum())
+        return IngestCounts(new_nodes=len(new_identifiers),
+                            updated_nodes=updated,
+                            unchanged_nodes=len(existing_ids) - updated)
+
+    def _row(self, node_id: int) -> np.ndarray:
+        if node_id + 1 >= len(self._indptr):
+            return self._indices[:0]
+        return self._indices[self._indptr[node_id]:self._indptr[node_id + 1]]
+
+    def add_edges(self, source, destinations: Iterable) -> int:
+        """Adds edges from the source identifier to each destination,
+        returning the number not already present."""
+        source_id = self._add_node(source)
+        destination_ids = np.fromiter(map(self._add_node, destinations),
+                                      dtype=np.int32)
+        _, first = np.unique(destination_ids, return_index=True)
+        destination_ids = destination_ids[np.sort(first)]
+        destination_ids = destination_ids[
+            ~np.isin(destination_ids, self._row(source_id))
+        ]
+
+        # Pending edges are packed into one int for a cheap membership test
+        offset = source_id << 32
+        new_ids = []
+        for destination_id in destination_ids.tolist():
+            edge = offset | destination_id
+            if edge not in self._pending_edges:
+                self._pending_edges.add(edge)
+                new_ids.append(destination_id)
+        if not new_ids:
+            return 0
+        record_change(self)
+
+        start = self._pending_count
+        end = start + len(new_ids)
+        if end > len(self._pending_sources):
+            capacity = len(self._pending_sources)
+            while capacity < end:
+                capacity *= 2
+            for name in ('_pending_sources', '_pending_destinations'):
+                grown = np.empty(capacity, dtype=np.int32)
+                grown[:start] = getattr(self, name)[:start]
+                setattr(self, name, grown)
+        self._pending_sources[start:end] = source_id
+        self._pending_destinations[start:end] = new_ids
+        self._pending_count = end
+
+        if self._pending_count >= self.compact_every:
+            self.compact()
+        return len(new_ids)
+
+    def compact(self):
+        """Merges pending edges into the CSR arrays."""
+        node_count = len(self)
+        indptr = np.empty(node_count + 1, dtype=np.int64)
+        indptr[:len(self._indptr)] = self._indptr
+        indptr[len(self._indptr):] = self._indptr[-1]
+        if not self._pending_count:
+            self._indptr = indptr
+            return
+
+        sources = self._pending_sources[:self._pending_count]
+        order = np.argsort(sources, kind='stable')
+        sources = sources[order]
+        destinations = self._pending_destinations[:self._pending_count][order]
+
+        # Each source's new edges go after its existing ones
+        self._indices = np.insert(self._indices,
+                                  indptr[sources + 1],
+                                  destinations)
+        counts = np.bincount(sources, minlength=node_count)
+        indptr[1:] += np.cumsum(counts)
+        self._indptr = indptr
+
+        self._pending_sources = np.empty(self._INITIAL_CAPACITY,
+                                         dtype=np.int32)
+        self._pending_destinations = np.empty(self._INITIAL_CAPACITY,
+                                              dtype=np.int32)
+        self._pending_count = 0
+        self._pending_edges = set()
+
+    def csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Compacted ``(indptr, indices)`` arrays, with node ids as
+        indices."""
+        self.compact()
+        return self._indptr, self._indices
+
+    def successors(self, identifier) -> List:
+        self.compact()
+        return self.identifiers[self._row(self._ids[identifier])].tolist()
+
+    def has_edge(self, source, destination) -> bool:
+        if source not in self._ids or destination not in self._ids:
+            return False
+        source_id = self._ids[source]
+        destination_id = self._ids[destination]
+        return (
+            (source_id << 32 | destination_id) in self._pending_edges
+            or bool((self._row(source_id) == destination_id).any())
+        )
+
+    def node_attributes(self, name: str) -> dict:
+        """Values of a node attribute by identifier, for nodes that have it,
+        like ``nx.get_node_attributes``."""
+        column = {
+            'identifier': self.identifiers,
+            'username': self.usernames,
+            'fullName': self.full_names,
+        }[name]
+        described = self._described[:len(self)]
+        return dict(zip(self.identifiers[described].tolist(),
+                        column[described].tolist()))
+
+    def adjacency_matrix(self) -> sparse.AdjacencyMatrix:
+        indptr, indices = self.csr()
+        return sparse.AdjacencyMatrix.from_csr(self.identifiers.tolist(),
+                                               indptr,
+                                               indices)
+
+    def to_networkx(self) -> nx.DiGraph:
+        graph = nx.DiGraph(**self.graph)
+        identifiers = self.identifiers.tolist()
+        described = self._described[:len(self)].tolist()
+        graph.add_nodes_from(
+            (identifier, {
+                'identifier': identifier,
+                'username': username,
+                'fullName': full_name,
+            } if is_described else {})
+            for identifier, username, full_name, is_described in zip(
+                identifiers,
+                self.usernames.tolist(),
+                self.full_names.tolist(),
+                described,
+            )
+        )
+        indptr, indices = self.csr()
+        sources = np.repeat(np.arange(len(self)), np.diff(indptr))
+        graph.add_edges_from(
+            (identifiers[source], identifiers[destination])
+            for source, destination in zip(sources.tolist(), indices.tolist())
+        )
+        return graph
+
+
+FollowGraph = Union[nx.DiGraph, CompactGraph]
 
 
 def _combine(**attributes) -> defaultdict:
@@ -47,14 +555,191 @@ def _combine(**attributes) -> defaultdict:
     return combined
 
 
+class IncrementalCentrality:
+    """Computes centrality repeatedly as a graph grows, warm-starting power
+    iteration from the previous result rather than from a uniform vector.
+
+    Nodes added since the last computation start at the smallest previous
+    centrality, so only the neighbourhood of the new edges moves much and
+    the iteration converges in a few steps. Once the number of edges added
+    since the last cold start exceeds ``max_drift`` as a fraction of the
+    edges present then, the centrality is recomputed from scratch.
+
+    A result is reused for as long as it was computed from the same graph
+    object, with the same count of ``changes`` and the same size. Graphs
+    changed other than by ingesting must have ``record_change`` called on
+    them for an edit that keeps their size to be noticed.
+    """
+
+    def __init__(self,
+                 max_drift: float = 0.1,
+                 backend: str = NETWORKX_BACKEND,
+                 workers: int = None):
+        self.max_drift = max_drift
+        self.backend = backend
+        self.workers = workers
+        self._centrality = {}
+        self._edges_at_cold_start = {}
+        self._computed_from = {}
+        self._last_algorithm = None
+        self._reported = None
+        self._reported_nodes = []
+        self._reported_values = np.empty(0)
+
+    def _is_current(self, graph: FollowGraph,
+                    centrality_algorithm: str) -> bool:
+        computed_from = self._computed_from.get(centrality_algorithm)
+        return (
+            computed_from is not None
+            and computed_from[0]() is graph
+            and computed_from[1] == _version(graph)
+        )
+
+    def _record(self,
+                graph: FollowGraph,
+                centrality_algorithm: str,
+                centrality: Dict[str, float]):
+        self._centrality[centrality_algorithm] = centrality
+        self._computed_from[centrality_algorithm] = (weakref.ref(graph),
+                                                     _version(graph))
+        self._last_algorithm = centrality_algorithm
+
+    def drift(self, graph: nx.DiGraph, centrality_algorithm: str) -> float:
+        """Edges added since the last cold start relative to the edge count
+        at that time."""
+        edges_at_cold_start = self._edges_at_cold_start.get(centrality_algorithm)
+        if edges_at_cold_start is None:
+            return float('inf')
+        edges_added = graph.number_of_edges() - edges_at_cold_start
+        return edges_added / max(edges_at_cold_start, 1)
+
+    def __call__(self,
+                 graph: nx.DiGraph,
+                 centrality_algorithm: str) -> Dict[str, float]:
+        function = centrality_function(centrality_algorithm,
+                                       self.backend,
+                                       self.workers)
+        if self._is_current(graph, centrality_algorithm):
+            return self._centrality[centrality_algorithm]
+
+        # Forget previous results until this computation succeeds
+        previous = self._centrality.pop(centrality_algorithm, None)
+        self._computed_from.pop(centrality_algorithm, None)
+
+        if (
+            previous
+            and centrality_algorithm in WARM_STARTABLE_ALGORITHMS
+            and self.drift(graph, centrality_algorithm) <= self.max_drift
+        ):
+            centrality = function(
+                _centrality_input(graph, self.backend),
+                nstart=_starting_vector(graph, previous),
+            )
+        else:
+            centrality = function(_centrality_input(graph, self.backend))
+            self._edges_at_cold_start[centrality_algorithm] = (
+                graph.number_of_edges()
+            )
+
+        self._record(graph, centrality_algorithm, centrality)
+        return centrality
+
+    def seed(self,
+             graph: nx.DiGraph,
+             centrality_algorithm: str,
+             centrality: Dict[str, float]):
+        """Takes centrality computed elsewhere from the graph as it is now
+        as the last result, returned until the graph changes."""
+        self._record(graph, centrality_algorithm, centrality)
+        self._edges_at_cold_start[centrality_algorithm] = (
+            graph.number_of_edges()
+        )
+
+    def latest(self,
+               graph: nx.DiGraph,
+               centrality_algorithm: str) -> Optional[Dict[str, float]]:
+        """The last result, if computed from the graph as it is now."""
+        if not self._is_current(graph, centrality_algorithm):
+            return None
+        return self._centrality[centrality_algorithm]
+
+    def updated(self, graph: FollowGraph) -> Dict[str, float]:
+        """The centrality last computed from the graph as it is now, by
+        whichever algorithm, of only the nodes whose value differs from that
+        returned by the previous call; all nodes on the first call.
+
+        Results are compared as arrays, nodes being added to graphs at the
+        end, so only the changed values are handled one by one."""
+        centrality = (self.latest(graph, self._last_algorithm)
+                      if self._last_algorithm else None)
+        if centrality is None or centrality is self._reported:
+            return {}
+
+        nodes = list(centrality)
+        values = np.fromiter(centrality.values(),
+                             dtype=np.float64,
+                             count=len(nodes))
+        reported_nodes = self._reported_nodes
+        reported_values = self._reported_values
+        self._reported = centrality
+        self._reported_nodes, self._reported_values = nodes, values
+
+        known = len(reported_values)
+        if known > len(nodes) or nodes[:known] != reported_nodes:
+            return dict(centrality)
+
+        changed = np.flatnonzero(values[:known] != reported_values).tolist()
+        changed.extend(range(known, len(nodes)))
+        return {nodes[index]: centrality[nodes[index]] for index in changed}
+
+
+def _version(graph: FollowGraph) -> Tuple[int, int, int]:
+    return (changes(graph), graph.number_of_nodes(), graph.number_of_edges())
+
+
+def _centrality_input(graph: FollowGraph, backend: str) -> FollowGraph:
+    """networkx algorithms need a ``nx.DiGraph``, whereas sparse ones use a
+    ``CompactGraph``'s CSR arrays directly."""
+    if isinstance(graph, CompactGraph) and backend == NETWORKX_BACKEND:
+        return graph.to_networkx()
+    return graph
+
+
+def _node_attributes(graph: FollowGraph, name: str) -> dict:
+    if isinstance(graph, CompactGraph):
+        return graph.node_attributes(name)
+    return nx.get_node_attributes(graph, name)
+
+
+def _starting_vector(graph: nx.DiGraph,
+                     previous: Dict[str, float]) -> Dict[str, float]:
+    """Previous centrality for known nodes and the smallest positive
+    previous value for new ones, as power iteration rejects zero vectors."""
+    floor = min((value for value in previous.values() if value > 0),
+                default=1.0)
+    return {
+        node: previous.get(node) or floor
+        for node in graph
+    }
+
+
 def accounts_with_centrality(
-    graph: nx.DiGraph, centrality_algorithm: str
+    graph: nx.DiGraph,
+    centrality_algorithm: str,
+    incremental: IncrementalCentrality = None,
+    backend: str = NETWORKX_BACKEND,
+    workers: int = None,
 ) -> Generator[Account, None, None]:
-    centrality_function = CENTRALITY_METRIC_FUNCTIONS[centrality_algorithm]
+    if incremental:
+        centrality = incremental(graph, centrality_algorithm)
+    else:
+        centrality = centrality_function(
+            centrality_algorithm, backend, workers
+        )(_centrality_input(graph, backend))
 
-    data_by_id = _combine(centrality=centrality_function(graph),
-                          username=nx.get_node_attributes(graph, 'username'),
-                          full_name=nx.get_node_attributes(graph, 'fullName'))
+    data_by_id = _combine(centrality=centrality,
+                          username=_node_attributes(graph, 'username'),
+                          full_name=_node_attributes(graph, 'fullName'))
     for identifier, data in data_by_id.items():
         try:
             yield Account(identifier=identifier, **data)
@@ -0,0 +1,147 @@
+import json
+import os
+from typing import Iterable
+
+import networkx as nx
+
+from ig_bot.data import Account, account_to_camel_case, AccountTable
+from ig_bot.graph import add_nodes
+from ig_bot.pagerank import ROOT_ATTRIBUTE
+
+
+class _Journal:
+    """Append-only JSON lines file, synced to disk after each record. A line
+    torn by a crash is discarded when the journal is next opened."""
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        _truncate_torn_line(filepath)
+        self._file_obj = open(filepath, 'a', encoding='utf-8')
+        self.records_written = 0
+
+    def _append(self, entry: dict):
+        self._file_obj.write(json.dumps(entry) + '\n')
+        self._file_obj.flush()
+        os.fsync(self._file_obj.fileno())
+        self.records_written += 1
+
+    def clear(self):
+        """Empties the journal once its contents are in a snapshot."""
+        self._file_obj.truncate(0)
+        self._file_obj.flush()
+        os.fsync(self._file_obj.fileno())
+        self.records_written = 0
+
+    def close(self):
+        self._file_obj.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GraphJournal(_Journal):
+    """Append-only log of the nodes and edges added to a graph since it was
+    last saved as a snapshot.
+
+    Each call to ``record`` appends one JSON line and syncs it to disk, so the
+    cost of a write depends only on what was added.
+    """
+
+    def record(self,
+               accounts: Iterable[Account],
+               source: Account = None,
+               destinations: Iterable[Account] = ()):
+        self._append({
+            'nodes': [account_to_camel_case(account) for account in accounts],
+            'edges': [
+                [source.identifier, destination.identifier]
+                for destination in destinations
+            ],
+        })
+
+    def record_root(self, root: Account):
+        """Records the root of a new crawl, and its node."""
+        self._append({
+            'nodes': [account_to_camel_case(root)],
+            'edges': [],
+            'root': root.identifier,
+        })
+
+
+class AccountJournal(_Journal):
+    """Append-only log of accounts added or changed since an accounts file
+    was last written, so that a scrape writes the rows it touched rather
+    than every account."""
+
+    def record(self, table: AccountTable, identifiers: Iterable[str]):
+        rows = []
+        for identifier in identifiers:
+            account = table[identifier]
+            date_scraped = account.date_scraped
+            rows.append([
+                account.identifier,
+                account.username,
+                account.full_name,
+                account.centrality,
+                date_scraped and date_scraped.isoformat(),
+            ])
+        self._append({'accounts': rows})
+
+
+def _truncate_torn_line(filepath: str):
+    try:
+        with open(filepath, 'rb+') as file_obj:
+            contents = file_obj.read()
+            if contents and not contents.endswith(b'\n'):
+                file_obj.truncate(contents.rfind(b'\n') + 1)
+    except FileNotFoundError:
+        pass
+
+
+def replay_journal(graph: nx.DiGraph, filepath: str) -> int:
+    """Applies journalled additions to a graph, returning the number of
+    records replayed."""
+    records = 0
+
+    try:
+        with open(filepath, 'r', encoding='utf-8') as file_obj:
+            for line in file_obj:
+                if not line.endswith('\n'):
+                    break  # Torn by a crash mid-write
+                entry = json.loads(line)
+                add_nodes(graph, *(
+                    Account(identifier=node['identifier'],
+                            username=node['username'],
+                            full_name=node['fullName'])
+                    for node in entry['nodes']
+                ))
+                graph.add_edges_from(map(tuple, entry['edges']))
+                if 'root' in entry:
+                    graph.graph[ROOT_ATTRIBUTE] = entry['root']
+                records += 1
+    except FileNotFoundError:
+        pass
+
+    return records
+
+
+def replay_account_journal(table: AccountTable, filepath: str) -> int:
+    """Applies journalled account changes to a table, returning the number
+    of records replayed."""
+    records = 0
+
+    try:
+        with open(filepath, 'r', encoding='utf-8') as file_obj:
+            for line in file_obj:
+                if not line.endswith('\n'):
+                    break  # Torn by a crash mid-write
+                entry = json.loads(line)
+                table.upsert(Account(*row) for row in entry['accounts'])
+                records += 1
+    except FileNotFoundError:
+        pass
+
+    return records
@@ -0,0 +1,297 @@
+"""Progress of media scraping in a SQLite database in the users directory.
+
+Records what has been saved under the directory, so that resumed scrapes
+look items up rather than requesting them again, and later stages query it
+rather than walking the directory:
+
+    accounts    accounts whose media has all been scraped
+    media       posts whose data has been saved, by URL, and whether all of
+                their images have been saved too
+    images      image files, by path relative to the users directory, with
+                their size once saved
+
+Media saved before a directory had a manifest is imported from its
+``data.json`` files once, by ``import_saved_media``.
+
+The database uses write-ahead logging, so other processes can read it while
+media is scraped.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import json
+import os
+from os import path
+import sqlite3
+import threading
+from typing import (
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+MANIFEST_FILENAME = 'manifest.sqlite'
+COMPLETED_FILENAME = 'completed'
+MEDIA_DATA_FILENAME = 'data.json'
+IMAGE_FILENAME = 'image.jpg'
+POST_URL = 'https://www.instagram.com/p/{}/'
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS accounts (
+    identifier TEXT PRIMARY KEY,
+    date_completed TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS media (
+    url TEXT PRIMARY KEY,
+    account TEXT NOT NULL,
+    media_id TEXT NOT NULL,
+    data_path TEXT NOT NULL,
+    taken_at INTEGER,
+    completed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS media_account ON media (account);
+CREATE TABLE IF NOT EXISTS images (
+    path TEXT PRIMARY KEY,
+    media_url TEXT NOT NULL,
+    image_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    size INTEGER
+);
+CREATE INDEX IF NOT EXISTS images_media_url ON images (media_url);
+"""
+
+
+class SavedImage(NamedTuple):
+    path: str
+    image_id: str
+    account: str
+    media_id: str
+    taken_at: Optional[int]
+
+
+def _post_images(data: dict,
+                 media_directory: str) -> List[Tuple[str, str, str]]:
+    """The ``(path, image id, url)`` of each image of a post, as media
+    scraping lays them out under the post's directory."""
+    children = data.get('edge_sidecar_to_children', {}).get('edges')
+    if not children:
+        return [(f'{media_directory}/{IMAGE_FILENAME}',
+                 str(data['id']),
+                 data['display_url'])]
+    return [
+        (f'{media_directory}/children/{child["node"]["id"]}/{IMAGE_FILENAME}',
+         str(child['node']['id']),
+         child['node']['display_url'])
+        for child in children
+    ]
+
+
+class MediaManifest:
+    """Connection to a media manifest, which is created if absent.
+
+    Methods may be called from any thread; writes are serialised.
+    """
+
+    def __init__(self, filepath: str, read_only: bool = False):
+        self.filepath = filepath
+        if read_only:
+            self._connection = sqlite3.connect(f'file:{filepath}?mode=ro',
+                                               uri=True,
+                                               check_same_thread=False)
+        else:
+            self._connection = sqlite3.connect(filepath,
+                                               check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.executescript(_SCHEMA)
+            self._connection.execute(
+                'INSERT OR IGNORE INTO metadata VALUES (?, ?)',
+                ('schema_version', str(SCHEMA_VERSION)),
+            )
+            self._connection.commit()
+        self._lock = threading.RLock()
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self) -> 'MediaManifest':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Commits the statements executed within it together, or none of
+        them if an exception is raised."""
+        with self._lock, self._connection:
+            yield self._connection
+
+    def _query(self, sql: str, parameters: tuple = ()) -> list:
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def account_completed(self, identifier: str) -> bool:
+        return bool(self._query(
+            'SELECT 1 FROM accounts WHERE identifier = ?', (str(identifier),)
+        ))
+
+    def complete_account(self, identifier: str):
+        with self.transaction() as connection:
+            connection.execute(
+                'INSERT OR IGNORE INTO accounts VALUES (?, ?)',
+                (str(identifier), datetime.utcnow().isoformat(sep=' ')),
+            )
+
+    def import_completed_markers(self, users_directory: str,
+                                 identifiers: Iterable[str]) -> int:
+        """Records accounts marked complete by the ``completed`` files
+        written by earlier scrapes, returning how many were found."""
+        completed = [
+            str(identifier) for identifier in identifiers
+            if path.exists(path.join(users_directory,
+                                     str(identifier),
+                                     COMPLETED_FILENAME))
+        ]
+        with self.transaction() as connection:
+            connection.executemany(
+                'INSERT OR IGNORE INTO accounts VALUES (?, ?)',
+                ((identifier, datetime.utcnow().isoformat(sep=' '))
+                 for identifier in completed),
+            )
+        return len(completed)
+
+    def import_saved_media(self, users_directory: str) -> int:
+        """Records the posts and images saved under the directory by
+        scrapes that predate the manifest, returning how many posts were
+        found. The directory is only walked the first time."""
+        if self._query(
+            "SELECT 1 FROM metadata WHERE key = 'saved_media_imported'"
+        ):
+            return 0
+
+        recorded = {data_path for (data_path,) in self._query(
+            'SELECT data_path FROM media'
+        )}
+        imported = 0
+        for dirpath, _, filenames in os.walk(users_directory):
+            if MEDIA_DATA_FILENAME not in filenames:
+                continue
+            media_directory = path.relpath(
+                dirpath, users_directory
+            ).replace(os.sep, '/')
+            data_path = f'{media_directory}/{MEDIA_DATA_FILENAME}'
+            if data_path in recorded:
+                continue
+
+            with open(path.join(dirpath, MEDIA_DATA_FILENAME)) as file_obj:
+                data = json.load(file_obj)
+            url = POST_URL.format(data['shortcode'])
+            images = _post_images(data, media_directory)
+            self.record_media(url,
+                              media_directory.split('/')[0],
+                              data['id'],
+                              data_path,
+                              data.get('taken_at_timestamp'),
+                              images)
+            sizes = []
+            for image_path, _, _ in images:
+                try:
+                    sizes.append((image_path, path.getsize(
+                        path.join(users_directory, image_path)
+                    )))
+                except OSError:
+                    pass  # Never saved
+            self.record_images_saved(sizes)
+            self.complete_media(url)
+            imported += 1
+
+        with self.transaction() as connection:
+            connection.execute(
+                'INSERT OR IGNORE INTO metadata VALUES (?, ?)',
+                ('saved_media_imported', datetime.utcnow().isoformat(sep=' ')),
+            )
+        return imported
+
+    def media_completed(self, url: str) -> bool:
+        return bool(self._query(
+            'SELECT 1 FROM media WHERE url = ? AND completed', (url,)
+        ))
+
+    def record_media(self,
+                     url: str,
+                     account: str,
+                     media_id: str,
+                     data_path: str,
+                     taken_at: Optional[int],
+                     images: Sequence[Tuple[str, str, str]]):
+        """Records a post whose data has been saved, and the
+        ``(path, image id, url)`` of each of its images to be saved."""
+        with self.transaction() as connection:
+            connection.execute(
+                'INSERT INTO media VALUES (?, ?, ?, ?, ?, 0) '
+                'ON CONFLICT (url) DO UPDATE SET '
+                'data_path = excluded.data_path, taken_at = excluded.taken_at',
+                (url, str(account), str(media_id), data_path, taken_at),
+            )
+            connection.executemany(
+                'INSERT INTO images VALUES (?, ?, ?, ?, NULL) '
+                'ON CONFLICT (path) DO UPDATE SET url = excluded.url',
+                ((image_path, url, str(image_id), image_url)
+                 for image_path, image_id, image_url in images),
+            )
+
+    def record_images_saved(self, sizes: Iterable[Tuple[str, int]]):
+        """Records the sizes of saved images, by path."""
+        with self.transaction() as connection:
+            connection.executemany(
+                'UPDATE images SET size = ? WHERE path = ?',
+                ((size, image_path) for image_path, size in sizes),
+            )
+
+    def complete_media(self, url: str) -> bool:
+        """Marks a post completed if all of its images are saved, returning
+        whether it was."""
+        with self.transaction() as connection:
+            cursor = connection.execute(
+                'UPDATE media SET completed = 1 WHERE url = ? AND NOT EXISTS '
+                '(SELECT 1 FROM images WHERE media_url = ? AND size IS NULL)',
+                (url, url),
+            )
+            return cursor.rowcount > 0
+
+    def saved_images(self,
+                     accounts: Iterable[str] = None,
+                     oldest: datetime = None) -> Iterator[SavedImage]:
+        """Images saved, optionally only for some accounts and for posts
+        taken no earlier than ``oldest``."""
+        sql = (
+            'SELECT images.path, images.image_id, media.account, '
+            'media.media_id, media.taken_at FROM images '
+            'JOIN media ON media.url = images.media_url '
+            'WHERE images.size IS NOT NULL'
+        )
+        parameters = []
+        if accounts is not None:
+            accounts = [str(account) for account in accounts]
+            sql += f' AND media.account IN ({", ".join("?" * len(accounts))})'
+            parameters.extend(accounts)
+        if oldest is not None:
+            sql += ' AND media.taken_at >= ?'
+            # Naive dates are UTC, as are those of the posts
+            if oldest.tzinfo is None:
+                oldest = oldest.replace(tzinfo=timezone.utc)
+            parameters.append(int(oldest.timestamp()))
+        sql += ' ORDER BY media.account, images.path'
+
+        for row in self._query(sql, tuple(parameters)):
+            yield SavedImage(*row)
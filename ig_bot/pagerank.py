@@ -0,0 +1,122 @@
+"""PageRank personalized to the root of a crawl.
+
+A crawl grows outwards from its root, so ranking accounts by the PageRank of
+walks that restart at the root keeps it close to the root's community.
+``approximate_pagerank`` estimates this with the push algorithm of Andersen,
+Chung and Lang, which only visits nodes holding enough probability mass:
+its cost is bounded by ``1 / (epsilon * (1 - alpha))`` whatever the size of
+the graph, and it needs no iteration to converge.
+
+Unless seeds are given, walks restart at the root of the crawl, recorded in
+a graph's ``root`` attribute. Graphs saved before crawls recorded their root
+restart at their first node instead, which a crawl adds first.
+"""
+from collections import deque
+from typing import Any, Callable, Container, Dict, Iterable, Sequence
+
+import networkx as nx
+
+ROOT_ATTRIBUTE = 'root'
+
+
+def crawl_root(graph: Iterable) -> list:
+    """The root recorded in a graph's attributes, or its first node if none
+    is, as a list of seeds. No seeds if the graph has no nodes."""
+    root = getattr(graph, 'graph', {}).get(ROOT_ATTRIBUTE)
+    if root is not None and root in graph:
+        return [root]
+    for node in graph:
+        return [node]
+    return []
+
+
+def check_seeds(seeds: Iterable, nodes: Container):
+    """Raises ``ValueError`` if any seed is not one of the nodes."""
+    missing = [seed for seed in seeds if seed not in nodes]
+    if missing:
+        raise ValueError(f'Seeds not in the graph: {missing}')
+
+
+def push_pagerank(seeds: Sequence,
+                  successors: Callable[[Any], Sequence],
+                  out_degree: Callable[[Any], int],
+                  alpha: float = 0.85,
+                  epsilon: float = 1.0e-5) -> Dict[Any, float]:
+    """Approximate PageRank of walks restarting uniformly at the seeds,
+    for the nodes reached. Residual probability is pushed from a node to its
+    successors until each node holds less than ``epsilon`` times its
+    out-degree. Walks reaching a node without successors restart, as in
+    ``nx.pagerank`` with a personalization."""
+    if not seeds:
+        return {}
+
+    restart = 1.0 / len(seeds)
+    residual = {seed: restart for seed in seeds}
+    estimate = {}
+    queue = deque(residual)
+    queued = set(residual)
+
+    while queue:
+        node = queue.popleft()
+        queued.discard(node)
+        mass = residual.pop(node)
+        estimate[node] = estimate.get(node, 0.0) + (1 - alpha) * mass
+
+        targets = successors(node)
+        if len(targets):
+            share = alpha * mass / len(targets)
+        else:
+            targets, share = seeds, alpha * mass * restart
+
+        for target in targets:
+            target_residual = residual.get(target, 0.0) + share
+            residual[target] = target_residual
+            if (
+                target not in queued
+                and target_residual >= epsilon * max(out_degree(target), 1)
+            ):
+                queue.append(target)
+                queued.add(target)
+
+    return estimate
+
+
+def personalized_pagerank(graph: nx.DiGraph,
+                          seeds: Sequence = None,
+                          alpha: float = 0.85,
+                          max_iter: int = 100,
+                          tol: float = 1.0e-6,
+                          nstart: Dict[Any, float] = None) -> Dict[Any, float]:
+    """PageRank of walks restarting at the seeds, by power iteration."""
+    if seeds is None:
+        seeds = crawl_root(graph)
+    check_seeds(seeds, graph)
+    if not seeds:
+        return {}
+
+    return nx.pagerank(graph,
+                       alpha=alpha,
+                       personalization=dict.fromkeys(seeds, 1),
+                       max_iter=max_iter,
+                       tol=tol,
+                       nstart=nstart)
+
+
+def approximate_pagerank(graph: nx.DiGraph,
+                         seeds: Sequence = None,
+                         alpha: float = 0.85,
+                         epsilon: float = 1.0e-5) -> Dict[Any, float]:
+    """Personalized PageRank estimated by ``push_pagerank``, with nodes not
+    reached given zero."""
+    if seeds is None:
+        seeds = crawl_root(graph)
+    check_seeds(seeds, graph)
+
+    succ = graph.succ
+    centrality = dict.fromkeys(graph, 0.0)
+    centrality.update(push_pagerank(seeds,
+                                    succ.__getitem__,
+                                    lambda node: len(succ[node]),
+                                    alpha,
+                                    epsilon))
+    return centrality
@@ -0,0 +1,187 @@
+"""Sparse matrix-vector products split across worker processes.
+
+A matrix's CSR arrays, and the vectors it multiplies, are placed in shared
+memory once, and its rows are split into blocks of about equal numbers of
+nonzero entries. Each product then only sends workers the names of the
+shared arrays and the indices of their blocks, rather than pickling the
+matrix, and every worker writes its rows of the result in place.
+
+Worker processes are started by a fork server, as forking a process whose
+other threads may hold locks can deadlock the child, and one pool per
+number of workers is kept for the life of the process, so computing
+centrality repeatedly does not start processes each time.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from multiprocessing import shared_memory
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+START_METHOD = (
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods()
+    else 'spawn'
+)
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+# The matrix a worker process last multiplied by, set by _use_matrix
+_worker = {}
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(START_METHOD),
+            )
+        return _pools[workers]
+
+
+def _discard_pool(workers: int, pool: ProcessPoolExecutor):
+    with _pools_lock:
+        if _pools.get(workers) is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False)
+
+
+def _attach(specs: Dict[str, ArraySpec]):
+    memory = {}
+    arrays = {}
+    for key, (name, shape, dtype) in specs.items():
+        memory[key] = shared_memory.SharedMemory(name=name)
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=memory[key].buf)
+    return memory, arrays
+
+
+def _use_matrix(specs: Dict[str, ArraySpec],
+                shape: Tuple[int, int],
+                bounds: List[Tuple[int, int]]):
+    """Attaches a worker to a matrix's shared arrays, detaching it from
+    those of the matrix it used before."""
+    if _worker.get('specs') == specs:
+        return
+
+    _worker.pop('arrays', None)
+    _worker.pop('blocks', None)
+    for memory in _worker.pop('memory', {}).values():
+        memory.close()
+    memory, arrays = _attach(specs)
+    _worker.update(specs=specs, memory=memory, arrays=arrays, shape=shape,
+                   bounds=bounds, blocks={})
+
+
+def _block(index: int) -> sparse.csr_matrix:
+    blocks = _worker['blocks']
+    if index not in blocks:
+        arrays = _worker['arrays']
+        start, end = _worker['bounds'][index]
+        indptr = arrays['indptr'][start:end + 1]
+        first, last = indptr[0], indptr[-1]
+        blocks[index] = sparse.csr_matrix(
+            (arrays['data'][first:last],
+             arrays['indices'][first:last],
+             indptr - first),
+            shape=(end - start, _worker['shape'][1]),
+        )
+    return blocks[index]
+
+
+def _multiply_block(specs: Dict[str, ArraySpec],
+                    shape: Tuple[int, int],
+                    bounds: List[Tuple[int, int]],
+                    index: int):
+    _use_matrix(specs, shape, bounds)
+    arrays = _worker['arrays']
+    start, end = bounds[index]
+    arrays['product'][start:end] = _block(index) @ arrays['vector']
+
+
+def row_blocks(indptr: np.ndarray, count: int) -> List[Tuple[int, int]]:
+    """Splits rows into at most ``count`` contiguous ``(start, end)``
+    blocks with about equal numbers of nonzero entries."""
+    row_count = len(indptr) - 1
+    targets = np.linspace(0, indptr[-1], count + 1)[1:-1]
+    cuts = np.searchsorted(indptr, targets).clip(0, row_count)
+    boundaries = np.unique(np.concatenate(([0], cuts, [row_count])))
+    return list(zip(boundaries[:-1].tolist(), boundaries[1:].tolist()))
+
+
+class ParallelProduct:
+    """Multiplies vectors by a CSR matrix on a shared pool of worker
+    processes.
+
+    Call ``close``, or use as a context manager, to free the shared memory.
+    """
+
+    def __init__(self, matrix: sparse.csr_matrix, workers: int):
+        matrix = sparse.csr_matrix(matrix)
+        row_count, column_count = matrix.shape
+        arrays = {
+            'indptr': matrix.indptr,
+            'indices': matrix.indices,
+            'data': matrix.data.astype(np.float64, copy=False),
+            'vector': np.zeros(column_count),
+            'product': np.zeros(row_count),
+        }
+
+        self._workers = workers
+        self._shape = matrix.shape
+        self._memory = {}
+        self._arrays = {}
+        self._specs = {}
+        try:
+            for key, array in arrays.items():
+                # Zero-sized shared memory can't be created
+                memory = shared_memory.SharedMemory(create=True,
+                                                    size=max(array.nbytes, 1))
+                self._memory[key] = memory
+                self._arrays[key] = np.ndarray(array.shape,
+                                               dtype=array.dtype,
+                                               buffer=memory.buf)
+                self._arrays[key][...] = array
+                self._specs[key] = (memory.name, array.shape, array.dtype.str)
+        except BaseException:
+            self._release()
+            raise
+        self._bounds = row_blocks(matrix.indptr, workers)
+
+    def __call__(self, vector: np.ndarray) -> np.ndarray:
+        self._arrays['vector'][:] = vector
+        pool = _pool(self._workers)
+        block_count = len(self._bounds)
+        try:
+            for _ in pool.map(_multiply_block,
+                              [self._specs] * block_count,
+                              [self._shape] * block_count,
+                              [self._bounds] * block_count,
+                              range(block_count)):
+                pass
+        except BrokenProcessPool:
+            # Start afresh next time rather than failing every product
+            _discard_pool(self._workers, pool)
+            raise
+        return self._arrays['product'].copy()
+
+    def _release(self):
+        self._arrays.clear()
+        for memory in self._memory.values():
+            memory.close()
+            memory.unlink()
+        self._memory.clear()
+
+    def close(self):
+        self._release()
+
+    def __enter__(self) -> 'ParallelProduct':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,171 @@
+"""Token-bucket rate limiting shared by the scraping scripts.
+
+Each (credential, endpoint) pair gets its own bucket. Buckets back off
+multiplicatively when requests are rate limited and recover additively as
+requests succeed, so a scraper settles just under the rate the service
+tolerates instead of sleeping through worst-case gaps.
+
+Configured by the ``rate_limits`` section of the config, e.g.
+
+    rate_limits:
+      default: {rate: 0.5, capacity: 3}
+      endpoints:
+        followed_accounts_page: {rate: 0.2, capacity: 2}
+      backoff: {decrease_factor: 0.5, increase: 0.01, min_rate: 0.005}
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, Tuple
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average, in bursts of up to
+    ``capacity``.
+
+    Callers reserve a token and are told how long to wait for it, so waiting
+    happens outside the bucket's lock. Tokens may go negative, which queues
+    callers behind earlier reservations.
+    """
+
+    def __init__(self,
+                 rate: float,
+                 capacity: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(
+            self.capacity,
+            self._tokens + (now - self._updated) * self.rate,
+        )
+        self._updated = now
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Takes tokens, returning the seconds to wait before using them."""
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """Token bucket whose rate halves (by default) whenever a request is rate
+    limited and creeps back up to ``max_rate`` as requests succeed."""
+
+    def __init__(self,
+                 rate: float,
+                 capacity: float,
+                 decrease_factor: float = 0.5,
+                 increase: float = 0.01,
+                 min_rate: float = 0.005,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__(rate, capacity, clock)
+        self.max_rate = rate
+        self.decrease_factor = decrease_factor
+        self.increase = increase
+        self.min_rate = min_rate
+        self.successes = 0
+        self.rate_limited = 0
+
+    def record_success(self):
+        self.successes += 1
+        self.set_rate(min(self.max_rate, self.rate + self.increase))
+
+    def record_rate_limited(self):
+        self.rate_limited += 1
+        self.set_rate(max(self.min_rate, self.rate * self.decrease_factor))
+
+
+class RateLimiter:
+    """Adaptive token buckets per credential and endpoint."""
+
+    def __init__(self,
+                 rate_limits_config: dict,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.default = rate_limits_config['default']
+        self.endpoints = rate_limits_config.get('endpoints', {})
+        self.backoff = rate_limits_config.get('backoff', {})
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: Dict[Tuple[str, str], AdaptiveTokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, credential: str, endpoint: str) -> AdaptiveTokenBucket:
+        key = (credential, endpoint)
+        with self._lock:
+            if key not in self._buckets:
+                limits = self.endpoints.get(endpoint, self.default)
+                self._buckets[key] = AdaptiveTokenBucket(
+                    limits['rate'],
+                    limits['capacity'],
+                    clock=self._clock,
+                    **self.backoff,
+                )
+            return self._buckets[key]
+
+    def acquire(self,
+                credential: str,
+                endpoint: str,
+                logger: logging.Logger) -> float:
+        """Blocks until a request may be made, returning the wait."""
+        delay = self.bucket(credential, endpoint).reserve()
+        if delay:
+            logger.debug(f'Waiting {delay:.2f} seconds to call {endpoint}...')
+            self._sleep(delay)
+        return delay
+
+    async def acquire_async(self,
+                            credential: str,
+                            endpoint: str,
+                            logger: logging.Logger) -> float:
+        delay = self.bucket(credential, endpoint).reserve()
+        if delay:
+            logger.debug(f'Waiting {delay:.2f} seconds to call {endpoint}...')
+            await asyncio.sleep(delay)
+        return delay
+
+    def for_credential(self, credential: str) -> 'CredentialRateLimiter':
+        return CredentialRateLimiter(self, credential)
+
+
+class CredentialRateLimiter:
+    """The buckets of one credential, as passed to scraping functions."""
+
+    def __init__(self, rate_limiter: RateLimiter, credential: str):
+        self.rate_limiter = rate_limiter
+        self.credential = credential
+
+    def acquire(self, endpoint: str, logger: logging.Logger) -> float:
+        return self.rate_limiter.acquire(self.credential, endpoint, logger)
+
+    async def acquire_async(self,
+                            endpoint: str,
+                            logger: logging.Logger) -> float:
+        return await self.rate_limiter.acquire_async(self.credential,
+                                                     endpoint,
+                                                     logger)
+
+    def record_success(self, endpoint: str):
+        self.rate_limiter.bucket(self.credential, endpoint).record_success()
+
+    def record_rate_limited(self, endpoint: str, logger: logging.Logger):
+        bucket = self.rate_limiter.bucket(self.credential, endpoint)
+        bucket.record_rate_limited()
+        logger.warning(
+            f'Rate limited on {endpoint} as {self.credential}. '
+            f'Reduced rate to {bucket.rate:.3f} requests per second.'
+        )
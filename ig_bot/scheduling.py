@@ -0,0 +1,87 @@
+"""Work split across worker threads in shards, with bounded retries.
+
+Items are dealt out round-robin into one shard per worker. A worker takes
+items from the front of its own shard and, once that is empty, from the back
+of the longest remaining shard, so no worker idles while another has a
+backlog. An item that fails goes to the back of the worker's shard, behind
+items not yet tried, so one failing item never holds up the rest; after
+``max_attempts`` failures it is set aside as a dead letter. Each worker backs
+off after failing, by its own count of consecutive failures.
+"""
+from collections import deque
+import logging
+import threading
+from typing import Any, Callable, Deque, List, NamedTuple, Sequence, Tuple
+
+Worker = Callable[[Any], None]
+Backoff = Callable[[int, int], None]
+
+
+class DeadLetter(NamedTuple):
+    item: Any
+    attempts: int
+    error: BaseException
+
+
+def shards(items: Sequence, count: int) -> List[Deque[Tuple[Any, int]]]:
+    """Items, with no attempts made, dealt round-robin into ``count``
+    shards."""
+    return [deque((item, 0) for item in items[index::count])
+            for index in range(count)]
+
+
+def run_sharded(items: Sequence,
+                workers: Sequence[Worker],
+                logger: logging.Logger,
+                max_attempts: int = 3,
+                backoff: Backoff = None) -> List[DeadLetter]:
+    """Calls a worker with each item, on one thread per worker, and returns
+    the items that still raised after ``max_attempts`` attempts.
+    ``backoff(worker_index, consecutive_failures)`` is called by a worker's
+    thread after each failure."""
+    worker_shards = shards(list(items), len(workers))
+    lock = threading.Lock()
+    dead_letters = []
+
+    def next_item(index: int):
+        with lock:
+            if worker_shards[index]:
+                return worker_shards[index].popleft()
+            longest = max(worker_shards, key=len)
+            if longest:
+                return longest.pop()
+            return None
+
+    def run(index: int, worker: Worker):
+        failures = 0
+        while True:
+            claimed = next_item(index)
+            if claimed is None:
+                return
+            item, attempts = claimed
+            attempts += 1
+
+            try:
+                worker(item)
+            except Exception as error:
+                logger.warning(
+                    f'Attempt {attempts} at {item} failed: {error!r}'
+                )
+                with lock:
+                    if attempts < max_attempts:
+                        worker_shards[index].append((item, attempts))
+                    else:
+                        dead_letters.append(DeadLetter(item, attempts, error))
+                failures += 1
+                if backoff:
+                    backoff(index, failures)
+            else:
+                failures = 0
+
+    threads = [threading.Thread(target=run, args=(index, worker), daemon=True)
+               for index, worker in enumerate(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return dead_letters
@@ -2,10 +2,10 @@ import functools
 import logging
 from random import random
 import time
-from typing import Generator
+from typing import Generator, List, NamedTuple, Optional, Tuple
 
 
-from ig_bot.data import Account, account_from_obj
+from ig_bot.data import Account, account_from_obj, account_to_camel_case
 import instagrapi
 
 
@@ -17,6 +17,13 @@ class NotFound(Exception):
     """Client cannot find an account."""
 
 
+class FollowsPage(NamedTuple):
+    """A page of followed accounts. ``end_cursor`` resumes scraping after
+    the page and is empty after the last page."""
+    accounts: List[Account]
+    end_cursor: str
+    cached: bool = False
+
 
 def get_authenticated_client(username: str, password: str):
     """Gets an authenticated client instance."""
@@ -38,32 +45,144 @@ def exponential_sleep(exponent: int, base: float, offset: float, logger: logging
     time.sleep(duration_rounded)
 
 
+class RateLimitingRetries:
+    """The bookkeeping around each attempt of a call retried on client
+    errors, shared by ``retry_on_rate_limiting`` and its asyncio
+    counterpart, which differ only in how they call and wait."""
+
+    def __init__(self,
+                 endpoint: str,
+                 config: dict,
+                 logger: logging.Logger,
+                 rate_limiter=None):
+        self.endpoint = endpoint
+        self.config = config
+        self.logger = logger
+        self.rate_limiter = rate_limiter
+        self.attempt_numbers = range(1, config["rate_limit_retries"] + 1)
+
+    def failed(self,
+               exception: Exception,
+               attempt_number: int) -> Optional[Tuple[int, float, float]]:
+        """Raises ``NotFound`` for a 404. Otherwise slows the rate limiter
+        or, without one, returns the exponent, base and offset of the
+        exponential sleep to take before the next attempt."""
+        if "404 Client Error" in str(exception):
+            raise NotFound("404 when attempting to get resource. It was probably deleted.")
+
+        self.logger.error(f"Scraping failed: {exception}")
+        if self.rate_limiter:
+            self.rate_limiter.record_rate_limited(self.endpoint, self.logger)
+            return None
+        return (attempt_number,
+                self.config['exponential_sleep_base'],
+                self.config['exponential_sleep_offset'])
+
+    def succeeded(self):
+        if self.rate_limiter:
+            self.rate_limiter.record_success(self.endpoint)
+
+    def exhausted(self) -> MaxRateLimitingRetriesExceeded:
+        return MaxRateLimitingRetriesExceeded(
+            f"Function {self.endpoint} still failed due to rate limiting "
+            f"after {len(self.attempt_numbers)} attempts."
+        )
+
+
 def retry_on_rate_limiting(func):
+    """Retries on client errors other than 404s. Without a rate limiter,
+    retries follow an exponential sleep. With one, each attempt waits for a
+    token and failures slow the limiter's rate for this endpoint."""
 
     @functools.wraps(func)
-    def wrapper(*args, config, logger, **kwargs):
-
-        retries = config["rate_limit_retries"]
-        for attempt_number in range(1, retries + 1):
+    def wrapper(*args, config, logger, rate_limiter=None, **kwargs):
+        retries = RateLimitingRetries(func.__name__, config, logger,
+                                      rate_limiter)
+        for attempt_number in retries.attempt_numbers:
+            if rate_limiter:
+                rate_limiter.acquire(retries.endpoint, logger)
             try:
-                return func(*args, config=config, logger=logger, **kwargs)
+                result = func(*args, config=config, logger=logger, **kwargs)
             except instagrapi.exceptions.ClientError as exception:
-                if "404 Client Error" in str(exception):
-                    raise NotFound("404 when attempting to get resource. It was probably deleted.")
-
-                logger.error(f"Scraping failed: {exception}")
-                base = config['exponential_sleep_base']
-                offset = config['exponential_sleep_offset']
-                exponential_sleep(attempt_number, base, offset, logger)
+                backoff = retries.failed(exception, attempt_number)
+                if backoff:
+                    exponential_sleep(*backoff, logger)
+            else:
+                retries.succeeded()
+                return result
 
-        raise MaxRateLimitingRetriesExceeded(
-            f"Function {func.__name__} still failed due to rate limiting "
-            f"after {attempt_number} attempts."
-        )
+        raise retries.exhausted()
 
     return wrapper
 
 
+def _account_from_cached(data: dict) -> Account:
+    return Account(identifier=data['identifier'],
+                   username=data['username'],
+                   full_name=data['fullName'])
+
+
+def cache_responses(amount_config_key: str = None):
+    """Serves results from an optional ``ResponseCache``, keyed by the
+    function's name, the identifier of its first argument and the config
+    value at ``amount_config_key``. Misses are fetched and stored."""
+
+    def decorator(func):
+
+        @functools.wraps(func)
+        def wrapper(subject, *args, config, logger, cache=None, **kwargs):
+            if cache is None:
+                return func(subject, *args, config=config, logger=logger, **kwargs)
+
+            endpoint = func.__name__
+            identifier = getattr(subject, 'identifier', subject)
+            amount = config[amount_config_key] if amount_config_key else None
+
+            end_cursor = kwargs.get('end_cursor')
+            if end_cursor:
+                identifier = f'{identifier}@{end_cursor}'
+
+            cached = cache.get(endpoint, identifier, amount)
+            if isinstance(cached, dict) and 'accounts' in cached:
+                logger.debug(f'Using cached {endpoint} for {identifier}.')
+                return FollowsPage(
+                    [_account_from_cached(data) for data in cached['accounts']],
+                    cached['endCursor'],
+                    cached=True,
+                )
+            if isinstance(cached, list):
+                logger.debug(f'Using cached {endpoint} for {identifier}.')
+                return (_account_from_cached(data) for data in cached)
+            if cached is not None:
+                logger.debug(f'Using cached {endpoint} for {identifier}.')
+                return _account_from_cached(cached)
+
+            result = func(subject, *args, config=config, logger=logger, **kwargs)
+            if isinstance(result, Account):
+                cache.put(endpoint, identifier, account_to_camel_case(result), amount)
+                return result
+            if isinstance(result, FollowsPage):
+                cache.put(endpoint,
+                          identifier,
+                          {'accounts': [account_to_camel_case(account)
+                                        for account in result.accounts],
+                           'endCursor': result.end_cursor},
+                          amount)
+                return result
+
+            accounts = list(result)
+            cache.put(endpoint,
+                      identifier,
+                      [account_to_camel_case(account) for account in accounts],
+                      amount)
+            return iter(accounts)
+
+        return wrapper
+
+    return decorator
+
+
+@cache_responses('max_followed_scraped')
 @retry_on_rate_limiting
 def followed_accounts(
         follower: Account,
@@ -78,6 +197,69 @@ def followed_accounts(
     return (account_from_obj(account) for account in results)
 
 
+@cache_responses('follows_page_size')
+@retry_on_rate_limiting
+def followed_accounts_page(follower: Account,
+                           client: instagrapi.Client,
+                           config: dict,
+                           logger: logging.Logger,
+                           end_cursor: str = None) -> FollowsPage:
+    results, next_cursor = client.user_following_gql_chunk(
+        follower.identifier,
+        max_amount=config['follows_page_size'],
+        end_cursor=end_cursor,
+    )
+    return FollowsPage([account_from_obj(account) for account in results],
+                       next_cursor or '')
+
+
+def followed_account_pages(follower: Account,
+                           client: instagrapi.Client,
+                           config: dict,
+                           logger: logging.Logger,
+                           end_cursor: str = None,
+                           scraped: int = 0,
+                           **kwargs) -> Generator[FollowsPage, None, None]:
+    """Pages of up to ``follows_page_size`` accounts followed by an account,
+    each fetched as the previous one is consumed, until
+    ``max_followed_scraped`` accounts are scraped. A scrape interrupted after
+    ``scraped`` accounts is resumed from the ``end_cursor`` of its last page.
+    Other keyword arguments are passed to ``followed_accounts_page``."""
+    remaining = config['max_followed_scraped'] - scraped
+
+    while remaining > 0:
+        page = followed_accounts_page(follower,
+                                      client,
+                                      config=config,
+                                      logger=logger,
+                                      end_cursor=end_cursor,
+                                      **kwargs)
+        limited, remaining = limit_page(page, remaining, config)
+        yield limited
+        if not limited.end_cursor:
+            return
+        end_cursor = page.end_cursor
+
+
+def limit_page(page: FollowsPage,
+               remaining: int,
+               config: dict) -> Tuple[FollowsPage, int]:
+    """A fetched page cut to the ``remaining`` accounts to be scraped, with
+    an empty cursor if it is the last, and how many then remain."""
+    accounts = page.accounts[:remaining]
+    remaining -= len(accounts)
+    # The client may return a cursor with a short final page
+    last = (
+        not page.end_cursor
+        or len(page.accounts) < config['follows_page_size']
+        or remaining <= 0
+    )
+    return (page._replace(accounts=accounts,
+                          end_cursor='' if last else page.end_cursor),
+            remaining)
+
+
+@cache_responses()
 @retry_on_rate_limiting
 def account_by_id(identifier: str,
                   client: instagrapi.Client,
@@ -87,6 +269,7 @@ def account_by_id(identifier: str,
     return account_from_obj(client.user_info(identifier))
 
 
+@cache_responses()
 @retry_on_rate_limiting
 def account_by_username(username: str,
                         client: instagrapi.Client,
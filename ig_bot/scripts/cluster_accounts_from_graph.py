@@ -8,7 +8,13 @@ import numpy as np
 import pandas as pd
 from sklearn import cluster, preprocessing
 
-from graph import account_nodes_from_graph, CENTRALITY_METRIC_FUNCTIONS
+from centrality_cache import CentralityCache
+from graph import (
+    account_nodes_from_graph,
+    centrality_function,
+    CENTRALITY_BACKENDS,
+    NETWORKX_BACKEND,
+)
 
 from scripts.util import initialise_logger, save_dataframe_csv
 
@@ -39,6 +45,23 @@ CLUSTERING_CLASSES = {'K_MEANS': cluster.KMeans}
     default='EIGENVECTOR_CENTRALITY',
     help='The measure determining the importance of an account.'
 )
+@click.option(
+    '--backend',
+    '-b',
+    type=click.Choice(CENTRALITY_BACKENDS),
+    default=NETWORKX_BACKEND,
+    help='The implementation used to compute the importance measure.'
+)
+@click.option(
+    '--workers',
+    '-w',
+    type=int,
+    default=None,
+    help=(
+            'Processes used by the PARALLEL backend. '
+            '(Defaults to one per CPU.)'
+    )
+)
 @click.option(
     '--accounts-retained',
     '-r',
@@ -66,6 +89,8 @@ def cluster_accounts(
         clusters: int,
         clustering_algorithm: str,
         importance_measure: str,
+        backend: str,
+        workers: int,
         accounts_retained: int,
         max_followers: int,
         log_level: str
@@ -91,7 +116,14 @@ def cluster_accounts(
     node_index = [node['identifier'] for node in node_dicts]
     accounts_data = pd.DataFrame(node_dicts, index=node_index)
 
-    importance = CENTRALITY_METRIC_FUNCTIONS[importance_measure](graph)
+    importance_function = centrality_function(
+        importance_measure, backend, workers
+    )
+    importance = CentralityCache(graph_path).get_or_compute(
+        importance_measure,
+        lambda: importance_function(graph),
+        backend=backend,
+    )
     centrality_series = pd.Series(
         (importance[i] for i in node_index),
         index=node_index
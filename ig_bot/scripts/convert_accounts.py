@@ -0,0 +1,28 @@
+from os import path
+
+import click
+
+from ig_bot.scripts.util import initialise_logger, load_accounts, save_accounts
+
+
+@click.command()
+@click.argument('input_path')
+@click.argument('output_path')
+@click.option('--log-level', '-l', type=str, default='INFO')
+def convert_accounts(input_path: str, output_path: str, log_level: str):
+    """Converts accounts between CSV (.csv) and columnar (.npz) files.
+    The formats are determined by the file extensions.
+    """
+    logger = initialise_logger(
+        directory=path.dirname(path.abspath(output_path)),
+        name='convert_accounts',
+        module='ig_bot.scripts.convert_accounts',
+        level=log_level,
+    )
+    table = load_accounts(input_path, logger)
+    logger.info(f'Converting {len(table)} accounts...')
+    save_accounts(table, output_path, logger)
+
+
+if __name__ == '__main__':
+    convert_accounts()
@@ -0,0 +1,32 @@
+from os import path
+
+import click
+
+from ig_bot.scripts.util import initialise_logger, load_graph, save_graph
+
+
+@click.command()
+@click.argument('input_path')
+@click.argument('output_path')
+@click.option('--log-level', '-l', type=str, default='INFO')
+def convert_graph(input_path: str, output_path: str, log_level: str):
+    """Converts a graph between GML (.gml), binary snapshot (.igb) and crawl
+    state database (.sqlite) files.
+    The formats are determined by the file extensions.
+    """
+    logger = initialise_logger(
+        directory=path.dirname(path.abspath(output_path)),
+        name='convert_graph',
+        module='ig_bot.scripts.convert_graph',
+        level=log_level,
+    )
+    graph = load_graph(input_path, logger)
+    logger.info(
+        f'Converting graph with {graph.number_of_nodes()} nodes and '
+        f'{graph.number_of_edges()} edges...'
+    )
+    save_graph(graph, output_path, logger)
+
+
+if __name__ == '__main__':
+    convert_graph()
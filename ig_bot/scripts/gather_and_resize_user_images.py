@@ -1,15 +1,17 @@
 from datetime import datetime
 import json
+from typing import Optional
 
 import click
 from os import path, walk
 from PIL import Image, ImageOps
 import yaml
 
-from util import initialise_logger
+from ig_bot.media_manifest import MANIFEST_FILENAME, MediaManifest
+from ig_bot.scripts.util import initialise_logger
 
 
-def image_paths_and_ids(directory: str, oldest: datetime, logger):
+def image_paths_and_ids(directory: str, oldest: Optional[datetime], logger):
     for dirpath, _, filenames in walk(directory):
         if "data.json" not in filenames:
             continue
@@ -21,13 +23,22 @@ def image_paths_and_ids(directory: str, oldest: datetime, logger):
             data = json.load(file_obj)
         date_taken = datetime.utcfromtimestamp(data["taken_at_timestamp"])
         
-        if date_taken < oldest:
+        if oldest and date_taken < oldest:
             logger.info(f"Skipping image {image_id}: date taken is {date_taken.isoformat()}")
-    
+            continue
+
         if "image.jpg" in filenames:
             yield image_path, image_id
 
 
+def image_paths_and_ids_from_manifest(manifest: MediaManifest, users_directory: str, user_ids,
+                                      oldest: Optional[datetime]):
+    """Images recorded as saved in the media manifest, without walking the directory once
+    media saved before the manifest has been imported into it."""
+    for image in manifest.saved_images(user_ids, oldest):
+        yield path.join(users_directory, image.path), image.image_id
+
+
 def resize_and_save(output_directory: str,  image_path: str, image_id: str, image_index: int, resolution: int, logger):
     try:
         output_path = path.join(output_directory, f"{image_id}.jpg")
@@ -71,10 +82,31 @@ def gather_and_resize(users_directory, output_directory, user_ids, oldest, resol
         level=log_level,
     )
 
-    oldest = datetime.fromisoformat(oldest)
+    oldest = datetime.fromisoformat(oldest) if oldest else None
     
     total_images = 0
 
+    manifest_path = path.join(users_directory, MANIFEST_FILENAME)
+    if path.exists(manifest_path):
+        logger.info(f"Gathering images recorded in {manifest_path}...")
+        selected_ids = [i.strip() for i in user_ids.split(",") if i.strip()] or None
+
+        with MediaManifest(manifest_path) as manifest:
+            imported = manifest.import_saved_media(users_directory)
+            if imported:
+                logger.info(f"Recorded {imported} posts saved before the manifest in it")
+
+            for i, (image_path, image_id) in enumerate(
+                image_paths_and_ids_from_manifest(manifest, users_directory, selected_ids, oldest), 1
+            ):
+                total_images += 1
+
+                if not dry_run:
+                    resize_and_save(output_directory, image_path, image_id, i, resolution, logger)
+
+        logger.info(f"Total image count: {total_images}")
+        return
+
     if not user_ids:
         logger.info("No user ids specified. Gathering images for all users...")
         
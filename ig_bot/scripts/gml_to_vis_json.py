@@ -4,9 +4,8 @@ from os import path
 import yaml
 
 import click
-import networkx as nx
-
 
+from gml import GmlEdge, GmlNode, iter_gml
 from scripts.util import initialise_logger, save_graph_gml
 
 
@@ -32,17 +31,36 @@ def gml_to_json(
         level=log_level,
     )
 
-    graph = nx.read_gml(graph_path)
-
-    label_id_map = {label: id_ for id_, label in enumerate(graph)}
-    nodes = [{'id': label_id_map[label], 'label': label} for label in graph]
-    edges = [{'from': label_id_map[from_], 'to': label_id_map[to]}
-             for from_, to in graph.edges]
-
     json_path = path.join(config['data_directory'], f'{base_file_name}.json')
     logger.info(f'Saving to {json_path}')
+
+    # Written as the graph is read, which GML's nodes-then-edges order allows
+    label_id_map = {}
     with open(json_path, 'w') as file_obj:
-        json.dump({'nodes': nodes, 'edges': edges}, file_obj)
+        file_obj.write('{"nodes": [')
+        separator = ''
+        in_edges = False
+        for item in iter_gml(graph_path, node_attributes=()):
+            if isinstance(item, GmlNode):
+                if in_edges:
+                    raise ValueError('Nodes must precede edges.')
+                label_id_map[item.key] = len(label_id_map)
+                entry = {'id': label_id_map[item.key], 'label': item.key}
+            elif isinstance(item, GmlEdge):
+                if not in_edges:
+                    file_obj.write('], "edges": [')
+                    separator = ''
+                    in_edges = True
+                entry = {'from': label_id_map[item.source],
+                         'to': label_id_map[item.target]}
+            else:
+                continue
+            file_obj.write(separator)
+            json.dump(entry, file_obj)
+            separator = ', '
+        if not in_edges:
+            file_obj.write('], "edges": [')
+        file_obj.write(']}')
 
 
 if __name__ == '__main__':
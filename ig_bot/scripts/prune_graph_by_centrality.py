@@ -5,7 +5,13 @@ from os import path
 import click
 import networkx as nx
 
-from ig_bot.graph import CENTRALITY_METRIC_FUNCTIONS
+from ig_bot.centrality_cache import CentralityCache
+from ig_bot.gml import read_gml
+from ig_bot.graph import (
+    centrality_function,
+    CENTRALITY_BACKENDS,
+    NETWORKX_BACKEND,
+)
 
 from ig_bot.scripts.util import initialise_logger, save_graph_gml
 
@@ -19,6 +25,23 @@ from ig_bot.scripts.util import initialise_logger, save_graph_gml
     default='EIGENVECTOR_CENTRALITY',
     help='The measure determining the importance of an account.'
 )
+@click.option(
+    '--backend',
+    '-b',
+    type=click.Choice(CENTRALITY_BACKENDS),
+    default=NETWORKX_BACKEND,
+    help='The implementation used to compute the importance measure.'
+)
+@click.option(
+    '--workers',
+    '-w',
+    type=int,
+    default=None,
+    help=(
+            'Processes used by the PARALLEL backend. '
+            '(Defaults to one per CPU.)'
+    )
+)
 @click.option(
     '--accounts-retained',
     '-r',
@@ -50,6 +73,8 @@ from ig_bot.scripts.util import initialise_logger, save_graph_gml
 def prune_graph(
         data_dir: str,
         importance_measure: str,
+        backend: str,
+        workers: int,
         accounts_retained: int,
         max_followers: int,
         omit_attributes: bool,
@@ -75,18 +100,31 @@ def prune_graph(
         module='instagraph_bot.scripts.prune_graph_by_centrality',
         level=log_level,
     )
-    graph = nx.read_gml(graph_path)
-
     # Negative value for max_followers mean that here is not maximum
-    if max_followers > -1:
-        for identifier, followers in nx.get_node_attributes(
-                graph,
-                'followedByCount'
-        ).items():
-            if followers >= max_followers:
-                graph.remove_node(identifier)
-
-    importance = CENTRALITY_METRIC_FUNCTIONS[importance_measure](graph)
+    def few_enough_followers(identifier, attributes):
+        return attributes.get('followedByCount', -1) < max_followers
+
+    # Outliers, and attributes not written out, are dropped as the graph is
+    # read rather than after it has been built
+    graph = read_gml(
+        graph_path,
+        node_filter=few_enough_followers if max_followers > -1 else None,
+        node_attributes=(
+            ('username', 'fullName') if omit_attributes else None
+        ),
+    )
+
+    importance_function = centrality_function(
+        importance_measure, backend, workers
+    )
+    # Centrality depends on the backend and on which outliers were dropped,
+    # but not on the attributes kept
+    importance = CentralityCache(graph_path).get_or_compute(
+        importance_measure,
+        lambda: importance_function(graph),
+        backend=backend,
+        **({'max_followers': max_followers} if max_followers > -1 else {}),
+    )
     important_identifiers = set([
         identifier for identifier, centrality in
         sorted(importance.items(), key=lambda kv: kv[1], reverse=True)
@@ -104,7 +142,7 @@ def prune_graph(
     if omit_attributes:
         for identifier, data in list(graph.nodes(data=True)):
             for key in list(data.keys()):
-                del graph.node[identifier][key]
+                del graph.nodes[identifier][key]
 
     save_graph_gml(
         graph=graph,
@@ -1,50 +1,134 @@
 # -*- coding: UTF-8 -*-
+import asyncio
+from collections import defaultdict
+from contextlib import nullcontext
 import csv
+import json
 import logging
+import os
+import queue
 import random
-from dataclasses import asdict, fields
+import threading
+from dataclasses import asdict, fields, replace
 from datetime import datetime
-from itertools import chain, islice
+from heapq import nlargest
 from operator import attrgetter
 from os import path
 from pathlib import Path
-from typing import Iterable, Iterator, List, Union
+from typing import (
+    Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+)
 
 import click
+import instagrapi
 import networkx as nx
 from networkx.exception import PowerIterationFailedConvergence
 import yaml
 
+from ig_bot import async_scraping
+from ig_bot.accounts_file import (
+    account_journal_path,
+    ACCOUNTS_FILE_EXTENSION,
+    write_accounts,
+)
+from ig_bot.cache import response_cache_from_config, ResponseCache
+from ig_bot.centrality_cache import Centrality, CentralityCache
 from ig_bot.data import (
     Account,
     accounts_from_dataframe,
     accounts_to_dataframe,
+    AccountTable,
 )
 from ig_bot.graph import (
-    add_edges,
-    add_nodes,
     accounts_with_centrality,
+    APPROXIMATE_PAGERANK_CENTRALITY,
     EIGENVECTOR_CENTRALITY,
     IN_DEGREE_CENTRALITY,
+    IncrementalCentrality,
+    ingest_follows,
+    PERSONALIZED_PAGERANK_CENTRALITY,
+    IngestCounts,
+    set_root,
+)
+from ig_bot.frontier import Frontier
+from ig_bot.journal import (
+    AccountJournal,
+    GraphJournal,
+    replay_account_journal,
+    replay_journal,
 )
+from ig_bot.rate_limiting import CredentialRateLimiter, RateLimiter
 from ig_bot.scraping import (
     account_by_username,
+    followed_account_pages,
+    FollowsPage,
     get_authenticated_client,
-    followed_accounts,
     NotFound,
     random_sleep,
 )
-from ig_bot.scripts.util import initialise_logger, load_graph_gml, save_graph_gml
+from ig_bot.scripts.util import (
+    CSV_EXTENSION,
+    GML_EXTENSION,
+    initialise_logger,
+    load_accounts,
+    load_graph_gml,
+    load_graph_snapshot,
+    save_graph,
+    SNAPSHOT_EXTENSION,
+)
+from ig_bot.state import CrawlDatabase
+
+GRAPH_FILE_EXTENSIONS = {
+    'GML': GML_EXTENSION,
+    'SNAPSHOT': SNAPSHOT_EXTENSION,
+}
+ACCOUNTS_FILE_EXTENSIONS = {
+    'CSV': CSV_EXTENSION,
+    'COLUMNAR': ACCOUNTS_FILE_EXTENSION,
+}
 
 
-def _load_graph(graph_path: str, logger: logging.Logger):
+def _load_graph(graph_path: str, journal_path: str, logger: logging.Logger):
     try:
-        return load_graph_gml(graph_path, logger)
+        if graph_path.endswith(SNAPSHOT_EXTENSION):
+            graph = load_graph_snapshot(graph_path, logger)
+        else:
+            graph = load_graph_gml(graph_path, logger)
     except OSError:
-        return None
+        graph = None
+
+    if path.exists(journal_path):
+        journalled_graph = nx.DiGraph() if graph is None else graph
+        records = replay_journal(journalled_graph, journal_path)
+        logger.info(f'Replayed {records} journal records onto graph.')
+        if records:
+            graph = journalled_graph
+
+    return graph
+
+
+def _compact_graph(graph: nx.DiGraph,
+                   graph_path: str,
+                   journal: GraphJournal,
+                   logger: logging.Logger):
+    """Saves a graph snapshot and clears the journal it supersedes."""
+    save_graph(graph, graph_path, logger)
+    journal.clear()
 
 
-def _load_accounts(accounts_path: str, logger: logging.Logger) -> List[Account]:
+def _load_accounts(
+    accounts_path: str, logger: logging.Logger
+) -> Union[List[Account], AccountTable, None]:
+    if accounts_path.endswith(ACCOUNTS_FILE_EXTENSION):
+        journal_path = account_journal_path(accounts_path)
+        if path.exists(accounts_path):
+            return load_accounts(accounts_path, logger)
+        if path.exists(journal_path):
+            table = AccountTable()
+            replay_account_journal(table, journal_path)
+            return table
+        return None
+
     try:
         with open(accounts_path, 'r', encoding="utf-8") as file_obj:
             reader = csv.DictReader(file_obj)
@@ -53,6 +137,16 @@ def _load_accounts(accounts_path: str, logger: logging.Logger) -> List[Account]:
     except OSError:
         return None
 
+def _compact_accounts(table: AccountTable,
+                      accounts_path: str,
+                      journal: AccountJournal,
+                      logger: logging.Logger):
+    """Writes the accounts file and clears the journal it supersedes."""
+    write_accounts(table, accounts_path)
+    journal.clear()
+    logger.info(f'{len(table)} accounts saved to {accounts_path}.')
+
+
 def _save_accounts(accounts: Iterable[Account],
                    accounts_path: str,
                    logger: logging.Logger):
@@ -64,6 +158,655 @@ def _save_accounts(accounts: Iterable[Account],
             writer.writerow(asdict(account))
 
 
+class _FollowCursors:
+    """Where interrupted scrapes of accounts' follows resume, saved once each
+    page of follows is in the graph journal."""
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        try:
+            with open(filepath, 'r', encoding='utf-8') as file_obj:
+                self._cursors = json.load(file_obj)
+        except (OSError, ValueError):
+            self._cursors = {}
+
+    def get(self, identifier: str) -> Tuple[Optional[str], int]:
+        """The cursor after the last page recorded and the number of follows
+        scraped before it."""
+        cursor = self._cursors.get(identifier)
+        if cursor is None:
+            return None, 0
+        return cursor['endCursor'], cursor['scraped']
+
+    def set(self, identifier: str, end_cursor: str, scraped: int):
+        self._cursors[identifier] = {'endCursor': end_cursor, 'scraped': scraped}
+        self._save()
+
+    def remove(self, identifier: str):
+        if self._cursors.pop(identifier, None) is not None:
+            self._save()
+
+    def _save(self):
+        tmp_path = f'{self.filepath}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file_obj:
+            json.dump(self._cursors, file_obj)
+        os.replace(tmp_path, self.filepath)
+
+
+class _FileStore:
+    """Crawl state kept in graph and accounts files, with journals of the
+    changes made since each was last written."""
+
+    def __init__(self, data_dir: str, config: dict, logger: logging.Logger):
+        self.logger = logger
+        graph_extension = GRAPH_FILE_EXTENSIONS[
+            config.get('graph_format', 'GML')
+        ]
+        self.graph_path = path.join(data_dir, f'graph{graph_extension}')
+        self.journal_path = path.join(data_dir, 'graph.journal.jsonl')
+        accounts_extension = ACCOUNTS_FILE_EXTENSIONS[
+            config.get('accounts_format', 'CSV')
+        ]
+        self.accounts_path = path.join(data_dir,
+                                       f'accounts{accounts_extension}')
+        self.follow_cursors = _FollowCursors(
+            path.join(data_dir, 'follow_cursors.json')
+        )
+        self.compact_graph_every = config.get(
+            'graph_journal', {}
+        ).get('compact_every', 100)
+        self.compact_accounts_every = config.get(
+            'accounts_journal', {}
+        ).get('compact_every', 100)
+        self.centrality_cache = CentralityCache(self.graph_path)
+        self.journal = None
+        self.accounts_journal = None
+        self._graph_is_saved = False
+        self._unsaved_scrapes = 0
+        self._journalled_scrapes = 0
+
+    def load(self) -> Tuple[Optional[nx.DiGraph],
+                            Union[List[Account], AccountTable, None]]:
+        # Centrality cached for the graph file only holds for the loaded
+        # graph when there is no journal to replay onto it
+        self._graph_is_saved = not (path.exists(self.journal_path)
+                                    and path.getsize(self.journal_path))
+        return (_load_graph(self.graph_path, self.journal_path, self.logger),
+                _load_accounts(self.accounts_path, self.logger))
+
+    def cached_centrality(self,
+                          centrality_algorithm: str,
+                          backend: str) -> Optional[Centrality]:
+        if not self._graph_is_saved:
+            return None
+        return self.centrality_cache.get(centrality_algorithm,
+                                         backend=backend)
+
+    def cache_centrality(self,
+                         centrality_algorithm: str,
+                         backend: str,
+                         centrality: Centrality):
+        """Caches centrality computed from the graph last saved."""
+        self.centrality_cache.put(centrality_algorithm,
+                                  centrality,
+                                  backend=backend)
+
+    def nothing_to_scrape(self, poorest_centrality_rank: int) -> bool:
+        return False
+
+    def open(self, root: Account = None):
+        """Opens the journals, recording the root of a new crawl."""
+        self.journal = GraphJournal(self.journal_path)
+        if root:
+            self.journal.record_root(root)
+        if self.accounts_path.endswith(ACCOUNTS_FILE_EXTENSION):
+            self.accounts_journal = AccountJournal(
+                account_journal_path(self.accounts_path)
+            )
+
+    def follow_cursor(self, identifier: str) -> Tuple[Optional[str], int]:
+        return self.follow_cursors.get(identifier)
+
+    def record_page(self,
+                    graph: nx.DiGraph,
+                    account: Account,
+                    page: FollowsPage):
+        self.journal.record(page.accounts, account, page.accounts)
+
+        if page.end_cursor:
+            _, scraped = self.follow_cursors.get(account.identifier)
+            self.follow_cursors.set(account.identifier,
+                                    page.end_cursor,
+                                    scraped + len(page.accounts))
+
+    def collect_accounts(self, frontier: Frontier):
+        """What ``save_accounts`` needs of the frontier, taken while the
+        frontier is locked. CSV accounts can only be rewritten whole, so
+        they are collected every ``compact_every`` scrapes rather than
+        journalled."""
+        if self.accounts_journal is None:
+            self._unsaved_scrapes += 1
+            if self._unsaved_scrapes < self.compact_accounts_every:
+                return None
+            self._unsaved_scrapes = 0
+            return frontier.accounts()
+        return frontier.pop_changed()
+
+    def save_accounts(self,
+                      graph: nx.DiGraph,
+                      account: Account,
+                      frontier: Frontier,
+                      collected):
+        """Saves what a completed scrape changed, and rewrites the graph
+        file once ``graph_journal.compact_every`` scrapes are journalled.
+        Journal records are per page, so the graph is only rewritten
+        between accounts."""
+        self.follow_cursors.remove(account.identifier)
+
+        self._journalled_scrapes += 1
+        if self._journalled_scrapes >= self.compact_graph_every:
+            _compact_graph(graph, self.graph_path, self.journal, self.logger)
+            self._journalled_scrapes = 0
+
+        if self.accounts_journal is None:
+            if collected is not None:
+                _save_accounts(collected, self.accounts_path, self.logger)
+            return
+
+        # Only this thread modifies the frontier's table
+        self.accounts_journal.record(frontier.table, collected)
+        if self.accounts_journal.records_written >= self.compact_accounts_every:
+            _compact_accounts(frontier.table,
+                              self.accounts_path,
+                              self.accounts_journal,
+                              self.logger)
+
+    def close(self, graph: Optional[nx.DiGraph], frontier: Optional[Frontier]):
+        if self.journal is None:
+            # Never opened, so nothing was scraped
+            return
+        _compact_graph(graph, self.graph_path, self.journal, self.logger)
+        self.journal.close()
+        if self.accounts_journal is not None:
+            _compact_accounts(frontier.table,
+                              self.accounts_path,
+                              self.accounts_journal,
+                              self.logger)
+            self.accounts_journal.close()
+        elif self._unsaved_scrapes:
+            _save_accounts(frontier.accounts(), self.accounts_path, self.logger)
+            self._unsaved_scrapes = 0
+
+
+class _DatabaseStore:
+    """Crawl state kept in a SQLite database, written a transaction per
+    page of follows and per scraped account."""
+
+    def __init__(self, data_dir: str, config: dict, logger: logging.Logger):
+        self.logger = logger
+        self.database = CrawlDatabase(path.join(data_dir, 'crawl.sqlite'))
+
+    def load(self) -> Tuple[Optional[nx.DiGraph], Optional[AccountTable]]:
+        """The whole graph and all tracked accounts, as centrality is
+        computed from the whole graph. Only ``nothing_to_scrape`` is
+        answered without loading them."""
+        if self.database.is_empty():
+            return None, None
+        self.logger.info(f'Loading crawl state from {self.database.filepath}')
+        return self.database.graph(), self.database.accounts()
+
+    def nothing_to_scrape(self, poorest_centrality_rank: int) -> bool:
+        return (
+            not self.database.is_empty()
+            and self.database.top_scraping_candidate(
+                poorest_centrality_rank
+            ) is None
+        )
+
+    def open(self, root: Account = None):
+        if root:
+            self.database.set_root(root)
+
+    def follow_cursor(self, identifier: str) -> Tuple[Optional[str], int]:
+        return self.database.follow_cursor(identifier)
+
+    def record_page(self,
+                    graph: nx.DiGraph,
+                    account: Account,
+                    page: FollowsPage):
+        _, scraped = self.database.follow_cursor(account.identifier)
+        self.database.add_follows(account,
+                                  page.accounts,
+                                  page.end_cursor,
+                                  scraped + len(page.accounts))
+
+    def collect_accounts(self, frontier: Frontier) -> List[Account]:
+        return [frontier[identifier] for identifier in frontier.pop_changed()]
+
+    def save_accounts(self,
+                      graph: nx.DiGraph,
+                      account: Account,
+                      frontier: Frontier,
+                      collected: List[Account]):
+        self.database.upsert_accounts(collected)
+
+    def cached_centrality(self,
+                          centrality_algorithm: str,
+                          backend: str) -> Optional[Centrality]:
+        return None
+
+    def cache_centrality(self,
+                         centrality_algorithm: str,
+                         backend: str,
+                         centrality: Centrality):
+        pass
+
+    def close(self, graph: Optional[nx.DiGraph], frontier: Optional[Frontier]):
+        self.database.close()
+
+
+def _scrape_followed_pages(
+    account: Account,
+    session: '_Session',
+    end_cursor: Optional[str],
+    scraped: int,
+    config: dict,
+    logger: logging.Logger,
+) -> Iterator[FollowsPage]:
+    logger.info(
+        f"Scraping accounts followed by {account.username}..."
+    )
+    try:
+        yield from followed_account_pages(account,
+                                          session.client,
+                                          config=config,
+                                          logger=logger,
+                                          end_cursor=end_cursor,
+                                          scraped=scraped,
+                                          rate_limiter=session.rate_limiter,
+                                          cache=session.cache)
+    except NotFound:
+        logger.warning(f"Could not find followed accounts for account {account.username}")
+        yield FollowsPage([], '')
+
+
+class _Pacing:
+    """Sleeps after each scraped account, and for longer after each randomly
+    sized batch of accounts. Does nothing when requests are paced by a rate
+    limiter instead."""
+
+    def __init__(self, config: dict, logger: logging.Logger):
+        self.config = config
+        self.logger = logger
+        self.rate_limited = 'rate_limits' in config
+        self._start_batch()
+
+    def _start_batch(self):
+        self.scraped_this_batch = 0
+        self.max_scraped_this_batch = random.randint(
+            self.config['accounts_per_batch']['minimum'],
+            self.config['accounts_per_batch']['maximum'],
+        )
+
+    def next_sleep(self) -> Optional[dict]:
+        """The range of the sleep to take after scraping an account."""
+        if self.rate_limited:
+            return None
+
+        self.scraped_this_batch += 1
+        if self.scraped_this_batch < self.max_scraped_this_batch:
+            return self.config['sleep']['between_accounts']
+        self._start_batch()
+        return self.config['sleep']['between_account_batches']
+
+    def sleep(self):
+        sleep_range = self.next_sleep()
+        if sleep_range:
+            random_sleep(**sleep_range, logger=self.logger)
+
+
+class _CrawlState:
+    """The graph and accounts being crawled, updated with each account's
+    scraped follows and persisted by a store."""
+
+    def __init__(self,
+                 graph: nx.DiGraph,
+                 frontier: Frontier,
+                 store: Union[_FileStore, _DatabaseStore],
+                 poorest_centrality_rank: int,
+                 config: dict,
+                 logger: logging.Logger):
+        self.graph = graph
+        self.frontier = frontier
+        self.store = store
+        self.poorest_centrality_rank = poorest_centrality_rank
+        self.logger = logger
+        centrality_config = dict(config.get('centrality', {}))
+        self.centrality_algorithm = centrality_config.pop(
+            'algorithm', EIGENVECTOR_CENTRALITY
+        )
+        self.incremental_centrality = IncrementalCentrality(
+            **centrality_config
+        )
+        cached = store.cached_centrality(
+            self.centrality_algorithm, self.incremental_centrality.backend
+        )
+        if cached is not None:
+            logger.info(f'Loaded cached {self.centrality_algorithm}.')
+            self.incremental_centrality.seed(graph,
+                                             self.centrality_algorithm,
+                                             cached)
+        self.ingest_counts = IngestCounts()
+
+    def record_page(self, account: Account, page: FollowsPage):
+        """Adds a page of follows to the graph and stores it, with the
+        cursor from which the account's scrape would resume."""
+        logger = self.logger
+
+        logger.info(f"Adding {len(page.accounts)} follows to graph...")
+        counts = ingest_follows(self.graph, account, page.accounts)
+        self.ingest_counts += counts
+        logger.info(
+            f"{counts.new_nodes} new, {counts.updated_nodes} updated and "
+            f"{counts.unchanged_nodes} unchanged accounts, "
+            f"{counts.new_edges} new follows. "
+            f"{self.ingest_counts.saturation:.0%} of accounts found so far "
+            f"were already in the graph."
+        )
+        self.store.record_page(self.graph, account, page)
+
+    def record_scrape(self, account: Account, frontier_lock=nullcontext()):
+        """Updates the frontier's accounts once all pages of an account's
+        follows are recorded. The frontier is only modified while holding
+        ``frontier_lock``."""
+        logger = self.logger
+
+        logger.info(
+            "Detemining which highy ranked followed accounts are new..."
+        )
+        centrality_from_graph(self.graph,
+                              logger,
+                              self.incremental_centrality,
+                              self.centrality_algorithm)
+        updated_centrality = self.incremental_centrality.updated(self.graph)
+
+        with frontier_lock:
+            self.frontier.mark_scraped(account.identifier)
+            self.frontier.update_centrality(updated_centrality)
+            accounts_to_add = [
+                _account_from_node(self.graph, identifier, centrality)
+                for identifier, centrality in self.frontier.newly_relevant(
+                    self.poorest_centrality_rank
+                )
+            ]
+            logger.info(
+                f"Adding {len(accounts_to_add)} relevent followed accounts to CSV."
+            )
+            self.frontier.add(*accounts_to_add)
+            collected = self.store.collect_accounts(self.frontier)
+
+        self.store.save_accounts(self.graph,
+                                 account,
+                                 self.frontier,
+                                 collected)
+
+    def close(self):
+        self.store.close(self.graph, self.frontier)
+        centrality = self.incremental_centrality.latest(
+            self.graph, self.centrality_algorithm
+        )
+        if centrality is not None:
+            self.store.cache_centrality(self.centrality_algorithm,
+                                        self.incremental_centrality.backend,
+                                        centrality)
+
+
+class _Session(NamedTuple):
+    client: instagrapi.Client
+    rate_limiter: Optional[CredentialRateLimiter]
+    cache: Optional[ResponseCache] = None
+
+
+_WORKER_FINISHED = object()
+_SCRAPE_FAILED = object()
+
+# An account is set aside after this many failed scrapes, and a worker stops
+# after failing this many times in a row
+MAX_SCRAPE_ATTEMPTS = 3
+# Failing workers back off for up to 2 ** MAX_BACKOFF_DOUBLINGS times the
+# sleep between accounts
+MAX_BACKOFF_DOUBLINGS = 4
+
+
+def _backoff_range(config: dict, failures: int) -> dict:
+    sleep_range = config['sleep']['between_accounts']
+    factor = 2 ** min(failures - 1, MAX_BACKOFF_DOUBLINGS)
+    return {'minimum': sleep_range['minimum'] * factor,
+            'maximum': sleep_range['maximum'] * factor}
+
+
+def _scrape_failed(frontier: Frontier,
+                   account: Account,
+                   failed_attempts: Dict[str, int],
+                   logger: logging.Logger):
+    """Releases an account whose scrape failed to be claimed again, or sets
+    it aside once it has failed ``MAX_SCRAPE_ATTEMPTS`` times."""
+    failed_attempts[account.identifier] += 1
+    if failed_attempts[account.identifier] < MAX_SCRAPE_ATTEMPTS:
+        frontier.release(account.identifier)
+    else:
+        logger.error(
+            f"Setting {account.username} aside after "
+            f"{MAX_SCRAPE_ATTEMPTS} failed scrapes."
+        )
+        frontier.set_aside(account.identifier)
+
+
+def _crawl_concurrently(crawl: _CrawlState,
+                        sessions: List[_Session],
+                        config: dict,
+                        logger: logging.Logger):
+    """Scrapes with one worker thread per client, each claiming candidates
+    from the shared frontier and pacing its own requests. Pages of scraped
+    follows are passed back to this thread, the only one that writes the
+    crawl state, followed by ``None`` once an account is fully scraped.
+
+    A worker whose scrape fails backs off and carries on, resuming from the
+    pages already recorded when the account is claimed again. Any other
+    error in a worker is raised in this thread."""
+    frontier = crawl.frontier
+    frontier_condition = threading.Condition()
+    results = queue.Queue()
+
+    def worker(session: _Session):
+        try:
+            scrape_claimed_accounts(session)
+        except Exception as error:
+            results.put(error)
+        finally:
+            results.put(_WORKER_FINISHED)
+
+    def scrape_claimed_accounts(session: _Session):
+        pacing = _Pacing(config, logger)
+        failures = 0
+
+        while True:
+            with frontier_condition:
+                account = frontier.claim(crawl.poorest_centrality_rank)
+                # Claimed accounts still being scraped may add candidates
+                while account is None and frontier.claimed:
+                    frontier_condition.wait()
+                    account = frontier.claim(crawl.poorest_centrality_rank)
+
+                if account is not None:
+                    end_cursor, scraped = crawl.store.follow_cursor(
+                        account.identifier
+                    )
+
+            if account is None:
+                break
+
+            logger.info(f"Selected {account.username} for scraping.")
+            cached = True
+            try:
+                for page in _scrape_followed_pages(account,
+                                                   session,
+                                                   end_cursor,
+                                                   scraped,
+                                                   config,
+                                                   logger):
+                    cached = cached and page.cached
+                    results.put((account, page))
+            except Exception:
+                failures += 1
+                results.put((account, _SCRAPE_FAILED))
+                if failures >= MAX_SCRAPE_ATTEMPTS:
+                    logger.exception(
+                        f"Scraping {account.username} failed, {failures} "
+                        f"failures in a row. Stopping worker."
+                    )
+                    break
+                logger.exception(
+                    f"Scraping {account.username} failed. Backing off."
+                )
+                random_sleep(**_backoff_range(config, failures), logger=logger)
+                continue
+
+            failures = 0
+            results.put((account, None))
+            if not cached:
+                pacing.sleep()
+
+    threads = [
+        threading.Thread(target=worker, args=(session,), daemon=True)
+        for session in sessions
+    ]
+    for thread in threads:
+        thread.start()
+
+    failed_attempts = defaultdict(int)
+    workers_running = len(threads)
+    while workers_running:
+        result = results.get()
+        if result is _WORKER_FINISHED:
+            workers_running -= 1
+            continue
+        if isinstance(result, Exception):
+            # Other workers may wait forever on the failed worker's claim
+            raise result
+
+        account, page = result
+        if page is _SCRAPE_FAILED:
+            with frontier_condition:
+                _scrape_failed(frontier, account, failed_attempts, logger)
+        elif page is None:
+            crawl.record_scrape(account, frontier_condition)
+        else:
+            crawl.record_page(account, page)
+            continue
+
+        with frontier_condition:
+            frontier_condition.notify_all()
+
+    for thread in threads:
+        thread.join()
+
+
+def _crawl_asynchronously(crawl: _CrawlState,
+                          sessions: List[_Session],
+                          config: dict,
+                          logger: logging.Logger):
+    """As ``_crawl_concurrently``, with one task per client on an event loop
+    in this thread rather than a thread per client. Blocking client calls
+    run in the loop's executor, and pages are recorded by the task that
+    scraped them, between awaits, so the crawl state still has one writer.
+    The response cache is not used."""
+    asyncio.run(_crawl_tasks(crawl, sessions, config, logger))
+
+
+async def _crawl_tasks(crawl: _CrawlState,
+                       sessions: List[_Session],
+                       config: dict,
+                       logger: logging.Logger):
+    frontier = crawl.frontier
+    frontier_changed = asyncio.Condition()
+    failed_attempts = defaultdict(int)
+
+    async def scrape(account: Account, session: _Session):
+        logger.info(f"Scraping accounts followed by {account.username}...")
+        end_cursor, scraped = crawl.store.follow_cursor(account.identifier)
+        try:
+            async for page in async_scraping.followed_account_pages(
+                account,
+                session.client,
+                config=config,
+                logger=logger,
+                end_cursor=end_cursor,
+                scraped=scraped,
+                rate_limiter=session.rate_limiter,
+            ):
+                crawl.record_page(account, page)
+        except NotFound:
+            logger.warning(
+                f"Could not find followed accounts for account "
+                f"{account.username}"
+            )
+            crawl.record_page(account, FollowsPage([], ''))
+
+    async def worker(session: _Session):
+        pacing = _Pacing(config, logger)
+        failures = 0
+
+        while True:
+            async with frontier_changed:
+                account = frontier.claim(crawl.poorest_centrality_rank)
+                # Claimed accounts still being scraped may add candidates
+                while account is None and frontier.claimed:
+                    await frontier_changed.wait()
+                    account = frontier.claim(crawl.poorest_centrality_rank)
+            if account is None:
+                return
+
+            logger.info(f"Selected {account.username} for scraping.")
+            try:
+                await scrape(account, session)
+            except Exception:
+                failures += 1
+                _scrape_failed(frontier, account, failed_attempts, logger)
+                async with frontier_changed:
+                    frontier_changed.notify_all()
+                if failures >= MAX_SCRAPE_ATTEMPTS:
+                    logger.exception(
+                        f"Scraping {account.username} failed, {failures} "
+                        f"failures in a row. Stopping worker."
+                    )
+                    return
+                logger.exception(
+                    f"Scraping {account.username} failed. Backing off."
+                )
+                await async_scraping.random_sleep(
+                    **_backoff_range(config, failures), logger=logger
+                )
+                continue
+
+            failures = 0
+            crawl.record_scrape(account)
+            async with frontier_changed:
+                frontier_changed.notify_all()
+            sleep_range = pacing.next_sleep()
+            if sleep_range:
+                await async_scraping.random_sleep(**sleep_range,
+                                                  logger=logger)
+
+    await asyncio.gather(*(worker(session) for session in sessions))
+
+
+STATE_BACKENDS = {
+    'FILES': _FileStore,
+    'SQLITE': _DatabaseStore,
+}
+
+
 def _get_logger(data_dir, log_level: str) -> logging.Logger:
     return initialise_logger(data_dir,
                              'log',
@@ -92,6 +835,24 @@ def _load_config(config_path):
     )
 )
 @click.option('--scraping-username', '-s', type=str)
+@click.option(
+    '--concurrent',
+    is_flag=True,
+    help=(
+        'Scrape with every account in the config\'s ig_credentials at once, '
+        'each paced independently.'
+    )
+)
+@click.option(
+    '--asyncio',
+    'use_asyncio',
+    is_flag=True,
+    help=(
+        'Scrape concurrently, as with --concurrent, on one asyncio event '
+        'loop rather than a thread per account. Cached responses are not '
+        'used.'
+    )
+)
 @click.option('--config-path', '-c', type=str, default='./config.yaml')
 @click.option('--log-level', '-l', type=str, default='INFO')
 def scrape_following_graph_command(
@@ -99,6 +860,8 @@ def scrape_following_graph_command(
     username,
     poorest_centrality_rank,
     scraping_username,
+    concurrent,
+    use_asyncio,
     config_path,
     log_level
 ):
@@ -107,7 +870,9 @@ def scrape_following_graph_command(
                            poorest_centrality_rank,
                            scraping_username,
                            config_path,
-                           log_level)
+                           log_level,
+                           concurrent,
+                           use_asyncio)
 
 
 def scrape_following_graph(data_dir: str,
@@ -115,29 +880,49 @@ def scrape_following_graph(data_dir: str,
                            poorest_centrality_rank: int,
                            scraping_username: Union[str, None],
                            config_path: str,
-                           log_level: str):
+                           log_level: str,
+                           concurrent: bool = False,
+                           use_asyncio: bool = False):
 
     # Create data directory if absent
     Path(data_dir).mkdir(parents=True, exist_ok=True)
-    accounts_path = path.join(data_dir, 'accounts.csv')
-    graph_path = path.join(data_dir, 'graph.gml')
 
     config = _load_config(config_path)
     logger = _get_logger(data_dir, log_level)
 
-    if scraping_username:
-        credentials = next(
+    store = STATE_BACKENDS[config.get('state_backend', 'FILES')](data_dir,
+                                                                 config,
+                                                                 logger)
+    if not username and store.nothing_to_scrape(poorest_centrality_rank):
+        store.close(None, None)
+        logger.info("All relevantly high ranking accounts scraped. Exiting.")
+        return
+
+    if concurrent or use_asyncio:
+        all_credentials = config['ig_credentials']
+    elif scraping_username:
+        all_credentials = [next(
             creds for creds in config['ig_credentials'] 
             if creds['username'] == scraping_username
-        )
+        )]
     else:
-        credentials = random.choice(config['ig_credentials'])
+        all_credentials = [random.choice(config['ig_credentials'])]
 
-    logger.info(f'Authenticating as {credentials["username"]}')
-    ig_client = get_authenticated_client(**credentials)
+    rate_limiter = (
+        RateLimiter(config['rate_limits']) if 'rate_limits' in config else None
+    )
+    cache = response_cache_from_config(config, data_dir)
+    sessions = []
+    for credentials in all_credentials:
+        logger.info(f'Authenticating as {credentials["username"]}')
+        sessions.append(_Session(
+            get_authenticated_client(**credentials),
+            rate_limiter and rate_limiter.for_credential(credentials['username']),
+            cache,
+        ))
+    session = sessions[0]
 
-    graph = _load_graph(graph_path, logger)
-    accounts = _load_accounts(accounts_path, logger)
+    graph, accounts = store.load()
 
     data_present = bool(graph) and accounts is not None
 
@@ -151,73 +936,57 @@ def scrape_following_graph(data_dir: str,
         logger.info(
             "Data present in directory. Looking for scraping candidate..."
         )
-        account = top_scraping_candidate(accounts,
-                                         poorest_centrality_rank)
+        frontier = Frontier(accounts)
+        account = frontier.top_candidate(poorest_centrality_rank)
 
     else:
         logger.info("Data not present in directory.")
         account = account_by_username(username,
-                                      ig_client,
+                                      session.client,
+                                      rate_limiter=session.rate_limiter,
+                                      cache=session.cache,
                                       config=config,
                                       logger=logger)
-        accounts = [account]
+        frontier = Frontier([account])
         graph = nx.DiGraph()
-        add_nodes(graph, account)
-
-    sleep_between_account_batches = config['sleep']['between_account_batches']
-    sleep_between_accounts = config['sleep']['between_accounts']
-    min_accounts_per_batch = config['accounts_per_batch']['minimum']
-    max_accounts_per_batch = config['accounts_per_batch']['maximum']
-
-    max_scraped_this_batch = random.randint(min_accounts_per_batch,
-                                            max_accounts_per_batch)
-    scraped_this_batch = 0
-
-    while account:
-        logger.info(
-            f"Scraping accounts followed by {account.username}..."
-        )
-        try:
-            followed = list(
-                followed_accounts(account, ig_client, config=config, logger=logger)
-            )
-        except NotFound:
-            logger.warning(f"Could not find followed accounts for account {account.username}")
-            followed = []
-        logger.info(f"Scraped {len(followed)} accounts.")
-
-        logger.info("Adding new follows to graph...")
-        add_nodes(graph, *followed)
-        add_edges(graph, account, followed)
-        save_graph_gml(graph, graph_path, logger)
-
-        logger.info(
-            "Detemining which highy ranked followed accounts are new..."
-        )
-        all_accounts = list(accounts_from_graph(graph, logger))
-        accounts_to_add = list(
-            relevant_new_accounts(accounts, all_accounts, poorest_centrality_rank)
-        )
+        set_root(graph, account)
 
-        logger.info(
-            f"Adding {len(accounts_to_add)} relevent followed accounts to CSV."
-        )
-        accounts_updated = record_date_scraped(accounts, account)
-        relevant_accounts = chain(accounts_updated, accounts_to_add)
-        accounts = update_centrality(relevant_accounts, all_accounts)
-        _save_accounts(accounts, accounts_path, logger)
+    store.open(root=None if data_present else account)
 
-        account = top_scraping_candidate(accounts,
-                                         poorest_centrality_rank)
+    crawl = _CrawlState(graph,
+                        frontier,
+                        store,
+                        poorest_centrality_rank,
+                        config,
+                        logger)
 
-        scraped_this_batch += 1
-        if scraped_this_batch < max_scraped_this_batch:
-            random_sleep(**sleep_between_accounts, logger=logger)
+    # What was scraped is saved even if the crawl fails
+    try:
+        if use_asyncio:
+            _crawl_asynchronously(crawl, sessions, config, logger)
+        elif concurrent:
+            _crawl_concurrently(crawl, sessions, config, logger)
         else:
-            random_sleep(**sleep_between_account_batches, logger=logger)
-            scraped_this_batch = 0
-            max_scraped_this_batch = random.randint(min_accounts_per_batch,
-                                                    max_accounts_per_batch)
+            pacing = _Pacing(config, logger)
+
+            while account:
+                logger.info(f"Selected {account.username} for scraping.")
+                end_cursor, scraped = store.follow_cursor(account.identifier)
+                cached = True
+                for page in _scrape_followed_pages(account,
+                                                   session,
+                                                   end_cursor,
+                                                   scraped,
+                                                   config,
+                                                   logger):
+                    cached = cached and page.cached
+                    crawl.record_page(account, page)
+                crawl.record_scrape(account)
+                account = frontier.top_candidate(poorest_centrality_rank)
+                if not cached:
+                    pacing.sleep()
+    finally:
+        crawl.close()
 
     logger.info("All relevantly high ranking accounts scraped. Exiting.")
 
@@ -228,36 +997,83 @@ def record_date_scraped(
 
     for account in all_accounts:
         if account.identifier == scraped_account.identifier:
-            account_data = asdict(account)
-            account_data['date_scraped'] = datetime.utcnow()
-            yield Account(**account_data)
+            yield replace(account, date_scraped=datetime.utcnow())
         else:
             yield account
 
 
-def accounts_from_graph(graph: nx.DiGraph,
-                        logger: logging.Logger) -> Iterator[Account]:
+# Approximate PageRank always terminates, as in-degree does, but stays
+# personalized to the root
+FALLBACK_CENTRALITY_ALGORITHMS = {
+    PERSONALIZED_PAGERANK_CENTRALITY: APPROXIMATE_PAGERANK_CENTRALITY,
+}
+
+
+def centrality_from_graph(
+    graph: nx.DiGraph,
+    logger: logging.Logger,
+    incremental: IncrementalCentrality,
+    centrality_algorithm: str = EIGENVECTOR_CENTRALITY,
+) -> Dict[str, float]:
+    """Centrality of every node, by the fallback algorithm if the
+    configured one fails to converge."""
+    try:
+        return incremental(graph, centrality_algorithm)
+
+    except PowerIterationFailedConvergence:
+        fallback_algorithm = FALLBACK_CENTRALITY_ALGORITHMS.get(
+            centrality_algorithm, IN_DEGREE_CENTRALITY
+        )
+        logger.warning(
+            f"Convergence failed for {centrality_algorithm}. "
+            f"Falling back on {fallback_algorithm}."
+        )
+        return incremental(graph, fallback_algorithm)
+
+
+def _account_from_node(graph: nx.DiGraph,
+                       identifier: str,
+                       centrality: float) -> Account:
+    attributes = graph.nodes[identifier]
+    return Account(identifier=identifier,
+                   username=attributes.get('username'),
+                   full_name=attributes.get('fullName'),
+                   centrality=centrality)
+
+
+def accounts_from_graph(
+    graph: nx.DiGraph,
+    logger: logging.Logger,
+    incremental: IncrementalCentrality = None,
+    centrality_algorithm: str = EIGENVECTOR_CENTRALITY,
+) -> Iterator[Account]:
     try:
-        yield from accounts_with_centrality(graph, EIGENVECTOR_CENTRALITY)
+        yield from accounts_with_centrality(graph,
+                                            centrality_algorithm,
+                                            incremental)
 
     except PowerIterationFailedConvergence:
+        fallback_algorithm = FALLBACK_CENTRALITY_ALGORITHMS.get(
+            centrality_algorithm, IN_DEGREE_CENTRALITY
+        )
         logger.warning(
-            "Convergence failed for eigenvector centrality algorithm. "
-            "Falling back on in-degree algorithm."
+            f"Convergence failed for {centrality_algorithm}. "
+            f"Falling back on {fallback_algorithm}."
         )
-        yield from accounts_with_centrality(graph, IN_DEGREE_CENTRALITY)
+        yield from accounts_with_centrality(graph,
+                                            fallback_algorithm,
+                                            incremental)
 
 
 def relevant_new_accounts(existing_accounts: List[Account],
                               all_accounts: List[Account],
                               accounts_retained: int) -> List[Account]:
 
-    accounts_by_centrality = sorted(all_accounts,
-                                    key=lambda a: a.centrality,
-                                    reverse=True)
     relevant_ids = set(
         account.identifier
-        for account in islice(accounts_by_centrality, accounts_retained)
+        for account in nlargest(accounts_retained,
+                                all_accounts,
+                                key=attrgetter('centrality'))
     )
     existing_ids = set(account.identifier for account in existing_accounts)
     new_account_ids = relevant_ids.difference(existing_ids)
@@ -284,9 +1100,7 @@ def _centrality_from_new(old: Iterable[Account],
         new_account = new_accounts_map.get(identifier)
 
         if new_account:
-            account_data = asdict(old_account)
-            account_data['centrality'] = new_account.centrality
-            yield Account(**account_data)
+            yield replace(old_account, centrality=new_account.centrality)
 
         else:
             yield old_account
@@ -294,17 +1108,7 @@ def _centrality_from_new(old: Iterable[Account],
 
 def top_scraping_candidate(accounts: Iterable[Account],
                            total_scraped: int) -> Account:
-    sorted_accounts = sorted(accounts,
-                             key=attrgetter('centrality'),
-                             reverse=True)
-    top_accounts = islice(sorted_accounts, total_scraped)
-    
-    for i, account in enumerate(top_accounts, start=1):
-        if not account.date_scraped:
-            print(f"Selected {account.username} (ranked {i}) for scraping")
-            return account
-
-    return None
+    return Frontier(accounts).top_candidate(total_scraped)
 
 if __name__ == '__main__':
     scrape_following_graph_command()
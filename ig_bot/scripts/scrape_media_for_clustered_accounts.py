@@ -1,3 +1,4 @@
+from concurrent.futures import Future
 from datetime import datetime
 import json
 from logging import Logger
@@ -14,10 +15,18 @@ import pandas as pd
 import requests
 import yaml
 
+from downloads import CHUNK_BYTES, DownloadEngine
+from media_manifest import MANIFEST_FILENAME, MediaManifest
+from rate_limiting import CredentialRateLimiter, RateLimiter
+from scheduling import run_sharded
 from scraping import random_sleep
+from shared_data import scan_shared_data
 from scripts.util import initialise_logger
 
 
+# Failing workers back off for up to 2 ** MAX_BACKOFF_DOUBLINGS times the failure sleep
+MAX_BACKOFF_DOUBLINGS = 4
+
 COMMON_USER_AGENTS = (
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/80.0.3987.149 Safari/537.36',
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/80.0.3987.163 Safari/537.36',
@@ -40,6 +49,23 @@ def media_json_from_html(html: BeautifulSoup) -> str or None:
                 return json.loads(line[20:-1])
 
 
+def shared_data_from_response(response: requests.Response) -> dict or None:
+    """Shared data sliced from the page as it is received, or found by parsing
+    the whole page if that fails."""
+    chunks = response.iter_content(CHUNK_BYTES)
+    all_data, content = scan_shared_data(chunks)
+    if all_data is not None:
+        # The rest of the page is dropped unread along with the connection,
+        # which costs less than receiving it
+        response.close()
+        return all_data
+
+    # Only parsing needs the whole page
+    content += b''.join(chunks)
+    html = content.decode(response.encoding or 'utf-8', errors='replace')
+    return media_json_from_html(BeautifulSoup(html, features="html.parser"))
+
+
 def images(data: dict, user_id: str) -> Generator[Tuple[str, str], None, None]:
     image_id = data["id"]
     sidecar_images = data.get("edge_sidecar_to_children", {}).get("edges")
@@ -62,16 +88,26 @@ def media_data(data: dict, user_id: str) -> Tuple[str, str]:
     return  f"{user_id}/images/{image_id}/data.json", media_data
 
 
-def save_web_image(filepath: str, url: str, user_agent: str, config: dict, logger: Logger):
+def save_web_image(filepath: str, url: str, user_agent: str, downloads: DownloadEngine,
+                   logger: Logger) -> Future:
     logger.info(f"Saving image to {filepath}")
-
-    response = requests.get(url, headers={"User-agent": user_agent})
-    
-    Path(path.dirname(filepath)).mkdir(parents=True, exist_ok=True)
-    with open(filepath, "wb") as file_handle:
-       file_handle.write(response.content)
-
-    random_sleep(logger=logger, **config['sleep_ranges']['after_saving_image'])
+    return downloads.download(filepath, url, headers={"User-agent": user_agent})
+
+
+def download_engine(config: dict, logger: Logger,
+                    rate_limiter: CredentialRateLimiter = None) -> DownloadEngine:
+    """Downloads images as configured by the optional ``media_downloads``
+    section, pacing each host slot by the rate limiter or by sleeping after
+    each image."""
+    downloads_config = config.get('media_downloads', {})
+    return DownloadEngine(
+        logger,
+        workers=downloads_config.get('workers', 4),
+        per_host=downloads_config.get('per_host', 2),
+        rate_limiter=rate_limiter,
+        endpoint='image',
+        pace=lambda: random_sleep(logger=logger, **config['sleep_ranges']['after_saving_image']),
+    )
 
 
 def save_text(filepath: str, text: str, logger: Logger):
@@ -83,11 +119,24 @@ def save_text(filepath: str, text: str, logger: Logger):
         file_handle.write(text)
 
 
-def scrape_shortlink_media(url:str, user_id: str, data_path: str, config: dict, logger: Logger):
+def scrape_shortlink_media(url:str, user_id: str, data_path: str, downloads: DownloadEngine,
+                           manifest: MediaManifest, logger: Logger,
+                           rate_limiter: CredentialRateLimiter = None):
+    if manifest.media_completed(url):
+        logger.info(f"Skipping {url} as media already saved")
+        return
+
     user_agent = random.choice(COMMON_USER_AGENTS)
-    response = requests.get(url, headers={"User-Agent": user_agent})
-    soup = BeautifulSoup(response.text, features="html.parser")
-    all_data = media_json_from_html(soup)
+    if rate_limiter:
+        rate_limiter.acquire('post_page', logger)
+    with downloads.session.get(url, headers={"User-Agent": user_agent}, stream=True) as response:
+        if response.status_code == 429:
+            if rate_limiter:
+                rate_limiter.record_rate_limited('post_page', logger)
+            response.raise_for_status()
+        if rate_limiter:
+            rate_limiter.record_success('post_page')
+        all_data = shared_data_from_response(response)
 
     if not all_data:
         logger.warning(f'Failed to find hard-coded media data at {url}')
@@ -97,9 +146,102 @@ def scrape_shortlink_media(url:str, user_id: str, data_path: str, config: dict,
     full_media_data_path = path.join(data_path, media_data_path)
     save_text(full_media_data_path, json.dumps(data), logger)
 
-    for image_path, image_url in images(data, user_id):
-        full_image_path = path.join(data_path, image_path)
-        save_web_image(full_image_path, image_url, user_agent, config, logger)
+    post_images = list(images(data, user_id))
+    manifest.record_media(
+        url,
+        user_id,
+        data["id"],
+        media_data_path,
+        data.get("taken_at_timestamp"),
+        [(image_path, path.basename(path.dirname(image_path)), image_url)
+         for image_path, image_url in post_images],
+    )
+
+    # Sidecar children download concurrently
+    saved_images = [
+        (image_path,
+         save_web_image(path.join(data_path, image_path), image_url, user_agent, downloads, logger))
+        for image_path, image_url in post_images
+    ]
+    sizes = []
+    failure = None
+    for image_path, saved_image in saved_images:
+        try:
+            sizes.append((image_path, path.getsize(saved_image.result())))
+        except Exception as error:
+            failure = failure or error
+    manifest.record_images_saved(sizes)
+    if failure:
+        raise failure
+    manifest.complete_media(url)
+
+
+def scrape_account_media(account, ig_client: Instagram, data_directory_path: str,
+                         downloads: DownloadEngine, manifest: MediaManifest, config: dict,
+                         logger: Logger, rate_limiter: CredentialRateLimiter = None):
+    """Saves an account's media and marks the account completed. Raises if its media can't be
+    listed, so that it can be retried."""
+    logger.info(f'Getting media for {account.username}...')
+    if rate_limiter:
+        rate_limiter.acquire('user_media', logger)
+    try:
+        media = ig_client.get_medias_by_user_id(
+            id=account.identifier,
+            count=config['scraping']['max_media_items_per_account']
+        )
+        if rate_limiter:
+            rate_limiter.record_success('user_media')
+    except InstagramException:
+        logger.exception(f"Failed to get media data for user {account.username}.")
+        if rate_limiter:
+            rate_limiter.record_rate_limited('user_media', logger)
+        raise
+    except TypeError:
+        logger.exception(f"Probable unexpected NoneType when getting media for {account.username}.")
+        media = []
+
+    for media_object in media:
+        try:
+            scrape_shortlink_media(
+                media_object.link,
+                account.identifier,
+                data_directory_path,
+                downloads,
+                manifest,
+                logger,
+                rate_limiter,
+            )
+        except Exception:
+            logger.exception(f"Failed to dowload media for {account.username} at {media_object.link}.")
+            continue
+
+    manifest.complete_account(account.identifier)
+
+
+class _MediaPacing:
+    """Sleeps after each account a worker scrapes, and for longer after each randomly sized
+    round of accounts."""
+
+    def __init__(self, config: dict, logger: Logger):
+        self.config = config
+        self.logger = logger
+        self._start_round()
+
+    def _start_round(self):
+        self.scraped_this_round = 0
+        self.accounts_this_round = random.randint(
+            self.config["accounts_scraped_per_round"]["minimum"],
+            self.config["accounts_scraped_per_round"]["maximum"]
+        )
+
+    def sleep(self):
+        random_sleep(logger=self.logger, **self.config['sleep_ranges']['after_scraping_user_media'])
+
+        self.scraped_this_round += 1
+        if self.scraped_this_round == self.accounts_this_round:
+            random_sleep(logger=self.logger,
+                         **self.config['sleep_ranges']['between_media_scraping_rounds'])
+            self._start_round()
 
 
 @click.command()
@@ -133,11 +275,30 @@ def scrape_shortlink_media(url:str, user_id: str, data_path: str, config: dict,
     default=0,
     help='The minimum centrality of accounts for which you want media scraped.'
 )
+@click.option(
+    '--workers',
+    '-w',
+    type=int,
+    default=1,
+    help='The number of accounts scraped at once, each by its own client.'
+)
+@click.option(
+    '--max-attempts',
+    '-a',
+    type=int,
+    default=3,
+    help=(
+        'The number of times scraping an account is attempted before it is '
+        'given up on and saved to a dead letters CSV file in the logs directory.'
+    )
+)
 def save_media(
         log_level: str,
         csv_file_path: str,
         cluster_indices: str,
         min_centrality: float,
+        workers: int,
+        max_attempts: int,
 ):
     """Scrapes Instagram for media and comments for some or all clustered
     accounts in a CSV file.
@@ -167,69 +328,77 @@ def save_media(
 
     accounts = accounts[accounts['centrality'] >= min_centrality]
 
-    ig_client = Instagram()
-    
-    accounts_this_round = random.randint(
-        config["accounts_scraped_per_round"]["minimum"],
-        config["accounts_scraped_per_round"]["maximum"]
+    Path(data_directory_path).mkdir(parents=True, exist_ok=True)
+    manifest = MediaManifest(path.join(data_directory_path, MANIFEST_FILENAME))
+    imported = manifest.import_completed_markers(data_directory_path, accounts['identifier'])
+    if imported:
+        logger.info(f"Recorded {imported} accounts marked completed in the manifest")
+    imported = manifest.import_saved_media(data_directory_path)
+    if imported:
+        logger.info(f"Recorded {imported} posts saved before the manifest in it")
+
+    # Requests are paced by token buckets rather than sleeps when configured
+    rate_limiter = (
+        RateLimiter(config['rate_limits']).for_credential('anonymous')
+        if 'rate_limits' in config else None
     )
-    counter = 0
+    
+    downloads = download_engine(config, logger, rate_limiter)
 
+    pending = []
     for account in accounts.itertuples():
-
-        scraping_completed_filepath = path.join(data_directory_path, str(account.identifier), "completed")
-        if path.exists(scraping_completed_filepath):
+        if manifest.account_completed(account.identifier):
             logger.info(f"Skipping account {account.username} as media already scraped")
-            continue 
-
-        logger.info(f'Getting media for {account.username}...')
-        instagram_success = False
-        while not instagram_success:
-            try:
-                media = ig_client.get_medias_by_user_id(
-                    id=account.identifier,
-                    count=config['scraping']['max_media_items_per_account']
-                )
-                instagram_success = True
-            except InstagramException:
-                logger.exception(f"Failed to get media data for user {account.username}.")
-                random_sleep(logger=logger, **config['sleep_ranges']['after_igramscraper_failure'])
-            except TypeError:
-                logger.exception(f"Probable unexpected NoneType when getting media for {account.username}.")
-                break
-            except Exception:
-                logger.exception(f"Unexpected failure in getting media data for user {account.username}.")
-                raise
-
-        if instagram_success:
-            for media_object in media:
-                try:
-                    scrape_shortlink_media(
-                        media_object.link,
-                        account.identifier,
-                        data_directory_path,
-                        config,
-                        logger
-                    )
-                except Exception:
-                    logger.exception(f"Failed to dowload media for {account.username} at {media_object.link}.")
-                    continue
-
-        Path(path.dirname(scraping_completed_filepath)).mkdir(parents=True, exist_ok=True)
-        with open(scraping_completed_filepath, "w") as file_obj:
-            file_obj.write(":-)\n")
-
-        random_sleep(logger=logger, **config['sleep_ranges']['after_scraping_user_media'])
-
-        counter += 1
-        if counter == accounts_this_round:
-            random_sleep(logger=logger, **config['sleep_ranges']['between_media_scraping_rounds'])
-            accounts_this_round = random.randint(
-                config["accounts_scraped_per_round"]["minimum"],
-                config["accounts_scraped_per_round"]["maximum"]
-            )
-            counter = 0
-
+        else:
+            pending.append(account)
+
+    def media_worker():
+        ig_client = Instagram()
+        pacing = _MediaPacing(config, logger)
+
+        def scrape(account):
+            scrape_account_media(account, ig_client, data_directory_path, downloads, manifest,
+                                 config, logger, rate_limiter)
+            if not rate_limiter:
+                pacing.sleep()
+        return scrape
+
+    def backoff(worker_index: int, failures: int):
+        # The rate limiter has already slowed requests for media
+        if rate_limiter:
+            return
+        sleep_range = config['sleep_ranges']['after_igramscraper_failure']
+        factor = 2 ** min(failures - 1, MAX_BACKOFF_DOUBLINGS)
+        random_sleep(sleep_range['minimum'] * factor, sleep_range['maximum'] * factor, logger)
+
+    logger.info(f'Scraping media for {len(pending)} accounts with {workers} workers...')
+    dead_letters = run_sharded(pending,
+                               [media_worker() for _ in range(workers)],
+                               logger,
+                               max_attempts=max_attempts,
+                               backoff=backoff)
+
+    downloads.close()
+    manifest.close()
+
+    if dead_letters:
+        dead_letters_path = path.join(
+            config['logs_directory'],
+            f'{file_friendly_datetime}_dead-letters_{input_filename}.csv',
+        )
+        logger.warning(
+            f'Media of {len(dead_letters)} accounts could not be scraped. '
+            f'Saving them to {dead_letters_path}'
+        )
+        pd.DataFrame([
+            {
+                'identifier': dead_letter.item.identifier,
+                'username': dead_letter.item.username,
+                'attempts': dead_letter.attempts,
+                'error': repr(dead_letter.error),
+            }
+            for dead_letter in dead_letters
+        ]).to_csv(dead_letters_path, index=False)
 
 if __name__ == '__main__':
     save_media()
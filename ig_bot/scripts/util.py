@@ -1,9 +1,28 @@
 import logging
+import os
 from os import path
 
 import networkx as nx
 import pandas as pd
 
+from ig_bot.accounts_file import (
+    account_journal_path,
+    ACCOUNTS_FILE_EXTENSION,
+    read_accounts,
+    write_accounts,
+)
+from ig_bot.data import AccountTable
+from ig_bot.gml import read_gml
+from ig_bot.journal import replay_account_journal
+from ig_bot.snapshot import read_snapshot, write_snapshot
+from ig_bot.state import CrawlDatabase
+
+
+GML_EXTENSION = '.gml'
+SNAPSHOT_EXTENSION = '.igb'
+CSV_EXTENSION = '.csv'
+SQLITE_EXTENSION = '.sqlite'
+
 
 def initialise_logger(
         directory: str,
@@ -33,8 +52,11 @@ def save_graph_gml(
         logger: logging.Logger
 ) -> None:
     logger.info('Serialising graph...')
+    # Written alongside and moved into place so a crash can't truncate it
+    temporary_filepath = f'{filepath}.tmp'
     # Couldn't resist the 'clever' lambda stringize nonsense below.
-    nx.write_gml(graph, filepath, lambda v: ('', v)[bool(v)])
+    nx.write_gml(graph, temporary_filepath, lambda v: ('', v)[bool(v)])
+    os.replace(temporary_filepath, filepath)
     logger.info(f'Graph saved to {filepath}.')
 
 
@@ -44,13 +66,92 @@ def load_graph_gml(
 ) -> nx.DiGraph:
     logger.info(f'Loading graph from {filepath}')
 
-    with open(filepath, 'rb') as fileobj:
-        graph = nx.read_gml(fileobj)
+    graph = read_gml(filepath)
 
     logger.info('Graph file loaded.')
     return graph
 
 
+def save_graph_snapshot(
+        graph: nx.DiGraph,
+        filepath: str,
+        logger: logging.Logger
+) -> None:
+    logger.info('Writing graph snapshot...')
+    write_snapshot(graph, filepath)
+    logger.info(f'Graph saved to {filepath}.')
+
+
+def load_graph_snapshot(
+        filepath: str,
+        logger: logging.Logger
+) -> nx.DiGraph:
+    logger.info(f'Loading graph from {filepath}')
+    graph = read_snapshot(filepath)
+    logger.info('Graph snapshot loaded.')
+    return graph
+
+
+def save_graph(graph: nx.DiGraph, filepath: str, logger: logging.Logger):
+    """Saves a graph in the format indicated by the file extension."""
+    extension = path.splitext(filepath)[1]
+    if extension == SNAPSHOT_EXTENSION:
+        save_graph_snapshot(graph, filepath, logger)
+    elif extension == SQLITE_EXTENSION:
+        with CrawlDatabase(filepath) as database:
+            database.replace_graph(graph)
+        logger.info(f'Graph saved to {filepath}.')
+    else:
+        save_graph_gml(graph, filepath, logger)
+
+
+def load_graph(filepath: str, logger: logging.Logger) -> nx.DiGraph:
+    """Loads a graph in the format indicated by the file extension. Crawl
+    state databases are opened read-only, so they can be read while a
+    crawl writes to them."""
+    extension = path.splitext(filepath)[1]
+    if extension == SNAPSHOT_EXTENSION:
+        return load_graph_snapshot(filepath, logger)
+    if extension == SQLITE_EXTENSION:
+        logger.info(f'Loading graph from {filepath}')
+        with CrawlDatabase(filepath, read_only=True) as database:
+            return database.graph()
+    return load_graph_gml(filepath, logger)
+
+
+def save_accounts(table: AccountTable,
+                  filepath: str,
+                  logger: logging.Logger):
+    """Saves accounts as a columnar file or, given a .csv path, as CSV in
+    descending order of centrality."""
+    if path.splitext(filepath)[1] == ACCOUNTS_FILE_EXTENSION:
+        write_accounts(table, filepath)
+    else:
+        data = table.to_dataframe().sort_values('centrality',
+                                                ascending=False,
+                                                kind='stable')
+        temporary_filepath = f'{filepath}.tmp'
+        data.to_csv(temporary_filepath, index=False, encoding='utf-8')
+        os.replace(temporary_filepath, filepath)
+    logger.info(f'{len(table)} accounts saved to {filepath}.')
+
+
+def load_accounts(filepath: str, logger: logging.Logger) -> AccountTable:
+    """Loads accounts from a columnar file, applying any journalled changes,
+    or from CSV."""
+    logger.info(f'Loading accounts from {filepath}')
+    if path.splitext(filepath)[1] == ACCOUNTS_FILE_EXTENSION:
+        table = read_accounts(filepath)
+        records = replay_account_journal(table,
+                                         account_journal_path(filepath))
+        logger.info(f'Replayed {records} journal records onto accounts.')
+        return table
+
+    return AccountTable.from_dataframe(
+        pd.read_csv(filepath, dtype=str, keep_default_na=False)
+    )
+
+
 def load_graph_graphml(
         filepath: str,
         logger: logging.Logger
@@ -0,0 +1,61 @@
+"""Extraction of the JSON that Instagram pages assign to
+``window._sharedData`` in an inline script.
+
+Rather than parsing a whole page into an HTML tree to find the script, the
+assignment is found in the page's bytes and the JSON following it is decoded
+directly. Pages can be scanned as they are received, reading only as far as
+the end of the script.
+"""
+import json
+from typing import Iterator, Optional, Tuple
+
+SHARED_DATA_ASSIGNMENT = b'window._sharedData = '
+SCRIPT_END = b'</script>'
+
+_decoder = json.JSONDecoder()
+
+
+def _decode(script: bytes) -> Optional[dict]:
+    """The JSON object at the start of a script, ignoring what follows it,
+    such as the statement's semicolon."""
+    try:
+        data, _ = _decoder.raw_decode(script.decode('utf-8').lstrip())
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def scan_shared_data(chunks: Iterator[bytes]) -> Tuple[Optional[dict], bytes]:
+    """Reads a page's chunks up to the end of the script assigning shared
+    data, returning the data, or ``None`` if it isn't found, and the bytes
+    read. Chunks after the script are left unread in the iterator."""
+    content = bytearray()
+    # Where the next search starts, allowing for a match across chunks
+    search_from = 0
+    start = None
+    for chunk in chunks:
+        content += chunk
+        if start is None:
+            found = content.find(SHARED_DATA_ASSIGNMENT, search_from)
+            if found == -1:
+                search_from = max(
+                    len(content) - len(SHARED_DATA_ASSIGNMENT) + 1, 0
+                )
+                continue
+            start = search_from = found + len(SHARED_DATA_ASSIGNMENT)
+
+        end = content.find(SCRIPT_END, search_from)
+        if end == -1:
+            search_from = max(len(content) - len(SCRIPT_END) + 1, start)
+            continue
+        return _decode(bytes(content[start:end])), bytes(content)
+
+    if start is not None:
+        return _decode(bytes(content[start:])), bytes(content)
+    return None, bytes(content)
+
+
+def shared_data_from_bytes(content: bytes) -> Optional[dict]:
+    """The shared data assigned in a page, if found."""
+    data, _ = scan_shared_data(iter([content]))
+    return data
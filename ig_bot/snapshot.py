@@ -0,0 +1,280 @@
+"""Binary graph snapshots.
+
+A snapshot file holds a directed graph as a table of nodes, columnar node
+attributes and CSR edge arrays:
+
+    magic (8 bytes) | header length (uint64) | JSON header | arrays
+
+Each array starts on a 64-byte boundary so it can be memory-mapped in place.
+Strings (node keys and string attributes) are interned into one table and
+referred to by int32 index, with -1 marking a missing value.
+"""
+import json
+import os
+import struct
+from typing import Any, Dict, Iterator, List, Tuple
+
+import networkx as nx
+import numpy as np
+
+
+MAGIC = b'IGBGRAPH'
+VERSION = 1
+ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct('<8sQ')
+
+STRING_KIND = 'string'
+INT_KIND = 'int'
+FLOAT_KIND = 'float'
+BOOL_KIND = 'bool'
+
+_KIND_DTYPES = {
+    INT_KIND: np.int64,
+    FLOAT_KIND: np.float64,
+    BOOL_KIND: np.bool_,
+}
+
+
+class SnapshotFormatError(Exception):
+    """File is not a graph snapshot this version can read."""
+
+
+class _StringTable:
+
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def intern(self, value: str) -> int:
+        try:
+            return self.index[value]
+        except KeyError:
+            self.index[value] = len(self.strings)
+            self.strings.append(value)
+            return self.index[value]
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = [string.encode('utf-8') for string in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(data) for data in encoded], out=offsets[1:])
+        data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        return offsets, data
+
+
+def _attribute_kind(values: List[Any]) -> str:
+    present = [value for value in values if value is not None]
+    if not present:
+        return STRING_KIND
+    if all(isinstance(value, bool) for value in present):
+        return BOOL_KIND
+    if any(isinstance(value, bool) for value in present):
+        return STRING_KIND
+    if all(isinstance(value, int) for value in present):
+        return INT_KIND
+    if all(isinstance(value, (int, float)) for value in present):
+        return FLOAT_KIND
+    return STRING_KIND
+
+
+def _attribute_arrays(
+    values: List[Any], kind: str, strings: _StringTable
+) -> Dict[str, np.ndarray]:
+    if kind == STRING_KIND:
+        return {'values': np.fromiter(
+            (-1 if value is None else strings.intern(str(value))
+             for value in values),
+            dtype=np.int32,
+            count=len(values),
+        )}
+
+    return {
+        'values': np.fromiter(
+            (0 if value is None else value for value in values),
+            dtype=_KIND_DTYPES[kind],
+            count=len(values),
+        ),
+        'missing': np.fromiter((value is None for value in values),
+                               dtype=np.bool_,
+                               count=len(values)),
+    }
+
+
+def write_snapshot(graph: nx.DiGraph, filepath: str):
+    """Writes a directed graph with string node keys to a snapshot file."""
+    nodes = list(graph)
+    if not all(isinstance(node, str) for node in nodes):
+        raise TypeError('Graph snapshots only support string node keys.')
+
+    strings = _StringTable()
+    arrays = {
+        'nodes': np.fromiter(map(strings.intern, nodes),
+                             dtype=np.int32,
+                             count=len(nodes)),
+    }
+
+    node_data = [data for _, data in graph.nodes(data=True)]
+    attribute_kinds = {}
+    for name in sorted({name for data in node_data for name in data}):
+        values = [data.get(name) for data in node_data]
+        kind = attribute_kinds[name] = _attribute_kind(values)
+        for suffix, array in _attribute_arrays(values, kind, strings).items():
+            arrays[f'attributes/{name}/{suffix}'] = array
+
+    node_index = {node: i for i, node in enumerate(nodes)}
+    indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+    np.cumsum([len(graph.succ[node]) for node in nodes], out=indptr[1:])
+    arrays['indptr'] = indptr
+    arrays['indices'] = np.fromiter(
+        (node_index[successor] for node in nodes
+         for successor in graph.succ[node]),
+        dtype=np.int32,
+        count=graph.number_of_edges(),
+    )
+
+    arrays['strings/offsets'], arrays['strings/data'] = strings.arrays()
+
+    _write_arrays(filepath, arrays, {
+        'version': VERSION,
+        'graph': dict(graph.graph),
+        'attributes': attribute_kinds,
+    })
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _write_arrays(filepath: str, arrays: Dict[str, np.ndarray], header: dict):
+    # Array offsets are relative to the end of the header, which is padded
+    # so that they stay aligned whatever the header's length.
+    offset = 0
+    header['arrays'] = {}
+    for name, array in arrays.items():
+        header['arrays'][name] = {
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'offset': offset,
+        }
+        offset = _aligned(offset + array.nbytes)
+
+    encoded_header = json.dumps(header).encode('utf-8')
+    data_start = _aligned(_PREAMBLE.size + len(encoded_header))
+
+    temporary_filepath = f'{filepath}.tmp'
+    with open(temporary_filepath, 'wb') as file_obj:
+        file_obj.write(_PREAMBLE.pack(MAGIC, len(encoded_header)))
+        file_obj.write(encoded_header)
+        for name, array in arrays.items():
+            file_obj.seek(data_start + header['arrays'][name]['offset'])
+            file_obj.write(np.ascontiguousarray(array).tobytes())
+        file_obj.truncate(data_start + offset)
+        file_obj.flush()
+        os.fsync(file_obj.fileno())
+    os.replace(temporary_filepath, filepath)
+
+
+class GraphSnapshot:
+    """Read-only view of a snapshot file with its arrays memory-mapped."""
+
+    def __init__(self, filepath: str):
+        with open(filepath, 'rb') as file_obj:
+            preamble = file_obj.read(_PREAMBLE.size)
+            if len(preamble) < _PREAMBLE.size:
+                raise SnapshotFormatError(f'{filepath} is not a snapshot.')
+            magic, header_length = _PREAMBLE.unpack(preamble)
+            if magic != MAGIC:
+                raise SnapshotFormatError(f'{filepath} is not a snapshot.')
+            header = json.loads(file_obj.read(header_length))
+
+        if header['version'] != VERSION:
+            raise SnapshotFormatError(
+                f'Unsupported snapshot version {header["version"]}.'
+            )
+
+        data_start = _aligned(_PREAMBLE.size + header_length)
+        self.graph_attributes = header['graph']
+        self.attribute_kinds = header['attributes']
+        self.arrays = {
+            name: _memory_map(filepath, data_start, spec)
+            for name, spec in header['arrays'].items()
+        }
+        self._strings = None
+
+    def __len__(self) -> int:
+        return len(self.arrays['nodes'])
+
+    @property
+    def indptr(self) -> np.ndarray:
+        return self.arrays['indptr']
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self.arrays['indices']
+
+    @property
+    def strings(self) -> List[str]:
+        if self._strings is None:
+            offsets = self.arrays['strings/offsets'].tolist()
+            data = self.arrays['strings/data'].tobytes()
+            self._strings = [
+                data[start:end].decode('utf-8')
+                for start, end in zip(offsets, offsets[1:])
+            ]
+        return self._strings
+
+    def nodes(self) -> List[str]:
+        strings = self.strings
+        return [strings[i] for i in self.arrays['nodes'].tolist()]
+
+    def node_attribute(self, name: str) -> List[Any]:
+        """Values of a node attribute in node order, None where missing."""
+        values = self.arrays[f'attributes/{name}/values']
+
+        if self.attribute_kinds[name] == STRING_KIND:
+            strings = self.strings
+            return [None if i < 0 else strings[i] for i in values.tolist()]
+
+        missing = self.arrays[f'attributes/{name}/missing'].tolist()
+        return [
+            None if is_missing else value
+            for value, is_missing in zip(values.tolist(), missing)
+        ]
+
+    def edges(self) -> Iterator[Tuple[str, str]]:
+        nodes = self.nodes()
+        sources = np.repeat(np.arange(len(nodes)), np.diff(self.indptr))
+        for source, destination in zip(sources.tolist(),
+                                       self.indices.tolist()):
+            yield nodes[source], nodes[destination]
+
+    def to_networkx(self) -> nx.DiGraph:
+        graph = nx.DiGraph(**self.graph_attributes)
+        nodes = self.nodes()
+        columns = {
+            name: self.node_attribute(name) for name in self.attribute_kinds
+        }
+        graph.add_nodes_from(
+            (node, {
+                name: column[i] for name, column in columns.items()
+                if column[i] is not None
+            })
+            for i, node in enumerate(nodes)
+        )
+        graph.add_edges_from(self.edges())
+        return graph
+
+
+def _memory_map(filepath: str, data_start: int, spec: dict) -> np.ndarray:
+    shape = tuple(spec['shape'])
+    if not np.prod(shape):
+        return np.empty(shape, dtype=np.dtype(spec['dtype']))
+    return np.memmap(filepath,
+                     dtype=np.dtype(spec['dtype']),
+                     mode='r',
+                     offset=data_start + spec['offset'],
+                     shape=shape)
+
+
+def read_snapshot(filepath: str) -> nx.DiGraph:
+    return GraphSnapshot(filepath).to_networkx()
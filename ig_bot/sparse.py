@@ -0,0 +1,285 @@
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Sequence, Union
+
+import networkx as nx
+import numpy as np
+from scipy import sparse
+
+from ig_bot.pagerank import check_seeds, crawl_root, push_pagerank
+from ig_bot.parallel import ParallelProduct
+
+
+@dataclass(frozen=True)
+class AdjacencyMatrix:
+    """CSR adjacency matrix of a directed graph.
+
+    Row ``i`` holds the accounts followed by ``nodes[i]``, so ``matrix.T @ x``
+    sums each node's value over its followers.
+    """
+    nodes: List[str]
+    matrix: sparse.csr_matrix
+
+    @classmethod
+    def from_graph(cls, graph: nx.DiGraph) -> 'AdjacencyMatrix':
+        nodes = list(graph)
+        index = {node: i for i, node in enumerate(nodes)}
+        edge_count = graph.number_of_edges()
+
+        sources = np.fromiter(
+            (index[source] for source, _ in graph.edges),
+            dtype=np.int32,
+            count=edge_count,
+        )
+        destinations = np.fromiter(
+            (index[destination] for _, destination in graph.edges),
+            dtype=np.int32,
+            count=edge_count,
+        )
+        matrix = sparse.csr_matrix(
+            (np.ones(edge_count), (sources, destinations)),
+            shape=(len(nodes), len(nodes)),
+        )
+        return cls(nodes, matrix)
+
+    @classmethod
+    def from_csr(cls,
+                 nodes: List[str],
+                 indptr: np.ndarray,
+                 indices: np.ndarray) -> 'AdjacencyMatrix':
+        """Wraps CSR arrays in which row ``i`` holds the indices of the
+        nodes followed by ``nodes[i]``."""
+        matrix = sparse.csr_matrix(
+            (np.ones(len(indices)), indices, indptr),
+            shape=(len(nodes), len(nodes)),
+        )
+        return cls(nodes, matrix)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def to_dict(self, values: np.ndarray) -> Dict[str, float]:
+        return dict(zip(self.nodes, values.tolist()))
+
+    def to_vector(self, values: Dict[str, float], default=0.0) -> np.ndarray:
+        return np.fromiter(
+            (values.get(node, default) for node in self.nodes),
+            dtype=np.float64,
+            count=len(self.nodes),
+        )
+
+
+GraphLike = Union[nx.DiGraph, AdjacencyMatrix]
+
+
+def adjacency(graph: GraphLike) -> AdjacencyMatrix:
+    if isinstance(graph, AdjacencyMatrix):
+        return graph
+    if isinstance(graph, nx.Graph):
+        return AdjacencyMatrix.from_graph(graph)
+    # Graphs that keep their own CSR arrays, such as graph.CompactGraph
+    return graph.adjacency_matrix()
+
+
+@contextmanager
+def _products(matrix: sparse.csr_matrix,
+              workers: int = None) -> Iterator[Callable]:
+    """Yields a function multiplying vectors by the matrix, on ``workers``
+    processes when there is more than one."""
+    if not workers or workers <= 1:
+        yield matrix.dot
+        return
+
+    with ParallelProduct(matrix, workers) as product:
+        yield product
+
+
+def in_degree_centrality(graph: GraphLike) -> Dict[str, float]:
+    adjacency_matrix = adjacency(graph)
+    node_count = len(adjacency_matrix)
+    if node_count <= 1:
+        return adjacency_matrix.to_dict(np.ones(node_count))
+
+    in_degrees = np.asarray(adjacency_matrix.matrix.sum(axis=0)).ravel()
+    return adjacency_matrix.to_dict(in_degrees / (node_count - 1))
+
+
+def eigenvector_centrality(graph: GraphLike,
+                           max_iter: int = 100,
+                           tol: float = 1.0e-6,
+                           nstart: Dict[str, float] = None,
+                           workers: int = None) -> Dict[str, float]:
+    """Same iteration as ``nx.eigenvector_centrality``, with ``A + I`` applied
+    as a sparse matrix-vector product, split across ``workers`` processes
+    if given."""
+    adjacency_matrix = adjacency(graph)
+    node_count = len(adjacency_matrix)
+    if node_count == 0:
+        raise nx.NetworkXPointlessConcept(
+            'cannot compute centrality for the null graph'
+        )
+
+    if nstart is None:
+        x = np.ones(node_count)
+    else:
+        x = adjacency_matrix.to_vector(nstart)
+    if not x.any():
+        raise nx.NetworkXError('initial vector cannot have all zero values')
+    x = x / x.sum()
+
+    transposed = adjacency_matrix.matrix.T.tocsr()
+    with _products(transposed, workers) as multiply:
+        for _ in range(max_iter):
+            x_last = x
+            x = x_last + multiply(x_last)
+            x = x / (np.linalg.norm(x) or 1)
+            if np.abs(x - x_last).sum() < node_count * tol:
+                return adjacency_matrix.to_dict(x)
+
+    raise nx.PowerIterationFailedConvergence(max_iter)
+
+
+def pagerank(graph: GraphLike,
+             alpha: float = 0.85,
+             personalization: Dict[str, float] = None,
+             max_iter: int = 100,
+             tol: float = 1.0e-6,
+             nstart: Dict[str, float] = None,
+             workers: int = None) -> Dict[str, float]:
+    """Same iteration as ``nx.pagerank``, with dangling nodes' rank
+    redistributed according to the personalization vector."""
+    adjacency_matrix = adjacency(graph)
+    node_count = len(adjacency_matrix)
+    if node_count == 0:
+        return {}
+
+    out_degrees = np.asarray(adjacency_matrix.matrix.sum(axis=1)).ravel()
+    inverse_out_degrees = np.divide(1.0,
+                                    out_degrees,
+                                    out=np.zeros(node_count),
+                                    where=out_degrees != 0)
+    transition = (
+        sparse.diags(inverse_out_degrees) @ adjacency_matrix.matrix
+    ).T.tocsr()
+    dangling = out_degrees == 0
+
+    x = _distribution(adjacency_matrix, nstart)
+    p = _distribution(adjacency_matrix, personalization)
+
+    with _products(transition, workers) as multiply:
+        for _ in range(max_iter):
+            x_last = x
+            x = alpha * (multiply(x_last) + x_last[dangling].sum() * p)
+            x += (1 - alpha) * p
+            if np.abs(x - x_last).sum() < node_count * tol:
+                return adjacency_matrix.to_dict(x)
+
+    raise nx.PowerIterationFailedConvergence(max_iter)
+
+
+def personalized_pagerank(graph: GraphLike,
+                          seeds: Sequence[str] = None,
+                          alpha: float = 0.85,
+                          max_iter: int = 100,
+                          tol: float = 1.0e-6,
+                          nstart: Dict[str, float] = None,
+                          workers: int = None) -> Dict[str, float]:
+    """``pagerank`` of walks restarting at the seeds, by default the root of
+    the crawl."""
+    if seeds is None:
+        seeds = _crawl_root(graph)
+    adjacency_matrix = adjacency(graph)
+    check_seeds(seeds, set(adjacency_matrix.nodes))
+    if not seeds:
+        return {}
+
+    return pagerank(adjacency_matrix,
+                    alpha=alpha,
+                    personalization=dict.fromkeys(seeds, 1),
+                    max_iter=max_iter,
+                    tol=tol,
+                    nstart=nstart,
+                    workers=workers)
+
+
+def approximate_pagerank(graph: GraphLike,
+                         seeds: Sequence[str] = None,
+                         alpha: float = 0.85,
+                         epsilon: float = 1.0e-5) -> Dict[str, float]:
+    """``pagerank.push_pagerank`` over the CSR rows, from the seeds or by
+    default the root of the crawl. Nodes not reached get zero."""
+    if seeds is None:
+        seeds = _crawl_root(graph)
+    adjacency_matrix = adjacency(graph)
+    nodes = adjacency_matrix.nodes
+    node_index = {node: i for i, node in enumerate(nodes)}
+    check_seeds(seeds, node_index)
+    seed_indices = [node_index[seed] for seed in seeds]
+
+    matrix = adjacency_matrix.matrix
+    indptr, indices = matrix.indptr, matrix.indices
+    estimate = push_pagerank(
+        seed_indices,
+        lambda i: indices[indptr[i]:indptr[i + 1]].tolist(),
+        lambda i: int(indptr[i + 1] - indptr[i]),
+        alpha,
+        epsilon,
+    )
+
+    x = np.zeros(len(nodes))
+    if estimate:
+        x[list(estimate)] = list(estimate.values())
+    return adjacency_matrix.to_dict(x)
+
+
+def _crawl_root(graph: GraphLike) -> List[str]:
+    """``pagerank.crawl_root``, from the first node of an adjacency matrix,
+    which keeps no graph attributes."""
+    if isinstance(graph, AdjacencyMatrix):
+        return crawl_root(graph.nodes)
+    return crawl_root(graph)
+
+
+def _distribution(adjacency_matrix: AdjacencyMatrix,
+                  values: Dict[str, float] = None) -> np.ndarray:
+    """Uniform distribution over nodes, or ``values`` scaled to sum to one."""
+    if values is None:
+        return np.full(len(adjacency_matrix), 1.0 / len(adjacency_matrix))
+
+    vector = adjacency_matrix.to_vector(values)
+    total = vector.sum()
+    if total == 0:
+        raise ZeroDivisionError('distribution cannot sum to zero')
+    return vector / total
+
+
+def katz_centrality(graph: GraphLike,
+                    alpha: float = 0.1,
+                    beta: float = 1.0,
+                    max_iter: int = 1000,
+                    tol: float = 1.0e-6,
+                    nstart: Dict[str, float] = None,
+                    normalized: bool = True,
+                    workers: int = None) -> Dict[str, float]:
+    """Same iteration as ``nx.katz_centrality`` with a scalar ``beta``."""
+    adjacency_matrix = adjacency(graph)
+    node_count = len(adjacency_matrix)
+    if node_count == 0:
+        return {}
+
+    if nstart is None:
+        x = np.zeros(node_count)
+    else:
+        x = adjacency_matrix.to_vector(nstart)
+
+    transposed = adjacency_matrix.matrix.T.tocsr()
+    with _products(transposed, workers) as multiply:
+        for _ in range(max_iter):
+            x_last = x
+            x = alpha * multiply(x_last) + beta
+            if np.abs(x - x_last).sum() < node_count * tol:
+                if normalized:
+                    x = x / (np.linalg.norm(x) or 1)
+                return adjacency_matrix.to_dict(x)
+
+    raise nx.PowerIterationFailedConvergence(max_iter)
@@ -0,0 +1,312 @@
+"""Crawl state in a SQLite database.
+
+Holds what a crawl otherwise keeps in graph and accounts files, updated with
+transactional row writes rather than whole-file rewrites:
+
+    nodes           every account in the follow graph
+    edges           follows between nodes
+    accounts        accounts tracked by the crawl, with their centrality
+                    and date scraped, indexed on both
+    follow_cursors  where interrupted scrapes of follows resume
+
+The database uses write-ahead logging, so other processes can read it while
+a crawl writes to it.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+import sqlite3
+import threading
+from typing import Iterable, Iterator, Optional, Tuple
+
+import networkx as nx
+
+from ig_bot.data import Account, AccountTable, account_to_camel_case
+from ig_bot.pagerank import ROOT_ATTRIBUTE
+
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    identifier TEXT PRIMARY KEY,
+    username TEXT,
+    full_name TEXT
+);
+CREATE TABLE IF NOT EXISTS edges (
+    source TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    PRIMARY KEY (source, destination)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS accounts (
+    identifier TEXT NOT NULL UNIQUE,
+    username TEXT,
+    full_name TEXT,
+    centrality REAL,
+    date_scraped TEXT
+);
+CREATE INDEX IF NOT EXISTS accounts_centrality
+    ON accounts (centrality DESC);
+CREATE INDEX IF NOT EXISTS accounts_date_scraped
+    ON accounts (date_scraped);
+CREATE INDEX IF NOT EXISTS accounts_unscraped_centrality
+    ON accounts (centrality DESC) WHERE date_scraped IS NULL;
+CREATE TABLE IF NOT EXISTS follow_cursors (
+    identifier TEXT PRIMARY KEY,
+    end_cursor TEXT NOT NULL,
+    scraped INTEGER NOT NULL
+);
+"""
+
+_ACCOUNT_COLUMNS = 'identifier, username, full_name, centrality, date_scraped'
+
+# Nodes take the latest username and full name scraped, as in the graph,
+# and are only written when those change
+_UPSERT_NODE_SQL = (
+    'INSERT INTO nodes VALUES (?, ?, ?) '
+    'ON CONFLICT (identifier) DO UPDATE SET '
+    'username = excluded.username, full_name = excluded.full_name '
+    'WHERE username IS NOT excluded.username '
+    'OR full_name IS NOT excluded.full_name'
+)
+
+# Left to itself the planner may prefer the date_scraped index and sort
+_TOP_CANDIDATE_SQL = (
+    f'SELECT rowid, {_ACCOUNT_COLUMNS} FROM accounts '
+    'INDEXED BY accounts_unscraped_centrality '
+    'WHERE date_scraped IS NULL '
+    'ORDER BY centrality DESC, rowid LIMIT 1'
+)
+
+
+def _date_to_text(date_scraped) -> Optional[str]:
+    if not date_scraped:
+        return None
+    if isinstance(date_scraped, datetime):
+        return date_scraped.isoformat(sep=' ')
+    return str(date_scraped)
+
+
+def _account_from_row(row: tuple) -> Account:
+    identifier, username, full_name, centrality, date_scraped = row
+    return Account(
+        identifier=identifier,
+        username=username,
+        full_name=full_name,
+        centrality=centrality,
+        date_scraped=(
+            datetime.fromisoformat(date_scraped) if date_scraped else None
+        ),
+    )
+
+
+class CrawlDatabase:
+    """Connection to a crawl state database, which is created if absent.
+
+    Methods may be called from any thread; writes are serialised.
+    """
+
+    def __init__(self, filepath: str, read_only: bool = False):
+        self.filepath = filepath
+        if read_only:
+            self._connection = sqlite3.connect(f'file:{filepath}?mode=ro',
+                                               uri=True,
+                                               check_same_thread=False)
+        else:
+            self._connection = sqlite3.connect(filepath,
+                                               check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.executescript(_SCHEMA)
+            self._connection.execute(
+                'INSERT OR IGNORE INTO metadata VALUES (?, ?)',
+                ('schema_version', str(SCHEMA_VERSION)),
+            )
+            self._connection.commit()
+        self._lock = threading.RLock()
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self) -> 'CrawlDatabase':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Commits the statements executed within it together, or none of
+        them if an exception is raised."""
+        with self._lock, self._connection:
+            yield self._connection
+
+    def _query(self, sql: str, parameters: tuple = ()) -> list:
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def is_empty(self) -> bool:
+        return not self._query('SELECT 1 FROM accounts LIMIT 1')
+
+    def add_nodes(self, accounts: Iterable[Account]):
+        """Adds accounts' nodes, or updates their username and full name if
+        present."""
+        with self.transaction() as connection:
+            connection.executemany(
+                _UPSERT_NODE_SQL,
+                ((account.identifier, account.username, account.full_name)
+                 for account in accounts),
+            )
+
+    def set_root(self, account: Account):
+        """Adds the root of a crawl's node and records it as the root."""
+        with self.transaction() as connection:
+            connection.execute(
+                _UPSERT_NODE_SQL,
+                (account.identifier, account.username, account.full_name),
+            )
+            connection.execute('INSERT OR REPLACE INTO metadata VALUES (?, ?)',
+                               ('root', account.identifier))
+
+    def add_follows(self,
+                    source: Account,
+                    destinations: Iterable[Account],
+                    end_cursor: str = None,
+                    scraped: int = None):
+        """Adds followed accounts and their edges, and the cursor from
+        which the rest of the source's follows would be scraped, at once."""
+        destinations = list(destinations)
+        with self.transaction() as connection:
+            connection.executemany(
+                _UPSERT_NODE_SQL,
+                ((account.identifier, account.username, account.full_name)
+                 for account in [source, *destinations]),
+            )
+            connection.executemany(
+                'INSERT OR IGNORE INTO edges VALUES (?, ?)',
+                ((source.identifier, destination.identifier)
+                 for destination in destinations),
+            )
+            if end_cursor:
+                connection.execute(
+                    'INSERT OR REPLACE INTO follow_cursors VALUES (?, ?, ?)',
+                    (source.identifier, end_cursor, scraped),
+                )
+
+    def follow_cursor(self, identifier: str) -> Tuple[Optional[str], int]:
+        rows = self._query(
+            'SELECT end_cursor, scraped FROM follow_cursors '
+            'WHERE identifier = ?',
+            (identifier,),
+        )
+        return rows[0] if rows else (None, 0)
+
+    def upsert_accounts(self, accounts: Iterable[Account]):
+        """Saves tracked accounts, and clears the follow cursors of those
+        now scraped."""
+        rows = [
+            (account.identifier,
+             account.username,
+             account.full_name,
+             account.centrality,
+             _date_to_text(account.date_scraped))
+            for account in accounts
+        ]
+        with self.transaction() as connection:
+            connection.executemany(
+                f'INSERT INTO accounts ({_ACCOUNT_COLUMNS}) '
+                'VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (identifier) DO UPDATE SET '
+                'username = excluded.username, '
+                'full_name = excluded.full_name, '
+                'centrality = excluded.centrality, '
+                'date_scraped = excluded.date_scraped',
+                rows,
+            )
+            connection.executemany(
+                'DELETE FROM follow_cursors WHERE identifier = ?',
+                ((row[0],) for row in rows if row[4]),
+            )
+
+    def accounts(self) -> AccountTable:
+        """Tracked accounts, in the order they were first saved."""
+        rows = self._query(
+            f'SELECT {_ACCOUNT_COLUMNS} FROM accounts ORDER BY rowid'
+        )
+        return AccountTable.from_columns(*(
+            list(column) for column in zip(*rows)
+        )) if rows else AccountTable()
+
+    def top_scraping_candidate(self, poorest_rank: int) -> Optional[Account]:
+        """The most central unscraped account, if it ranks no lower than
+        ``poorest_rank`` among tracked accounts. Ties in centrality go to
+        the account saved first, as in ``Frontier``."""
+        rows = self._query(_TOP_CANDIDATE_SQL)
+        if not rows:
+            return None
+
+        rowid, *account_row = rows[0]
+        centrality = account_row[3]
+        if centrality is None:
+            (ranked_above,) = self._query(
+                'SELECT COUNT(*) FROM accounts '
+                'WHERE centrality IS NOT NULL OR rowid < ?',
+                (rowid,),
+            )[0]
+        else:
+            (ranked_above,) = self._query(
+                'SELECT (SELECT COUNT(*) FROM accounts WHERE centrality > ?)'
+                ' + (SELECT COUNT(*) FROM accounts '
+                '    WHERE centrality = ? AND rowid < ?)',
+                (centrality, centrality, rowid),
+            )[0]
+
+        if ranked_above + 1 > poorest_rank:
+            return None
+        return _account_from_row(tuple(account_row))
+
+    def graph(self) -> nx.DiGraph:
+        """The follow graph, with the node and graph attributes of graph
+        files. Nodes are in the order added, so the crawl's root comes first
+        even in databases that predate recording it."""
+        graph = nx.DiGraph()
+        root = self._query("SELECT value FROM metadata WHERE key = 'root'")
+        if root:
+            graph.graph[ROOT_ATTRIBUTE] = root[0][0]
+        graph.add_nodes_from(
+            (identifier, account_to_camel_case(
+                Account(identifier, username, full_name)
+            ))
+            for identifier, username, full_name in self._query(
+                'SELECT identifier, username, full_name FROM nodes '
+                'ORDER BY rowid'
+            )
+        )
+        graph.add_edges_from(
+            self._query('SELECT source, destination FROM edges')
+        )
+        return graph
+
+    def replace_graph(self, graph: nx.DiGraph):
+        """Replaces all nodes and edges with those of a graph, and the root
+        with the graph's if it has one."""
+        with self.transaction() as connection:
+            if ROOT_ATTRIBUTE in graph.graph:
+                connection.execute(
+                    'INSERT OR REPLACE INTO metadata VALUES (?, ?)',
+                    ('root', graph.graph[ROOT_ATTRIBUTE]),
+                )
+            connection.execute('DELETE FROM edges')
+            connection.execute('DELETE FROM nodes')
+            connection.executemany(
+                'INSERT INTO nodes VALUES (?, ?, ?)',
+                ((identifier,
+                  attributes.get('username'),
+                  attributes.get('fullName'))
+                 for identifier, attributes in graph.nodes(data=True)),
+            )
+            connection.executemany('INSERT INTO edges VALUES (?, ?)',
+                                   graph.edges())
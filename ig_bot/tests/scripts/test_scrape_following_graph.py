@@ -1,6 +1,7 @@
 from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 from itertools import chain
+import os
 from os import mkdir, path
 from unittest import mock
 import shutil
@@ -9,12 +10,21 @@ import tempfile
 from click.testing import CliRunner
 from igramscraper.instagram import InstagramNotFoundException
 import networkx as nx
+import numpy as np
 import pandas as pd
 import pytest
 import time_machine
 
+from ig_bot.accounts_file import read_accounts
 from ig_bot.data import Account, account_from_obj
+from ig_bot.fakes import FakeClient
+from ig_bot.scraping import FollowsPage, MaxRateLimitingRetriesExceeded
+from ig_bot.state import CrawlDatabase
 from ig_bot.scripts.scrape_following_graph import (
+    _compact_graph,
+    _FileStore,
+    _save_accounts,
+    accounts_from_graph,
     record_date_scraped,
     relevant_new_accounts,
     scrape_following_graph,
@@ -313,7 +323,7 @@ def test_scrape_graph_command_username_and_files_in_data_dir(
 @mock.patch('ig_bot.scripts.scrape_following_graph.random_sleep')
 @mock.patch('ig_bot.scripts.scrape_following_graph.get_authenticated_igramscraper')
 @mock.patch('ig_bot.graph.CENTRALITY_METRIC_FUNCTIONS')
-@mock.patch('ig_bot.scripts.scrape_following_graph.followed_accounts')
+@mock.patch('ig_bot.scripts.scrape_following_graph.followed_account_pages')
 @mock.patch('ig_bot.scripts.scrape_following_graph.account_by_username')
 @mock.patch('ig_bot.scripts.scrape_following_graph._load_config')
 def test_scrape_graph_writes_graph_and_data_to_dir_with_username(
@@ -372,8 +382,8 @@ def test_scrape_graph_writes_graph_and_data_to_dir_with_username(
 
     def followed_accounts_stub(account, *args, **kwargs):
         if account.identifier not in followed_map:
-            return list()
-        return followed_map[account.identifier]
+            return iter([FollowsPage([], '')])
+        return iter([FollowsPage(followed_map[account.identifier], '')])
 
     mock_followed_accounts.side_effect = followed_accounts_stub
 
@@ -423,7 +433,7 @@ def test_scrape_graph_writes_graph_and_data_to_dir_with_username(
 @mock.patch('ig_bot.scripts.scrape_following_graph.random_sleep')
 @mock.patch('ig_bot.scripts.scrape_following_graph.get_authenticated_igramscraper')
 @mock.patch('ig_bot.graph.CENTRALITY_METRIC_FUNCTIONS')
-@mock.patch('ig_bot.scripts.scrape_following_graph.followed_accounts')
+@mock.patch('ig_bot.scripts.scrape_following_graph.followed_account_pages')
 @mock.patch('ig_bot.scripts.scrape_following_graph._load_config')
 def test_scrape_graph_updates_existing_data_dir(
         mock_load_config,
@@ -477,7 +487,7 @@ def test_scrape_graph_updates_existing_data_dir(
     }
 
     def fake_followed_accounts(account, *args, **kwargs):
-        return followed_map[account.identifier]
+        return iter([FollowsPage(followed_map[account.identifier], '')])
  
     mock_followed_accounts.side_effect = fake_followed_accounts
 
@@ -533,3 +543,702 @@ def test_scrape_graph_updates_existing_data_dir(
     mock_centrality_function_map.__getitem__.assert_called()
     mock_get_authenticated_igramscraper.assert_called()
     mock_time_sleep.assert_called()
+
+
+@time_machine.travel("2020-10-04T18:08:25Z", tick=False)
+@mock.patch('ig_bot.scripts.scrape_following_graph.random_sleep')
+@mock.patch('ig_bot.scripts.scrape_following_graph.get_authenticated_client')
+@mock.patch('ig_bot.scripts.scrape_following_graph.followed_account_pages')
+@mock.patch('ig_bot.scripts.scrape_following_graph._load_config')
+def test_scrape_graph_concurrently_updates_existing_data_dir(
+        mock_load_config,
+        mock_followed_accounts,
+        mock_get_authenticated_client,
+        mock_random_sleep,
+        account_one,
+        account_two,
+        account_three,
+        account_four,
+        account_five,
+        account_six,
+):
+    mock_load_config.return_value = {
+        'ig_credentials': [
+            {'username': 'foo', 'password': 'bar'},
+            {'username': 'baz', 'password': 'qux'},
+        ],
+        'centrality': {'backend': 'SPARSE'},
+        'accounts_per_batch': {'minimum': 4, 'maximum': 9},
+        'sleep': {
+            'between_account_batches': {'minimum': 300, 'maximum': 600},
+            'between_accounts': {'minimum': 15, 'maximum': 45},
+        },
+    }
+    mock_get_authenticated_client.side_effect = lambda **creds: creds['username']
+
+    followed_map = {
+        account_one.identifier: [account_two],
+        account_two.identifier: [account_one, account_three],
+        account_three.identifier: [account_one, account_four],
+        account_four.identifier: [account_five, account_six],
+        account_five.identifier: [account_four, account_two, account_six],
+        account_six.identifier: [account_one, account_three,
+                                 account_four, account_five]
+    }
+    def fake_followed_accounts(account, client, *args, **kwargs):
+        assert client in ('foo', 'baz')
+        return iter([FollowsPage(followed_map[account.identifier], '')])
+
+    mock_followed_accounts.side_effect = fake_followed_accounts
+
+    starting_dir = path.join(TEST_DATA_DIR,
+                             'scrape_following_graph',
+                             'starting_data_dir')
+    expected_graph = nx.read_gml(path.join(TEST_DATA_DIR,
+                                           'scrape_following_graph',
+                                           'expected_data_dir',
+                                           'all-six-accounts.gml'))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_path = path.join(temp_dir, 'data')
+        mkdir(data_path)
+        shutil.copy(path.join(starting_dir, 'all-four-accounts.gml'),
+                    path.join(data_path, 'graph.gml'))
+        shutil.copy(path.join(starting_dir, 'top-four-accounts.csv'),
+                    path.join(data_path, 'accounts.csv'))
+
+        scrape_following_graph(data_dir=data_path,
+                               username=None,
+                               poorest_centrality_rank=6,
+                               scraping_username=None,
+                               config_path='./config.yaml',
+                               log_level='INFO',
+                               concurrent=True)
+
+        accounts_data = pd.read_csv(path.join(data_path, 'accounts.csv'),
+                                    dtype=str)
+        graph = nx.read_gml(path.join(data_path, 'graph.gml'))
+
+    assert set(accounts_data['identifier']) == set(followed_map)
+    assert accounts_data['date_scraped'].notnull().all()
+    assert set(graph.nodes) == set(expected_graph.nodes)
+    assert set(graph.edges) == set(expected_graph.edges)
+    assert mock_get_authenticated_client.call_count == 2
+
+
+@mock.patch('ig_bot.async_scraping.random_sleep', new_callable=mock.AsyncMock)
+@mock.patch('ig_bot.scripts.scrape_following_graph.get_authenticated_client')
+@mock.patch('ig_bot.scripts.scrape_following_graph._load_config')
+def test_scrape_graph_with_asyncio_updates_existing_data_dir(
+        mock_load_config,
+        mock_get_authenticated_client,
+        mock_random_sleep,
+        account_one,
+        account_two,
+        account_three,
+        account_four,
+        account_five,
+        account_six,
+):
+    mock_load_config.return_value = {
+        'ig_credentials': [
+            {'username': 'foo', 'password': 'bar'},
+            {'username': 'baz', 'password': 'qux'},
+        ],
+        'follows_page_size': 2,
+        'max_followed_scraped': 999,
+        'rate_limit_retries': 3,
+        'exponential_sleep_base': 2,
+        'exponential_sleep_offset': 0,
+        'accounts_per_batch': {'minimum': 4, 'maximum': 9},
+        'sleep': {
+            'between_account_batches': {'minimum': 300, 'maximum': 600},
+            'between_accounts': {'minimum': 15, 'maximum': 45},
+        },
+    }
+    following = {
+        '1': ['2'],
+        '2': ['1', '3'],
+        '3': ['1', '4'],
+        '4': ['5', '6'],
+        '5': ['4', '2', '6'],
+        '6': ['1', '3', '4', '5'],
+    }
+    accounts = [account_one, account_two, account_three,
+                account_four, account_five, account_six]
+    clients = [FakeClient(accounts, following), FakeClient(accounts, following)]
+    mock_get_authenticated_client.side_effect = clients
+
+    starting_dir = path.join(TEST_DATA_DIR,
+                             'scrape_following_graph',
+                             'starting_data_dir')
+    expected_graph = nx.read_gml(path.join(TEST_DATA_DIR,
+                                           'scrape_following_graph',
+                                           'expected_data_dir',
+                                           'all-six-accounts.gml'))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_path = path.join(temp_dir, 'data')
+        mkdir(data_path)
+        shutil.copy(path.join(starting_dir, 'all-four-accounts.gml'),
+                    path.join(data_path, 'graph.gml'))
+        shutil.copy(path.join(starting_dir, 'top-four-accounts.csv'),
+                    path.join(data_path, 'accounts.csv'))
+
+        scrape_following_graph(data_dir=data_path,
+                               username=None,
+                               poorest_centrality_rank=6,
+                               scraping_username=None,
+                               config_path='./config.yaml',
+                               log_level='INFO',
+                               use_asyncio=True)
+
+        accounts_data = pd.read_csv(path.join(data_path, 'accounts.csv'),
+                                    dtype=str)
+        graph = nx.read_gml(path.join(data_path, 'graph.gml'))
+
+    assert set(accounts_data['identifier']) == set(following)
+    assert accounts_data['date_scraped'].notnull().all()
+    assert set(graph.nodes) == set(expected_graph.nodes)
+    assert set(graph.edges) == set(expected_graph.edges)
+    # Accounts 4, 5 and 6 were left to scrape, each by one of the clients
+    assert sorted(call[1] for client in clients for call in client.calls
+                  if call[2] == 2 and call[3] is None) == ['4', '5', '6']
+
+
+@mock.patch('ig_bot.scripts.scrape_following_graph.random_sleep')
+@mock.patch('ig_bot.scripts.scrape_following_graph.get_authenticated_client')
+@mock.patch('ig_bot.scripts.scrape_following_graph.followed_account_pages')
+@mock.patch('ig_bot.scripts.scrape_following_graph._load_config')
+def test_scrape_graph_concurrently_retries_failed_scrapes(
+        mock_load_config,
+        mock_followed_accounts,
+        mock_get_authenticated_client,
+        mock_random_sleep,
+        account_one,
+        account_two,
+        account_three,
+        account_four,
+        account_five,
+        account_six,
+):
+    mock_load_config.return_value = {
+        'ig_credentials': [
+            {'username': 'foo', 'password': 'bar'},
+            {'username': 'baz', 'password': 'qux'},
+        ],
+        'accounts_per_batch': {'minimum': 4, 'maximum': 9},
+        'sleep': {
+            'between_account_batches': {'minimum': 300, 'maximum': 600},
+            'between_accounts': {'minimum': 15, 'maximum': 45},
+        },
+    }
+    followed_map = {
+        account_one.identifier: [account_two],
+        account_two.identifier: [account_one, account_three],
+        account_three.identifier: [account_one, account_four],
+        account_four.identifier: [account_five, account_six],
+        account_five.identifier: [account_four, account_two, account_six],
+        account_six.identifier: [account_one, account_three,
+                                 account_four, account_five]
+    }
+    attempts = defaultdict(int)
+
+    def flaky_followed_accounts(account, *args, **kwargs):
+        attempts[account.identifier] += 1
+        # One account fails once, another every time
+        if account.identifier == account_four.identifier:
+            if attempts[account.identifier] == 1:
+                raise ConnectionError('Connection reset')
+        if account.identifier == account_five.identifier:
+            raise ConnectionError('Connection reset')
+        return iter([FollowsPage(followed_map[account.identifier], '')])
+
+    mock_followed_accounts.side_effect = flaky_followed_accounts
+
+    starting_dir = path.join(TEST_DATA_DIR,
+                             'scrape_following_graph',
+                             'starting_data_dir')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_path = path.join(temp_dir, 'data')
+        mkdir(data_path)
+        shutil.copy(path.join(starting_dir, 'all-four-accounts.gml'),
+                    path.join(data_path, 'graph.gml'))
+        shutil.copy(path.join(starting_dir, 'top-four-accounts.csv'),
+                    path.join(data_path, 'accounts.csv'))
+
+        scrape_following_graph(data_dir=data_path,
+                               username=None,
+                               poorest_centrality_rank=6,
+                               scraping_username=None,
+                               config_path='./config.yaml',
+                               log_level='INFO',
+                               concurrent=True)
+
+        accounts_data = pd.read_csv(path.join(data_path, 'accounts.csv'),
+                                    dtype=str).set_index('identifier')
+
+    assert attempts[account_four.identifier] == 2
+    assert attempts[account_five.identifier] == 3
+    assert attempts[account_six.identifier] == 1
+    assert accounts_data['date_scraped'].isnull().sum() == 1
+    assert pd.isnull(accounts_data.loc[account_five.identifier,
+                                       'date_scraped'])
+    assert mock_random_sleep.called
+
+
+@mock.patch('ig_bot.scripts.scrape_following_graph.random_sleep')
+@mock.patch('ig_bot.scripts.scrape_following_graph.get_authenticated_client')
+@mock.patch('ig_bot.scripts.scrape_following_graph.followed_account_pages')
+@mock.patch('ig_bot.scripts.scrape_following_graph._load_config')
+def test_scrape_graph_concurrently_raises_worker_errors(
+        mock_load_config,
+        mock_followed_accounts,
+        mock_get_authenticated_client,
+        mock_random_sleep,
+):
+    mock_load_config.return_value = {
+        'ig_credentials': [
+            {'username': 'foo', 'password': 'bar'},
+            {'username': 'baz', 'password': 'qux'},
+        ],
+        'accounts_per_batch': {'minimum': 4, 'maximum': 9},
+        'sleep': {
+            'between_account_batches': {'minimum': 300, 'maximum': 600},
+            'between_accounts': {'minimum': 15, 'maximum': 45},
+        },
+    }
+
+    starting_dir = path.join(TEST_DATA_DIR,
+                             'scrape_following_graph',
+                             'starting_data_dir')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_path = path.join(temp_dir, 'data')
+        mkdir(data_path)
+        shutil.copy(path.join(starting_dir, 'all-four-accounts.gml'),
+                    path.join(data_path, 'graph.gml'))
+        shutil.copy(path.join(starting_dir, 'top-four-accounts.csv'),
+                    path.join(data_path, 'accounts.csv'))
+        # Cursors missing their fields, as if the file were corrupted
+        with open(path.join(data_path, 'follow_cursors.json'), 'w') as file:
+            file.write('{"1": {}, "2": {}, "3": {}, "4": {}}')
+
+        with pytest.raises(KeyError):
+            scrape_following_graph(data_dir=data_path,
+                                   username=None,
+                                   poorest_centrality_rank=6,
+                                   scraping_username=None,
+                                   config_path='./config.yaml',
+                                   log_level='INFO',
+                                   concurrent=True)
+
+    mock_followed_accounts.assert_not_called()
+
+
+@mock.patch('ig_bot.scripts.scrape_following_graph.random_sleep')
+@mock.patch('ig_bot.scripts.scrape_following_graph.get_authenticated_client')
+@mock.patch('ig_bot.scripts.scrape_following_graph.followed_account_pages')
+@mock.patch('ig_bot.scripts.scrape_following_graph.account_by_username')
+@mock.patch('ig_bot.scripts.scrape_following_graph._load_config')
+def test_scrape_graph_saves_progress_when_scraping_fails(
+        mock_load_config,
+        mock_account_by_username,
+        mock_followed_account_pages,
+        mock_get_authenticated_client,
+        mock_random_sleep,
+        account_one,
+        account_two,
+):
+    mock_load_config.return_value = {
+        'ig_credentials': [{'username': 'foo', 'password': 'bar'}],
+        'accounts_per_batch': {'minimum': 4, 'maximum': 9},
+        'sleep': {
+            'between_account_batches': {'minimum': 300, 'maximum': 600},
+            'between_accounts': {'minimum': 15, 'maximum': 45},
+        },
+    }
+    mock_account_by_username.return_value = account_one
+
+    def followed_account_pages(account, *args, **kwargs):
+        if account.identifier == account_two.identifier:
+            raise ConnectionError('Connection reset')
+        return iter([FollowsPage([account_two], '')])
+
+    mock_followed_account_pages.side_effect = followed_account_pages
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_path = path.join(temp_dir, 'data')
+        with pytest.raises(ConnectionError):
+            scrape_following_graph(data_dir=data_path,
+                                   username=account_one.username,
+                                   poorest_centrality_rank=3,
+                                   scraping_username=None,
+                                   config_path='./config.yaml',
+                                   log_level='INFO')
+
+        graph = nx.read_gml(path.join(data_path, 'graph.gml'))
+        journal_size = path.getsize(
+            path.join(data_path, 'graph.journal.jsonl')
+        )
+        accounts_data = pd.read_csv(path.join(data_path, 'accounts.csv'),
+                                    dtype=str).set_index('identifier')
+
+    assert set(graph.edges) == {(account_one.identifier,
+                                 account_two.identifier)}
+    assert journal_size == 0
+    assert pd.notnull(accounts_data.loc[account_one.identifier,
+                                        'date_scraped'])
+
+
+@mock.patch('ig_bot.scripts.scrape_following_graph.random_sleep')
+@mock.patch('ig_bot.scripts.scrape_following_graph.get_authenticated_client')
+@mock.patch('ig_bot.scripts.scrape_following_graph.followed_account_pages')
+@mock.patch('ig_bot.scripts.scrape_following_graph._load_config')
+def test_scrape_graph_resumes_interrupted_follows_from_cursor(
+        mock_load_config,
+        mock_followed_account_pages,
+        mock_get_authenticated_client,
+        mock_random_sleep,
+        account_one,
+        account_two,
+        account_three,
+        account_four,
+        account_five,
+        account_six,
+):
+    mock_load_config.return_value = {
+        'ig_credentials': [{'username': 'foo', 'password': 'bar'}],
+        'accounts_per_batch': {'minimum': 4, 'maximum': 9},
+        'sleep': {
+            'between_account_batches': {'minimum': 300, 'maximum': 600},
+            'between_accounts': {'minimum': 15, 'maximum': 45},
+        },
+    }
+
+    def interrupted_pages(account, *args, end_cursor=None, **kwargs):
+        yield FollowsPage([account_five], 'cursor')
+        raise MaxRateLimitingRetriesExceeded
+
+    def resumed_pages(account, *args, end_cursor=None, **kwargs):
+        if end_cursor == 'cursor':
+            return iter([FollowsPage([account_six], '')])
+        return iter([FollowsPage([], '')])
+
+    starting_dir = path.join(TEST_DATA_DIR,
+                             'scrape_following_graph',
+                             'starting_data_dir')
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_path = path.join(temp_dir, 'data')
+        mkdir(data_path)
+        shutil.copy(path.join(starting_dir, 'all-four-accounts.gml'),
+                    path.join(data_path, 'graph.gml'))
+        shutil.copy(path.join(starting_dir, 'top-four-accounts.csv'),
+                    path.join(data_path, 'accounts.csv'))
+        arguments = dict(data_dir=data_path,
+                         username=None,
+                         poorest_centrality_rank=4,
+                         scraping_username=None,
+                         config_path='./config.yaml',
+                         log_level='INFO')
+
+        mock_followed_account_pages.side_effect = interrupted_pages
+        with pytest.raises(MaxRateLimitingRetriesExceeded):
+            scrape_following_graph(**arguments)
+
+        interrupted_account = mock_followed_account_pages.call_args[0][0]
+        mock_followed_account_pages.side_effect = resumed_pages
+        scrape_following_graph(**arguments)
+
+        graph = nx.read_gml(path.join(data_path, 'graph.gml'))
+
+    resumed_call = mock_followed_account_pages.call_args_list[1]
+    assert resumed_call[0][0] == interrupted_account
+    assert resumed_call[1]['end_cursor'] == 'cursor'
+    assert resumed_call[1]['scraped'] == 1
+    assert graph.has_edge(interrupted_account.identifier,
+                          account_five.identifier)
+    assert graph.has_edge(interrupted_account.identifier,
+                          account_six.identifier)
+
+
+@mock.patch('ig_bot.scripts.scrape_following_graph.random_sleep')
+@mock.patch('ig_bot.scripts.scrape_following_graph.get_authenticated_client')
+@mock.patch('ig_bot.scripts.scrape_following_graph.followed_account_pages')
+@mock.patch('ig_bot.scripts.scrape_following_graph.account_by_username')
+@mock.patch('ig_bot.scripts.scrape_following_graph._load_config')
+def test_scrape_graph_writes_columnar_accounts(
+        mock_load_config,
+        mock_account_by_username,
+        mock_followed_account_pages,
+        mock_get_authenticated_client,
+        mock_random_sleep,
+        account_one,
+        account_two,
+        account_three,
+):
+    mock_load_config.return_value = {
+        'ig_credentials': [{'username': 'foo', 'password': 'bar'}],
+        'accounts_format': 'COLUMNAR',
+        'accounts_journal': {'compact_every': 2},
+        'accounts_per_batch': {'minimum': 4, 'maximum': 9},
+        'sleep': {
+            'between_account_batches': {'minimum': 300, 'maximum': 600},
+            'between_accounts': {'minimum': 15, 'maximum': 45},
+        },
+    }
+    mock_account_by_username.return_value = account_one
+    followed_map = {
+        account_one.identifier: [account_two],
+        account_two.identifier: [account_one, account_three],
+        account_three.identifier: [account_one],
+    }
+    mock_followed_account_pages.side_effect = (
+        lambda account, *args, **kwargs:
+        iter([FollowsPage(followed_map[account.identifier], '')])
+    )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_path = path.join(temp_dir, 'data')
+        scrape_following_graph(data_dir=data_path,
+                               username=account_one.username,
+                               poorest_centrality_rank=3,
+                               scraping_username=None,
+                               config_path='./config.yaml',
+                               log_level='INFO')
+
+        # Nothing is left to scrape when the crawl is resumed
+        scrape_following_graph(data_dir=data_path,
+                               username=None,
+                               poorest_centrality_rank=3,
+                               scraping_username=None,
+                               config_path='./config.yaml',
+                               log_level='INFO')
+
+        table = read_accounts(path.join(data_path, 'accounts.npz'))
+        journal_size = path.getsize(
+            path.join(data_path, 'accounts.journal.jsonl')
+        )
+        csv_written = path.exists(path.join(data_path, 'accounts.csv'))
+
+    assert mock_followed_account_pages.call_count == 3
+    assert set(table.identifiers) == set(followed_map)
+    assert not np.isnat(table.dates_scraped).any()
+    assert table.centralities.dtype == np.float64
+    assert journal_size == 0
+    assert not csv_written
+
+
+@mock.patch('ig_bot.scripts.scrape_following_graph.random_sleep')
+@mock.patch('ig_bot.scripts.scrape_following_graph.get_authenticated_client')
+@mock.patch('ig_bot.scripts.scrape_following_graph.followed_account_pages')
+@mock.patch('ig_bot.scripts.scrape_following_graph.account_by_username')
+@mock.patch('ig_bot.scripts.scrape_following_graph._load_config')
+def test_scrape_graph_rewrites_csv_accounts_every_compaction(
+        mock_load_config,
+        mock_account_by_username,
+        mock_followed_account_pages,
+        mock_get_authenticated_client,
+        mock_random_sleep,
+        account_one,
+        account_two,
+        account_three,
+):
+    mock_load_config.return_value = {
+        'ig_credentials': [{'username': 'foo', 'password': 'bar'}],
+        'accounts_journal': {'compact_every': 2},
+        'accounts_per_batch': {'minimum': 4, 'maximum': 9},
+        'sleep': {
+            'between_account_batches': {'minimum': 300, 'maximum': 600},
+            'between_accounts': {'minimum': 15, 'maximum': 45},
+        },
+    }
+    mock_account_by_username.return_value = account_one
+    followed_map = {
+        account_one.identifier: [account_two],
+        account_two.identifier: [account_one, account_three],
+        account_three.identifier: [account_one],
+    }
+    mock_followed_account_pages.side_effect = (
+        lambda account, *args, **kwargs:
+        iter([FollowsPage(followed_map[account.identifier], '')])
+    )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_path = path.join(temp_dir, 'data')
+        with mock.patch(
+            'ig_bot.scripts.scrape_following_graph._save_accounts',
+            wraps=_save_accounts,
+        ) as mock_save_accounts:
+            scrape_following_graph(data_dir=data_path,
+                                   username=account_one.username,
+                                   poorest_centrality_rank=3,
+                                   scraping_username=None,
+                                   config_path='./config.yaml',
+                                   log_level='INFO')
+
+        accounts_data = pd.read_csv(path.join(data_path, 'accounts.csv'))
+
+    # Once after the second of three scrapes, and once on closing
+    assert mock_followed_account_pages.call_count == 3
+    assert mock_save_accounts.call_count == 2
+    assert set(accounts_data['identifier'].astype(str)) == set(followed_map)
+    assert accounts_data['date_scraped'].notna().all()
+
+
+@mock.patch('ig_bot.scripts.scrape_following_graph.random_sleep')
+@mock.patch('ig_bot.scripts.scrape_following_graph.get_authenticated_client')
+@mock.patch('ig_bot.scripts.scrape_following_graph.followed_account_pages')
+@mock.patch('ig_bot.scripts.scrape_following_graph.account_by_username')
+@mock.patch('ig_bot.scripts.scrape_following_graph._load_config')
+def test_scrape_graph_compacts_graph_every_compaction_of_scrapes(
+        mock_load_config,
+        mock_account_by_username,
+        mock_followed_account_pages,
+        mock_get_authenticated_client,
+        mock_random_sleep,
+        account_one,
+        account_two,
+        account_three,
+):
+    mock_load_config.return_value = {
+        'ig_credentials': [{'username': 'foo', 'password': 'bar'}],
+        'graph_journal': {'compact_every': 2},
+        'accounts_per_batch': {'minimum': 4, 'maximum': 9},
+        'sleep': {
+            'between_account_batches': {'minimum': 300, 'maximum': 600},
+            'between_accounts': {'minimum': 15, 'maximum': 45},
+        },
+    }
+    mock_account_by_username.return_value = account_one
+    followed_map = {
+        account_one.identifier: [account_two],
+        account_two.identifier: [account_one, account_three],
+        account_three.identifier: [account_one],
+    }
+    # A page per followed account, so there are more pages than scrapes
+    mock_followed_account_pages.side_effect = (
+        lambda account, *args, **kwargs: iter([
+            FollowsPage([followed], 'cursor')
+            for followed in followed_map[account.identifier]
+        ])
+    )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_path = path.join(temp_dir, 'data')
+        with mock.patch(
+            'ig_bot.scripts.scrape_following_graph._compact_graph',
+            wraps=_compact_graph,
+        ) as mock_compact_graph:
+            scrape_following_graph(data_dir=data_path,
+                                   username=account_one.username,
+                                   poorest_centrality_rank=3,
+                                   scraping_username=None,
+                                   config_path='./config.yaml',
+                                   log_level='INFO')
+
+        graph = nx.read_gml(path.join(data_path, 'graph.gml'))
+
+    # Once after the second of three scrapes, and once on closing
+    assert mock_followed_account_pages.call_count == 3
+    assert mock_compact_graph.call_count == 2
+    assert set(graph.edges) == {
+        (source, followed.identifier)
+        for source, follows in followed_map.items() for followed in follows
+    }
+
+
+@mock.patch('ig_bot.scripts.scrape_following_graph.random_sleep')
+@mock.patch('ig_bot.scripts.scrape_following_graph.get_authenticated_client')
+@mock.patch('ig_bot.scripts.scrape_following_graph.followed_account_pages')
+@mock.patch('ig_bot.scripts.scrape_following_graph.account_by_username')
+@mock.patch('ig_bot.scripts.scrape_following_graph._load_config')
+def test_scrape_graph_keeps_state_in_sqlite(
+        mock_load_config,
+        mock_account_by_username,
+        mock_followed_account_pages,
+        mock_get_authenticated_client,
+        mock_random_sleep,
+        account_one,
+        account_two,
+        account_three,
+):
+    mock_load_config.return_value = {
+        'ig_credentials': [{'username': 'foo', 'password': 'bar'}],
+        'state_backend': 'SQLITE',
+        'accounts_per_batch': {'minimum': 4, 'maximum': 9},
+        'sleep': {
+            'between_account_batches': {'minimum': 300, 'maximum': 600},
+            'between_accounts': {'minimum': 15, 'maximum': 45},
+        },
+    }
+    mock_account_by_username.return_value = account_one
+    followed_map = {
+        account_one.identifier: [account_two],
+        account_two.identifier: [account_one, account_three],
+        account_three.identifier: [account_one],
+    }
+    mock_followed_account_pages.side_effect = (
+        lambda account, *args, **kwargs:
+        iter([FollowsPage(followed_map[account.identifier], '')])
+    )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_path = path.join(temp_dir, 'data')
+        arguments = dict(data_dir=data_path,
+                         poorest_centrality_rank=3,
+                         scraping_username=None,
+                         config_path='./config.yaml',
+                         log_level='INFO')
+        scrape_following_graph(username=account_one.username, **arguments)
+        # Exits without loading anything when nothing is left to scrape
+        with mock.patch('ig_bot.state.CrawlDatabase.graph') as mock_graph:
+            scrape_following_graph(username=None, **arguments)
+
+        with CrawlDatabase(path.join(data_path, 'crawl.sqlite')) as database:
+            graph = database.graph()
+            table = database.accounts()
+        files = set(os.listdir(data_path))
+
+    mock_graph.assert_not_called()
+    assert mock_followed_account_pages.call_count == 3
+    assert set(graph.edges) == {('1', '2'), ('2', '1'), ('2', '3'), ('3', '1')}
+    assert set(table.identifiers) == set(followed_map)
+    assert not np.isnat(table.dates_scraped).any()
+    assert 'graph.gml' not in files and 'accounts.csv' not in files
+
+
+def test_accounts_from_graph_falls_back_on_approximate_pagerank():
+    graph = nx.DiGraph()
+    graph.add_node('1', identifier='1', username='one', fullName='One')
+    graph.add_node('2', identifier='2', username='two', fullName='Two')
+    graph.add_edges_from([('1', '2'), ('2', '1')])
+    logger = mock.Mock()
+
+    with mock.patch('ig_bot.pagerank.nx.pagerank',
+                    side_effect=nx.PowerIterationFailedConvergence(1)):
+        accounts = list(accounts_from_graph(
+            graph,
+            logger,
+            centrality_algorithm='PERSONALIZED_PAGERANK_CENTRALITY',
+        ))
+
+    assert [account.username for account in accounts] == ['one', 'two']
+    assert accounts[0].centrality > accounts[1].centrality > 0
+    logger.warning.assert_called_once()
+
+
+def test_file_store_caches_centrality_by_backend(tmp_path):
+    store = _FileStore(str(tmp_path), {}, mock.Mock())
+    nx.write_gml(nx.DiGraph([('1', '2'), ('2', '1')]), store.graph_path)
+    centrality = {'1': 0.5, '2': 0.5}
+
+    store.load()
+    store.cache_centrality('EIGENVECTOR_CENTRALITY', 'SPARSE', centrality)
+
+    assert store.cached_centrality(
+        'EIGENVECTOR_CENTRALITY', 'SPARSE'
+    ) == centrality
+    assert store.cached_centrality(
+        'EIGENVECTOR_CENTRALITY', 'NETWORKX'
+    ) is None
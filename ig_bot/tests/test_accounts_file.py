@@ -0,0 +1,80 @@
+from datetime import datetime
+from os import path
+import logging
+import tempfile
+
+import numpy as np
+import pytest
+
+from ig_bot.accounts_file import (
+    AccountsFormatError,
+    read_accounts,
+    write_accounts,
+)
+from ig_bot.data import Account, AccountTable
+from ig_bot.scripts.util import load_accounts, save_accounts
+
+
+DATE_SCRAPED = datetime(year=2020, month=10, day=4, hour=18, minute=8)
+
+
+@pytest.fixture
+def accounts():
+    return [
+        Account('1', 'one', 'User One', 0.25, DATE_SCRAPED),
+        Account('2', 'two', None, 0.5),
+        Account('3', 'thrée', '', None),
+    ]
+
+
+@pytest.fixture
+def temp_dir():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+
+def test_accounts_file_round_trips_table(accounts, temp_dir):
+    filepath = path.join(temp_dir, 'accounts.npz')
+
+    write_accounts(AccountTable.from_accounts(accounts), filepath)
+    table = read_accounts(filepath)
+
+    assert table.to_accounts() == accounts
+    assert table.centralities.dtype == np.float64
+    assert table.dates_scraped.dtype.kind == 'M'
+
+
+def test_accounts_file_round_trips_empty_table(temp_dir):
+    filepath = path.join(temp_dir, 'accounts.npz')
+
+    write_accounts(AccountTable(), filepath)
+
+    assert len(read_accounts(filepath)) == 0
+
+
+def test_write_accounts_rejects_nul_characters(temp_dir):
+    table = AccountTable.from_accounts([Account('1', 'o\0ne', 'One')])
+
+    with pytest.raises(ValueError):
+        write_accounts(table, path.join(temp_dir, 'accounts.npz'))
+
+
+def test_read_accounts_rejects_other_files(temp_dir):
+    filepath = path.join(temp_dir, 'accounts.npz')
+    np.savez(filepath, something=np.arange(3))
+
+    with pytest.raises(AccountsFormatError):
+        read_accounts(filepath)
+
+
+def test_accounts_csv_export_round_trips(accounts, temp_dir):
+    logger = logging.getLogger(__name__)
+    filepath = path.join(temp_dir, 'accounts.csv')
+
+    save_accounts(AccountTable.from_accounts(accounts), filepath, logger)
+    table = load_accounts(filepath, logger)
+
+    # Ordered by centrality; missing and empty names alike read back empty
+    assert [account.identifier for account in table] == ['2', '1', '3']
+    assert table.account('1') == accounts[0]
+    assert table.account('3').centrality is None
@@ -0,0 +1,186 @@
+import asyncio
+import time
+from unittest import mock
+
+import pytest
+
+from ig_bot.async_scraping import (
+    account_by_id,
+    account_by_username,
+    exponential_sleep,
+    followed_account_pages,
+    followed_accounts,
+    random_sleep,
+)
+from ig_bot.factories import AccountFactory
+from ig_bot.fakes import AsyncFakeClient, FakeClient
+from ig_bot.scraping import MaxRateLimitingRetriesExceeded, NotFound
+
+
+CONFIG = {
+    'rate_limit_retries': 3,
+    'exponential_sleep_base': 2,
+    'exponential_sleep_offset': 0,
+    'max_followed_scraped': 999,
+}
+
+
+@pytest.fixture
+def account_one():
+    return AccountFactory(identifier='1', username='one', full_name='One')
+
+
+@pytest.fixture
+def account_two():
+    return AccountFactory(identifier='2', username='two', full_name='Two')
+
+
+@pytest.fixture
+def account_three():
+    return AccountFactory(identifier='3', username='three', full_name='Three')
+
+
+@pytest.fixture
+def accounts(account_one, account_two, account_three):
+    return [account_one, account_two, account_three]
+
+
+@pytest.fixture
+def following():
+    return {'1': ['2', '3'], '2': ['3']}
+
+
+@pytest.mark.parametrize('client_class', [FakeClient, AsyncFakeClient])
+def test_followed_accounts_returns_followed(
+    client_class, accounts, following, account_one, account_two, account_three
+):
+    client = client_class(accounts, following)
+
+    result = asyncio.run(followed_accounts(account_one,
+                                           client,
+                                           config=CONFIG,
+                                           logger=mock.Mock()))
+
+    assert list(result) == [account_two, account_three]
+
+
+def test_followed_account_pages_resumes_from_cursor(accounts, account_one):
+    client = AsyncFakeClient(accounts, {'1': ['2', '3', '1']})
+    config = dict(CONFIG, follows_page_size=2)
+
+    async def collect(**kwargs):
+        return [page async for page in followed_account_pages(
+            account_one, client, config=config, logger=mock.Mock(), **kwargs
+        )]
+
+    first, last = asyncio.run(collect())
+    resumed, = asyncio.run(collect(end_cursor=first.end_cursor, scraped=2))
+
+    assert [account.identifier for account in first.accounts] == ['2', '3']
+    assert first.end_cursor == '2'
+    assert last == resumed
+    assert [account.identifier for account in last.accounts] == ['1']
+    assert last.end_cursor == ''
+
+
+def test_account_by_id_returns_account(accounts, account_two):
+    client = AsyncFakeClient(accounts)
+
+    result = asyncio.run(account_by_id('2',
+                                       client,
+                                       config=CONFIG,
+                                       logger=mock.Mock()))
+
+    assert result == account_two
+
+
+def test_account_by_username_returns_account(accounts, account_three):
+    client = FakeClient(accounts)
+
+    result = asyncio.run(account_by_username('three',
+                                             client,
+                                             config=CONFIG,
+                                             logger=mock.Mock()))
+
+    assert result == account_three
+
+
+def test_account_by_username_raises_not_found(accounts):
+    client = AsyncFakeClient(accounts)
+
+    with pytest.raises(NotFound):
+        asyncio.run(account_by_username('nobody',
+                                        client,
+                                        config=CONFIG,
+                                        logger=mock.Mock()))
+
+
+@mock.patch('ig_bot.async_scraping.asyncio.sleep')
+def test_followed_accounts_retries_on_rate_limiting(
+    mock_sleep, accounts, following, account_one
+):
+    client = FakeClient(accounts, following, failures=2)
+
+    result = asyncio.run(followed_accounts(account_one,
+                                           client,
+                                           config=CONFIG,
+                                           logger=mock.Mock()))
+
+    assert len(list(result)) == 2
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [2, 4]
+
+
+@mock.patch('ig_bot.async_scraping.asyncio.sleep')
+def test_followed_accounts_gives_up_after_retries(
+    mock_sleep, accounts, following, account_one
+):
+    client = FakeClient(accounts, following, failures=3)
+
+    with pytest.raises(MaxRateLimitingRetriesExceeded):
+        asyncio.run(followed_accounts(account_one,
+                                      client,
+                                      config=CONFIG,
+                                      logger=mock.Mock()))
+
+    assert len(client.calls) == 3
+
+
+def test_sessions_overlap_while_waiting(accounts, following):
+    clients = [AsyncFakeClient(accounts, following, latency=0.2)
+               for _ in range(5)]
+    followers = [AccountFactory(identifier='1'), AccountFactory(identifier='2')]
+
+    async def scrape_all():
+        return await asyncio.gather(*(
+            followed_accounts(follower, client, config=CONFIG, logger=mock.Mock())
+            for client in clients for follower in followers
+        ))
+
+    start = time.monotonic()
+    results = asyncio.run(scrape_all())
+
+    assert len(results) == 10
+    assert time.monotonic() - start < 1
+
+
+@mock.patch('ig_bot.async_scraping.asyncio.sleep')
+def test_exponential_sleep_sleeps_for_appropriate_durations(mock_sleep):
+
+    async def sleep_repeatedly():
+        for e in range(1, 5):
+            await exponential_sleep(exponent=e, base=2, offset=10,
+                                    logger=mock.Mock())
+
+    asyncio.run(sleep_repeatedly())
+
+    sleep_durations = tuple(call.args[0] for call in mock_sleep.call_args_list)
+    assert sleep_durations == (12, 14, 18, 26)
+
+
+@mock.patch('ig_bot.async_scraping.asyncio.sleep')
+def test_random_sleep_stays_within_range(mock_sleep):
+
+    asyncio.run(random_sleep(1, 2, logger=mock.Mock()))
+
+    duration, = mock_sleep.call_args.args
+    assert 1 <= duration <= 2
@@ -0,0 +1,146 @@
+import os
+from unittest import mock
+
+import pytest
+
+from ig_bot.cache import cache_key, response_cache_from_config, ResponseCache
+from ig_bot.data import Account
+from ig_bot.factories import AccountFactory
+from ig_bot.fakes import FakeClient
+from ig_bot.scraping import account_by_username, followed_accounts
+
+
+@pytest.fixture
+def clock():
+    return mock.Mock(return_value=1000.0)
+
+
+@pytest.fixture
+def config():
+    return {
+        'rate_limit_retries': 1,
+        'exponential_sleep_base': 1,
+        'exponential_sleep_offset': 0,
+        'max_followed_scraped': 999,
+    }
+
+
+def test_cache_key_depends_on_endpoint_identifier_and_amount():
+    key = cache_key('followed_accounts', '1', 10)
+
+    assert key == cache_key('followed_accounts', 1, 10)
+    assert key != cache_key('followed_accounts', '1', 20)
+    assert key != cache_key('followed_accounts', '2', 10)
+    assert key != cache_key('account_by_id', '1', 10)
+
+
+def test_cache_round_trips_payload(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path), clock=clock)
+
+    cache.put('followed_accounts', '1', [{'a': 1}], 10)
+
+    assert cache.get('followed_accounts', '1', 10) == [{'a': 1}]
+    assert cache.get('followed_accounts', '1', 20) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_entries_expire(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path), ttl_seconds=60, clock=clock)
+    cache.put('account_by_id', '1', {'a': 1})
+
+    clock.return_value += 61
+
+    assert not cache.contains('account_by_id', '1')
+    assert cache.get('account_by_id', '1') is None
+
+
+def test_cache_deletes_expired_entries_when_looked_up(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path), ttl_seconds=60, clock=clock)
+    cache.put('account_by_id', '1', {'a': 1})
+    cache.put('account_by_id', '2', {'a': 2})
+    clock.return_value += 61
+
+    assert cache.get('account_by_id', '1') is None
+
+    assert os.listdir(tmp_path) == [f'{cache_key("account_by_id", "2")}.json']
+    assert cache.size == 8
+
+
+def test_cache_evicts_oldest_entries_over_max_bytes(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path), max_bytes=20, clock=clock)
+
+    for identifier in ('1', '2', '3'):
+        cache.put('account_by_id', identifier, {'x': 'abc'})
+        clock.return_value += 1
+
+    assert cache.size <= 20
+    assert not cache.contains('account_by_id', '1')
+    assert cache.contains('account_by_id', '3')
+
+
+def test_cache_evicts_without_statting_entries(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path), max_bytes=20, clock=clock)
+    cache.put('account_by_id', '1', {'x': 'abc'})
+    cache.put('account_by_id', '2', {'x': 'abc'})
+
+    with mock.patch('ig_bot.cache.os.stat') as mock_stat, \
+            mock.patch('ig_bot.cache.os.path.getmtime') as mock_getmtime:
+        cache.put('account_by_id', '1', {'x': 'abcd'})
+
+    mock_stat.assert_not_called()
+    mock_getmtime.assert_not_called()
+    # Rewriting the first entry made the second the oldest
+    assert not cache.contains('account_by_id', '2')
+    assert cache.contains('account_by_id', '1')
+    assert cache.size == 13
+
+
+def test_cache_reopened_keeps_entries(tmp_path, clock):
+    ResponseCache(str(tmp_path), clock=clock).put('account_by_id', '1', {})
+
+    cache = ResponseCache(str(tmp_path), clock=clock)
+
+    assert cache.get('account_by_id', '1') == {}
+    assert cache.size == 2
+
+
+def test_response_cache_from_config(tmp_path):
+    assert response_cache_from_config({}, str(tmp_path)) is None
+
+    cache = response_cache_from_config(
+        {'response_cache': {'ttl_seconds': 5, 'max_megabytes': 1}},
+        str(tmp_path),
+    )
+
+    assert cache.directory == os.path.join(str(tmp_path), 'cache')
+    assert cache.ttl_seconds == 5
+    assert cache.max_bytes == 1024 ** 2
+
+
+def test_followed_accounts_replayed_from_cache(tmp_path, config):
+    accounts = [AccountFactory(identifier=str(i)) for i in range(3)]
+    client = FakeClient(accounts, {'0': ['1', '2']})
+    cache = ResponseCache(str(tmp_path))
+
+    first = list(followed_accounts(accounts[0], client, config=config,
+                                   logger=mock.Mock(), cache=cache))
+    second = list(followed_accounts(accounts[0], client, config=config,
+                                    logger=mock.Mock(), cache=cache))
+
+    assert first == second == [
+        Account(a.identifier, a.username, a.full_name) for a in accounts[1:]
+    ]
+    assert len(client.calls) == 1
+
+
+def test_account_by_username_replayed_from_cache(tmp_path, config):
+    account = AccountFactory(identifier='1')
+    client = FakeClient([account])
+    cache = ResponseCache(str(tmp_path))
+
+    for _ in range(2):
+        result = account_by_username(account.username, client, config=config,
+                                     logger=mock.Mock(), cache=cache)
+
+    assert result == Account('1', account.username, account.full_name)
+    assert client.calls == [('user_info_by_username', account.username)]
@@ -0,0 +1,125 @@
+import os
+from unittest import mock
+
+import networkx as nx
+import pytest
+
+from ig_bot.centrality_cache import (
+    centrality_key,
+    CentralityCache,
+    VERSION_FILENAME,
+)
+
+
+@pytest.fixture
+def graph_path(tmp_path):
+    graph = nx.DiGraph([('1', '2'), ('2', '3'), ('3', '1'), ('1', '3')])
+    filepath = str(tmp_path / 'graph.gml')
+    nx.write_gml(graph, filepath)
+    return filepath
+
+
+@pytest.fixture
+def centrality():
+    return {'1': 0.5, '2': 0.25, '3': 0.75}
+
+
+def entries(cache):
+    return sorted(name for name in os.listdir(cache.directory)
+                  if name.endswith('.npz'))
+
+
+def test_centrality_key_depends_on_algorithm_and_parameters():
+    key = centrality_key('EIGENVECTOR_CENTRALITY', max_followers=10)
+
+    assert key == centrality_key('EIGENVECTOR_CENTRALITY', max_followers=10)
+    assert key != centrality_key('EIGENVECTOR_CENTRALITY', max_followers=20)
+    assert key != centrality_key('EIGENVECTOR_CENTRALITY')
+    assert key != centrality_key('PAGERANK_CENTRALITY', max_followers=10)
+
+
+def test_cache_round_trips_centrality(graph_path, centrality):
+    cache = CentralityCache(graph_path)
+
+    cache.put('EIGENVECTOR_CENTRALITY', centrality)
+
+    assert cache.get('EIGENVECTOR_CENTRALITY') == centrality
+    assert cache.get('EIGENVECTOR_CENTRALITY', max_followers=10) is None
+    assert cache.get('PAGERANK_CENTRALITY') is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cache_keeps_backends_apart(graph_path, centrality):
+    cache = CentralityCache(graph_path)
+
+    cache.put('PAGERANK_CENTRALITY', centrality, backend='SPARSE')
+
+    assert cache.get('PAGERANK_CENTRALITY', backend='SPARSE') == centrality
+    assert cache.get('PAGERANK_CENTRALITY', backend='NETWORKX') is None
+
+
+def test_cache_is_shared_by_instances_for_the_same_graph(graph_path,
+                                                         centrality):
+    CentralityCache(graph_path).put('EIGENVECTOR_CENTRALITY', centrality)
+
+    assert CentralityCache(graph_path).get(
+        'EIGENVECTOR_CENTRALITY'
+    ) == centrality
+
+
+def test_cache_evicts_entries_once_graph_changes(graph_path, centrality):
+    cache = CentralityCache(graph_path)
+    cache.put('EIGENVECTOR_CENTRALITY', centrality)
+
+    nx.write_gml(nx.DiGraph([('1', '2')]), graph_path)
+
+    assert cache.get('EIGENVECTOR_CENTRALITY') is None
+    assert entries(cache) == []
+
+
+def test_cache_keeps_entries_when_graph_is_rewritten_unchanged(graph_path,
+                                                               centrality):
+    cache = CentralityCache(graph_path)
+    cache.put('EIGENVECTOR_CENTRALITY', centrality)
+
+    nx.write_gml(nx.read_gml(graph_path), graph_path)
+
+    assert cache.get('EIGENVECTOR_CENTRALITY') == centrality
+
+
+def test_cache_hashes_graph_only_when_its_file_changes(graph_path):
+    cache = CentralityCache(graph_path)
+    version = cache.graph_version()
+
+    with mock.patch('ig_bot.centrality_cache.file_digest') as file_digest:
+        assert cache.graph_version() == version
+    file_digest.assert_not_called()
+
+    assert os.path.exists(os.path.join(cache.directory, VERSION_FILENAME))
+
+
+def test_cache_get_or_compute_computes_once(graph_path, centrality):
+    cache = CentralityCache(graph_path)
+    compute = mock.Mock(return_value=centrality)
+
+    first = cache.get_or_compute('EIGENVECTOR_CENTRALITY', compute)
+    second = cache.get_or_compute('EIGENVECTOR_CENTRALITY', compute)
+
+    assert first == second == centrality
+    compute.assert_called_once_with()
+
+
+def test_cache_ignores_missing_graph(tmp_path, centrality):
+    cache = CentralityCache(str(tmp_path / 'graph.gml'))
+
+    cache.put('EIGENVECTOR_CENTRALITY', centrality)
+
+    assert cache.get('EIGENVECTOR_CENTRALITY') is None
+
+
+def test_cache_skips_centrality_of_nodes_not_keyed_by_string(graph_path):
+    cache = CentralityCache(graph_path)
+
+    cache.put('EIGENVECTOR_CENTRALITY', {1: 0.5})
+
+    assert cache.get('EIGENVECTOR_CENTRALITY') is None
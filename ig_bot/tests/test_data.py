@@ -2,6 +2,7 @@ from collections import defaultdict
 from datetime import datetime
 from itertools import chain
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -9,6 +10,7 @@ from ig_bot.data import (
     Account,
     accounts_from_dataframe,
     accounts_to_dataframe,
+    AccountTable,
 )
 
 
@@ -67,3 +69,96 @@ def test_accounts_to_dataframe(accounts_dataframe, account_one, account_two):
 
     assert all(result == accounts_dataframe)
 
+
+
+def test_account_table_round_trips_accounts(account_one, account_two):
+    table = AccountTable.from_accounts([account_one, account_two])
+
+    assert table.to_accounts() == [account_one, account_two]
+    assert table.account(2) == account_two
+    assert 1 in table and 3 not in table
+
+
+def test_account_table_row_view(account_one):
+    table = AccountTable.from_accounts([account_one])
+
+    row = table[1]
+    table.set_centralities([1], [0.5])
+
+    assert row.username == 'one'
+    assert row.centrality == 0.5
+    assert row.date_scraped == account_one.date_scraped
+
+
+def test_account_table_extend_skips_existing_and_grows(account_one,
+                                                       account_two):
+    table = AccountTable(capacity=1)
+    table.extend([account_one])
+
+    added = table.extend([account_one, account_two])
+    table.extend(Account(i, str(i), '') for i in range(3, 40))
+
+    assert added == 1
+    assert len(table) == 39
+    assert table.account(2) == account_two
+    assert table.account(39) == Account(39, '39', '')
+
+
+def test_account_table_vectorized_updates(account_one, account_two):
+    table = AccountTable.from_accounts([account_one, account_two])
+    date_scraped = datetime(year=2020, month=10, day=4)
+
+    table.set_centralities([2, 1], np.array([0.2, 0.1]))
+    table.set_dates_scraped([2], date_scraped)
+
+    assert list(table.centralities) == [0.1, 0.2]
+    assert table.account(2).date_scraped == date_scraped
+
+
+def test_account_table_parses_csv_strings():
+    table = AccountTable.from_accounts([
+        Account('1', 'one', 'One', '0.25', '2020-10-04 18:08:25'),
+        Account('2', 'two', 'Two', '', ''),
+    ])
+
+    assert table.account('1') == Account(
+        '1', 'one', 'One', 0.25, datetime(2020, 10, 4, 18, 8, 25)
+    )
+    assert table.account('2') == Account('2', 'two', 'Two')
+
+
+def test_account_table_interns_strings():
+    table = AccountTable.from_accounts([
+        Account('1', ''.join(['sa', 'me']), 'A'),
+        Account('2', ''.join(['sa', 'me']), 'B'),
+    ])
+
+    assert table.usernames[0] is table.usernames[1]
+
+
+def test_account_table_dataframe_round_trip(accounts_dataframe,
+                                            account_one,
+                                            account_two):
+    table = AccountTable.from_dataframe(accounts_dataframe)
+
+    assert table.to_accounts() == [account_one, account_two]
+    assert all(table.to_dataframe() == accounts_to_dataframe(
+        [account_one, account_two]
+    ))
+
+
+def test_accounts_to_dataframe_from_account_table(account_one, account_two):
+    table = AccountTable.from_accounts([account_one, account_two])
+
+    result = accounts_to_dataframe(table)
+
+    assert list(accounts_from_dataframe(result)) == [account_one, account_two]
+
+
+def test_account_table_dataframe_without_copy_shares_arrays(account_one):
+    table = AccountTable.from_accounts([account_one])
+
+    data = table.to_dataframe(copy=False)
+    table.set_centralities([1], [0.5])
+
+    assert data['centrality'].iloc[0] == 0.5
@@ -0,0 +1,255 @@
+import hashlib
+import io
+import logging
+from unittest import mock
+
+import pytest
+import requests
+
+from ig_bot.downloads import DownloadEngine, IncompleteDownload
+from ig_bot.fakes import FileServer
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger('test_downloads')
+
+
+@pytest.fixture
+def files():
+    return {f'/{i}.jpg': bytes([i]) * 1000 for i in range(8)}
+
+
+@pytest.fixture
+def server(files):
+    with FileServer(files, latency=0.05) as server:
+        yield server
+
+
+def test_download_engine_saves_files(tmp_path, logger, files, server):
+    with DownloadEngine(logger, workers=4) as downloads:
+        saved = [
+            downloads.download(str(tmp_path / 'images' / name.lstrip('/')),
+                               server.url(name))
+            for name in files
+        ]
+        filepaths = [future.result() for future in saved]
+
+    for name, filepath in zip(files, filepaths):
+        with open(filepath, 'rb') as file_obj:
+            assert file_obj.read() == files[name]
+
+
+def test_download_engine_reuses_connections(tmp_path, logger, files, server):
+    with DownloadEngine(logger, workers=2, per_host=2) as downloads:
+        for future in [downloads.download(str(tmp_path / name.lstrip('/')),
+                                          server.url(name))
+                       for name in files]:
+            future.result()
+
+    assert server.requests == len(files)
+    assert server.connections <= 2
+
+
+def test_download_engine_bounds_requests_per_host(tmp_path, logger, files,
+                                                  server):
+    with DownloadEngine(logger, workers=8, per_host=3) as downloads:
+        for future in [downloads.download(str(tmp_path / name.lstrip('/')),
+                                          server.url(name))
+                       for name in files]:
+            future.result()
+
+    assert server.max_in_flight == 3
+
+
+def test_download_engine_paces_after_each_download(tmp_path, logger, server):
+    pace = mock.Mock()
+
+    with DownloadEngine(logger, pace=pace) as downloads:
+        downloads.download(str(tmp_path / '0.jpg'),
+                           server.url('/0.jpg')).result()
+
+    pace.assert_called_once_with()
+
+
+def test_download_engine_acquires_rate_limiter_instead_of_pacing(
+    tmp_path, logger, server
+):
+    rate_limiter, pace = mock.Mock(), mock.Mock()
+
+    with DownloadEngine(logger, rate_limiter=rate_limiter,
+                        pace=pace) as downloads:
+        downloads.download(str(tmp_path / '0.jpg'),
+                           server.url('/0.jpg')).result()
+
+    rate_limiter.acquire.assert_called_once_with('image', logger)
+    pace.assert_not_called()
+
+
+def test_download_engine_raises_http_errors(tmp_path, logger, server):
+    with DownloadEngine(logger) as downloads:
+        future = downloads.download(str(tmp_path / 'missing.jpg'),
+                                    server.url('/missing.jpg'))
+
+        with pytest.raises(requests.HTTPError):
+            future.result()
+
+    assert not (tmp_path / 'missing.jpg').exists()
+
+
+@pytest.fixture
+def image():
+    return bytes(range(256)) * 1024
+
+
+def test_download_engine_skips_saved_files(tmp_path, logger, server):
+    filepath = tmp_path / '0.jpg'
+    filepath.write_bytes(b'saved')
+
+    with DownloadEngine(logger) as downloads:
+        downloads.download(str(filepath), server.url('/0.jpg'),
+                           size=len(b'saved')).result()
+
+    assert filepath.read_bytes() == b'saved'
+    assert server.requests == 0
+
+
+def test_download_engine_checks_saved_files_of_unknown_size(tmp_path, logger,
+                                                            files, server):
+    filepath = tmp_path / '0.jpg'
+    filepath.write_bytes(files['/0.jpg'])
+
+    with DownloadEngine(logger) as downloads:
+        downloads.download(str(filepath), server.url('/0.jpg')).result()
+
+    assert filepath.read_bytes() == files['/0.jpg']
+    assert server.methods == ['HEAD']
+
+
+def test_download_engine_replaces_truncated_files_of_unknown_size(
+    tmp_path, logger, files, server
+):
+    filepath = tmp_path / '0.jpg'
+    filepath.write_bytes(files['/0.jpg'][:100])
+
+    with DownloadEngine(logger) as downloads:
+        downloads.download(str(filepath), server.url('/0.jpg')).result()
+
+    assert filepath.read_bytes() == files['/0.jpg']
+    assert server.methods == ['HEAD', 'GET']
+
+
+def test_download_engine_replaces_saved_files_of_wrong_size(tmp_path, logger,
+                                                            files, server):
+    filepath = tmp_path / '0.jpg'
+    filepath.write_bytes(b'truncated')
+
+    with DownloadEngine(logger) as downloads:
+        downloads.download(str(filepath), server.url('/0.jpg'),
+                           size=len(files['/0.jpg'])).result()
+
+    assert filepath.read_bytes() == files['/0.jpg']
+
+
+def test_download_engine_resumes_interrupted_downloads(tmp_path, logger,
+                                                       image):
+    filepath = tmp_path / 'image.jpg'
+
+    with FileServer({'/image.jpg': image}, interruptions=1) as server, \
+            DownloadEngine(logger) as downloads:
+        downloads.download(str(filepath), server.url('/image.jpg')).result()
+
+    assert filepath.read_bytes() == image
+    assert 'Range' not in server.headers[0]
+    assert server.headers[1]['Range'] == f'bytes={len(image) // 2}-'
+    assert not (tmp_path / 'image.jpg.part').exists()
+
+
+def test_download_engine_keeps_part_file_of_failed_download(tmp_path, logger,
+                                                            image):
+    filepath = tmp_path / 'image.jpg'
+
+    with FileServer({'/image.jpg': image}, interruptions=2) as server:
+        with DownloadEngine(logger, resume_attempts=0) as downloads:
+            with pytest.raises(requests.exceptions.ChunkedEncodingError):
+                downloads.download(str(filepath),
+                                   server.url('/image.jpg')).result()
+        assert not filepath.exists()
+        assert (tmp_path / 'image.jpg.part').stat().st_size == len(image) // 2
+
+        with DownloadEngine(logger, resume_attempts=1) as downloads:
+            downloads.download(str(filepath),
+                               server.url('/image.jpg')).result()
+
+    assert filepath.read_bytes() == image
+    assert server.requests == 3
+
+
+def test_download_engine_restarts_when_part_file_is_too_long(tmp_path, logger,
+                                                             files, server):
+    filepath = tmp_path / '0.jpg'
+    (tmp_path / '0.jpg.part').write_bytes(bytes(5000))
+
+    with DownloadEngine(logger) as downloads:
+        downloads.download(str(filepath), server.url('/0.jpg')).result()
+
+    assert filepath.read_bytes() == files['/0.jpg']
+
+
+def test_download_engine_checks_hash(tmp_path, logger, files, server):
+    content = files['/0.jpg']
+
+    with DownloadEngine(logger, resume_attempts=0) as downloads:
+        downloads.download(str(tmp_path / 'good.jpg'), server.url('/0.jpg'),
+                           sha256=hashlib.sha256(content).hexdigest()).result()
+        bad = downloads.download(str(tmp_path / 'bad.jpg'),
+                                 server.url('/0.jpg'),
+                                 sha256=hashlib.sha256(b'').hexdigest())
+        with pytest.raises(IncompleteDownload):
+            bad.result()
+
+    assert (tmp_path / 'good.jpg').read_bytes() == content
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['good.jpg']
+
+
+
+def unsatisfiable_range_session(requested_headers):
+    """A session answering every GET with 416 Range Not Satisfiable."""
+    def get(url, headers, **kwargs):
+        requested_headers.append(dict(headers))
+        response = requests.Response()
+        response.status_code = 416
+        response.url = url
+        response.raw = io.BytesIO()
+        return response
+
+    return mock.Mock(**{'get.side_effect': get})
+
+
+def test_download_engine_raises_unsatisfiable_range_without_range(tmp_path,
+                                                                  logger):
+    requested_headers = []
+    session = unsatisfiable_range_session(requested_headers)
+
+    with DownloadEngine(logger, session=session) as downloads:
+        with pytest.raises(requests.HTTPError):
+            downloads.download(str(tmp_path / '0.jpg'),
+                               'http://example.com/0.jpg').result()
+
+    assert requested_headers == [{}]
+
+
+def test_download_engine_restarts_once_when_range_is_unsatisfiable(
+    tmp_path, logger
+):
+    (tmp_path / '0.jpg.part').write_bytes(b'partial')
+    requested_headers = []
+    session = unsatisfiable_range_session(requested_headers)
+
+    with DownloadEngine(logger, session=session) as downloads:
+        with pytest.raises(requests.HTTPError):
+            downloads.download(str(tmp_path / '0.jpg'),
+                               'http://example.com/0.jpg').result()
+
+    assert requested_headers == [{'Range': 'bytes=7-'}, {}]
+    assert not (tmp_path / '0.jpg.part').exists()
@@ -0,0 +1,184 @@
+from datetime import datetime
+import random
+
+import pytest
+
+from ig_bot.data import Account
+from ig_bot.frontier import Frontier
+
+
+DATE_SCRAPED = datetime(year=2020, month=10, day=4, hour=2, minute=44)
+
+
+def _account(identifier, centrality, date_scraped=None):
+    return Account(identifier=identifier,
+                   username=f'user{identifier}',
+                   full_name=f'User {identifier}',
+                   centrality=centrality,
+                   date_scraped=date_scraped)
+
+
+@pytest.fixture
+def frontier():
+    return Frontier([
+        _account('1', 0.1, DATE_SCRAPED),
+        _account('2', 0.04),
+        _account('3', 0.005),
+    ])
+
+
+def test_top_candidate_is_most_central_unscraped(frontier):
+    assert frontier.top_candidate(3).identifier == '2'
+
+
+def test_top_candidate_respects_poorest_rank(frontier):
+    assert frontier.top_candidate(1) is None
+
+
+def test_mark_scraped_moves_to_next_candidate(frontier):
+    frontier.mark_scraped('2', DATE_SCRAPED)
+
+    assert frontier['2'].date_scraped == DATE_SCRAPED
+    assert frontier.top_candidate(3).identifier == '3'
+    assert frontier.top_candidate(2) is None
+
+
+def test_update_centrality_reorders_candidates(frontier):
+    frontier.update_centrality({'3': 0.5, '1': 0.6, 'unknown': 1})
+
+    assert frontier.top_candidate(2).identifier == '3'
+    assert frontier['3'].centrality == 0.5
+    assert 'unknown' not in frontier
+    assert [a.identifier for a in frontier.accounts()] == ['1', '3', '2']
+
+
+def test_update_centrality_of_scraped_account_changes_rank(frontier):
+    frontier.update_centrality({'1': 0.001})
+
+    assert frontier.top_candidate(1).identifier == '2'
+
+
+def test_add_ignores_tracked_accounts(frontier):
+    frontier.add(_account('2', 0.9), _account('4', 0.03))
+
+    assert len(frontier) == 4
+    assert frontier['2'].centrality == 0.04
+    assert [a.identifier for a in frontier.accounts()] == ['1', '2', '4', '3']
+
+
+def test_ties_are_broken_by_insertion_order():
+    frontier = Frontier([_account('1', 0.2), _account('2', 0.2)])
+
+    assert frontier.top_candidate(2).identifier == '1'
+
+
+def test_empty_frontier_has_no_candidate():
+    assert Frontier().top_candidate(10) is None
+
+
+def test_matches_sorting_after_random_updates():
+    rng = random.Random(3)
+    frontier = Frontier(_account(str(i), rng.random()) for i in range(200))
+
+    for _ in range(50):
+        frontier.update_centrality({
+            str(rng.randrange(200)): rng.random() for _ in range(20)
+        })
+        candidate = frontier.top_candidate(200)
+        frontier.mark_scraped(candidate.identifier, DATE_SCRAPED)
+
+        expected = max(
+            (a for a in frontier.accounts() if not a.date_scraped),
+            key=lambda a: a.centrality,
+        )
+        assert frontier.top_candidate(200) == expected
+
+
+def test_claim_takes_candidate_out_of_contention(frontier):
+    claimed = frontier.claim(3)
+
+    assert claimed.identifier == '2'
+    assert frontier.claimed == 1
+    assert frontier.top_candidate(3).identifier == '3'
+    assert frontier.top_candidate(2) is None
+
+
+def test_mark_scraped_completes_claim(frontier):
+    frontier.claim(3)
+    frontier.mark_scraped('2', DATE_SCRAPED)
+
+    assert frontier.claimed == 0
+    assert frontier['2'].date_scraped == DATE_SCRAPED
+    assert frontier.top_candidate(3).identifier == '3'
+
+
+def test_release_returns_claimed_account(frontier):
+    frontier.claim(3)
+    frontier.release('2')
+
+    assert frontier.claimed == 0
+    assert frontier.top_candidate(3).identifier == '2'
+
+
+def test_update_centrality_of_claimed_account(frontier):
+    frontier.claim(3)
+    frontier.update_centrality({'2': 0.001})
+    frontier.release('2')
+
+    assert frontier.top_candidate(3).identifier == '3'
+
+
+def test_set_aside_account_is_not_offered_again(frontier):
+    frontier.claim(3)
+    frontier.set_aside('2')
+    frontier.update_centrality({'2': 0.5})
+
+    assert frontier.claimed == 0
+    assert frontier.top_candidate(3).identifier == '3'
+    assert frontier.top_candidate(2) is None
+    assert frontier['2'].date_scraped is None
+
+
+def test_pop_changed_returns_accounts_changed_since_last_call(frontier):
+    assert frontier.pop_changed() == []
+
+    frontier.mark_scraped('2', DATE_SCRAPED)
+    frontier.update_centrality({'3': 0.5, '1': 0.1})
+    frontier.add(_account('4', 0.2))
+
+    assert sorted(frontier.pop_changed()) == ['2', '3', '4']
+    assert frontier.pop_changed() == []
+
+
+def test_newly_relevant_ranks_untracked_nodes_among_all(frontier):
+    frontier.update_centrality({'1': 0.1, '2': 0.04, '3': 0.005,
+                                '4': 0.05, '5': 0.001})
+
+    assert frontier.newly_relevant(1) == []
+    assert frontier.newly_relevant(2) == [('4', 0.05)]
+    assert frontier.newly_relevant(5) == [('4', 0.05), ('5', 0.001)]
+
+    frontier.update_centrality({'5': 0.2})
+    assert frontier.newly_relevant(1) == [('5', 0.2)]
+
+    frontier.add(_account('5', 0.2))
+    assert frontier.newly_relevant(2) == []
+    assert frontier.newly_relevant(3) == [('4', 0.05)]
+
+
+def test_newly_relevant_matches_sorting_after_random_updates():
+    rng = random.Random(5)
+    frontier = Frontier()
+    centrality = {str(i): rng.random() for i in range(200)}
+    frontier.update_centrality(centrality)
+
+    # Few changes at a time move nodes, and many re-sort them all
+    for changes in (5, 5, 100, 5, 150, 1):
+        changed = {str(rng.randrange(200)): rng.random()
+                   for _ in range(changes)}
+        centrality.update(changed)
+        frontier.update_centrality(changed)
+
+        expected = sorted(centrality, key=centrality.get, reverse=True)[:20]
+        assert [identifier for identifier, _
+                in frontier.newly_relevant(20)] == expected
@@ -0,0 +1,148 @@
+from os import path
+import tempfile
+
+import networkx as nx
+import pytest
+
+from ig_bot.gml import (
+    GmlEdge,
+    GmlFormatError,
+    GmlNode,
+    GraphAttribute,
+    iter_gml,
+    read_gml,
+)
+
+
+TEST_GRAPH_PATH = path.join(path.dirname(__file__), 'three_accounts.gml')
+
+
+@pytest.fixture
+def temp_dir():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+
+@pytest.fixture
+def attributed_graph_path(temp_dir):
+    graph = nx.DiGraph(root='1')
+    graph.add_node('1', username='one', fullName='Ünïcode "Öne" & co',
+                   followedByCount=10, score=0.5)
+    graph.add_node('2', username='two', followedByCount=3,
+                   position={'x': 1, 'y': 2.5})
+    graph.add_node('3', username='three')
+    graph.add_edges_from([('1', '2'), ('1', '3'), ('3', '1')], weight=2)
+    graph.add_edge('2', '3')
+    filepath = path.join(temp_dir, 'graph.gml')
+    nx.write_gml(graph, filepath)
+    return filepath
+
+
+def write_file(temp_dir, content):
+    filepath = path.join(temp_dir, 'graph.gml')
+    with open(filepath, 'w') as file_obj:
+        file_obj.write(content)
+    return filepath
+
+
+def assert_graphs_equal(graph, expected):
+    assert type(graph) is type(expected)
+    assert list(graph.nodes(data=True)) == list(expected.nodes(data=True))
+    assert list(graph.edges(data=True)) == list(expected.edges(data=True))
+    assert graph.graph == expected.graph
+
+
+def test_read_gml_matches_networkx():
+    assert_graphs_equal(read_gml(TEST_GRAPH_PATH),
+                        nx.read_gml(TEST_GRAPH_PATH))
+
+
+def test_read_gml_matches_networkx_for_escaped_and_nested_attributes(
+    attributed_graph_path
+):
+    assert_graphs_equal(read_gml(attributed_graph_path),
+                        nx.read_gml(attributed_graph_path))
+
+
+def test_iter_gml_yields_items_in_file_order(temp_dir):
+    filepath = write_file(temp_dir, '''graph [
+  directed 1
+  # Comments are skipped
+  node [ id 0 label "a" ]
+  node [ id 1 label "b" size 2 ]
+  edge [ source 0 target 1 ]
+  name "follows"
+]
+''')
+
+    assert list(iter_gml(filepath)) == [
+        GraphAttribute('directed', 1),
+        GmlNode('a', {}),
+        GmlNode('b', {'size': 2}),
+        GmlEdge('a', 'b', {}),
+        GraphAttribute('name', 'follows'),
+    ]
+
+
+def test_iter_gml_is_lazy(attributed_graph_path):
+    items = iter_gml(attributed_graph_path)
+
+    assert next(items) == GraphAttribute('directed', 1)
+    items.close()
+
+
+def test_read_gml_filters_nodes_by_whitelist(attributed_graph_path):
+    graph = read_gml(attributed_graph_path, nodes={'1', '2'})
+
+    assert list(graph) == ['1', '2']
+    assert list(graph.edges) == [('1', '2')]
+
+
+def test_read_gml_filters_nodes_by_attribute_predicate(attributed_graph_path):
+    graph = read_gml(
+        attributed_graph_path,
+        node_filter=lambda key, data: data.get('followedByCount', 0) < 10,
+    )
+
+    assert list(graph) == ['2', '3']
+    assert list(graph.edges) == [('2', '3')]
+
+
+def test_read_gml_limits_node_attributes(attributed_graph_path):
+    graph = read_gml(attributed_graph_path,
+                     node_filter=lambda key, data: 'followedByCount' in data,
+                     node_attributes={'username'})
+
+    assert dict(graph.nodes(data=True)) == {
+        '1': {'username': 'one'},
+        '2': {'username': 'two'},
+    }
+    assert graph.edges['1', '2'] == {'weight': 2}
+
+
+def test_read_gml_keys_unlabelled_nodes_by_id(temp_dir):
+    filepath = write_file(
+        temp_dir,
+        'graph [ node [ id 7 ] node [ id 8 ] edge [ source 7 target 8 ] ]'
+    )
+
+    graph = read_gml(filepath)
+
+    assert not graph.is_directed()
+    assert list(graph.edges) == [(7, 8)]
+
+
+@pytest.mark.parametrize('content', (
+    'node [ id 0 ]',
+    'graph [ node [ id 0 ]',
+    'graph [ node [ label "a" ] ]',
+    'graph [ node [ id 0 ] node [ id 0 ] ]',
+    'graph [ edge [ source 0 target 1 ] node [ id 0 ] node [ id 1 ] ]',
+    'graph [ node [ id 0 label @ ] ]',
+    'graph [ multigraph 1 ]',
+))
+def test_read_gml_rejects_unsupported_files(temp_dir, content):
+    filepath = write_file(temp_dir, content)
+
+    with pytest.raises(GmlFormatError):
+        read_gml(filepath)
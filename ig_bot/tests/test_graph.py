@@ -7,8 +7,17 @@ from ig_bot.factories import AccountFactory
 from ig_bot.graph import (
     add_edges, 
     add_nodes, 
+    CompactGraph,
+    EIGENVECTOR_CENTRALITY,
     IN_DEGREE_CENTRALITY,
-    accounts_with_centrality
+    IncrementalCentrality,
+    accounts_with_centrality,
+    ingest_edges,
+    ingest_follows,
+    ingest_nodes,
+    IngestCounts,
+    record_change,
+    SPARSE_BACKEND,
 )
 
 
@@ -118,3 +127,256 @@ def test_accounts_with_centrality(account_one, account_two, account_three):
 
     nx.write_gml(graph, '/home/sc/git/instagraph-bot/ig_bot/tests/three_accounts.gml')
 
+
+
+@pytest.fixture
+def follow_graph():
+    graph = nx.gnp_random_graph(60, 0.1, seed=7, directed=True)
+    return nx.relabel_nodes(graph, {n: str(n) for n in graph})
+
+
+def test_incremental_centrality_matches_full_computation(follow_graph):
+    incremental = IncrementalCentrality(max_drift=1)
+    incremental(follow_graph, EIGENVECTOR_CENTRALITY)
+
+    follow_graph.add_edges_from([('0', '60'), ('60', '1'), ('2', '3')])
+    result = incremental(follow_graph, EIGENVECTOR_CENTRALITY)
+
+    expected = nx.eigenvector_centrality(follow_graph)
+    assert result.keys() == expected.keys()
+    for node, value in expected.items():
+        assert result[node] == pytest.approx(value, abs=1e-4)
+
+
+def test_incremental_centrality_warm_starts_within_drift(follow_graph):
+    incremental = IncrementalCentrality(max_drift=0.5)
+    incremental(follow_graph, EIGENVECTOR_CENTRALITY)
+    follow_graph.add_edge('0', '60')
+
+    eigenvector_centrality = mock.Mock(return_value={})
+
+    with mock.patch.dict('ig_bot.graph.CENTRALITY_METRIC_FUNCTIONS',
+                         {EIGENVECTOR_CENTRALITY: eigenvector_centrality}):
+        incremental(follow_graph, EIGENVECTOR_CENTRALITY)
+
+    (_, kwargs), = eigenvector_centrality.call_args_list
+    assert set(kwargs['nstart']) == set(follow_graph)
+    assert kwargs['nstart']['60'] > 0
+
+
+def test_incremental_centrality_cold_starts_beyond_drift(follow_graph):
+    incremental = IncrementalCentrality(max_drift=0)
+    incremental(follow_graph, EIGENVECTOR_CENTRALITY)
+    follow_graph.add_edge('0', '60')
+
+    eigenvector_centrality = mock.Mock(return_value={})
+
+    with mock.patch.dict('ig_bot.graph.CENTRALITY_METRIC_FUNCTIONS',
+                         {EIGENVECTOR_CENTRALITY: eigenvector_centrality}):
+        incremental(follow_graph, EIGENVECTOR_CENTRALITY)
+
+    eigenvector_centrality.assert_called_once_with(follow_graph)
+
+
+def test_incremental_centrality_reuses_result_for_unchanged_graph(
+    follow_graph
+):
+    incremental = IncrementalCentrality()
+    first = incremental(follow_graph, IN_DEGREE_CENTRALITY)
+
+    assert incremental(follow_graph, IN_DEGREE_CENTRALITY) is first
+
+
+def test_incremental_centrality_recomputes_after_same_size_change(
+    follow_graph
+):
+    incremental = IncrementalCentrality()
+    first = incremental(follow_graph, IN_DEGREE_CENTRALITY)
+    size = (follow_graph.number_of_nodes(), follow_graph.number_of_edges())
+    source, destination = next(iter(follow_graph.edges))
+    follow_graph.remove_edge(source, destination)
+    ingest_edges(follow_graph, destination, [source])
+
+    result = incremental(follow_graph, IN_DEGREE_CENTRALITY)
+
+    assert (follow_graph.number_of_nodes(),
+            follow_graph.number_of_edges()) == size
+    assert result is not first
+    assert result == nx.in_degree_centrality(follow_graph)
+
+
+def test_incremental_centrality_recomputes_after_recorded_change(
+    follow_graph
+):
+    incremental = IncrementalCentrality()
+    first = incremental(follow_graph, IN_DEGREE_CENTRALITY)
+    source, destination = next(iter(follow_graph.edges))
+    follow_graph.remove_edge(source, destination)
+    follow_graph.add_edge(destination, source)
+    record_change(follow_graph)
+
+    result = incremental(follow_graph, IN_DEGREE_CENTRALITY)
+
+    assert result is not first
+    assert result == nx.in_degree_centrality(follow_graph)
+
+
+def test_incremental_centrality_recomputes_for_other_graph(follow_graph):
+    incremental = IncrementalCentrality()
+    first = incremental(follow_graph, IN_DEGREE_CENTRALITY)
+
+    assert incremental(follow_graph.copy(), IN_DEGREE_CENTRALITY) is not first
+
+
+def test_incremental_centrality_updated_returns_changed_values(
+    follow_graph
+):
+    incremental = IncrementalCentrality()
+    first = incremental(follow_graph, IN_DEGREE_CENTRALITY)
+
+    assert incremental.updated(follow_graph) == first
+    assert incremental.updated(follow_graph) == {}
+
+    destination = next(node for node in follow_graph
+                       if node != '0' and node not in follow_graph.succ['0'])
+    ingest_edges(follow_graph, '0', [destination])
+    result = incremental(follow_graph, IN_DEGREE_CENTRALITY)
+
+    assert incremental.updated(follow_graph) == {
+        destination: result[destination]
+    }
+
+
+def test_incremental_centrality_warm_starts_from_seed(follow_graph):
+    incremental = IncrementalCentrality(max_drift=0.5)
+    seeded = nx.eigenvector_centrality(follow_graph)
+    incremental.seed(follow_graph, EIGENVECTOR_CENTRALITY, seeded)
+
+    assert incremental(follow_graph, EIGENVECTOR_CENTRALITY) is seeded
+    assert incremental.latest(follow_graph, EIGENVECTOR_CENTRALITY) is seeded
+
+    follow_graph.add_edge('0', '60')
+    assert incremental.latest(follow_graph, EIGENVECTOR_CENTRALITY) is None
+
+    eigenvector_centrality = mock.Mock(return_value={})
+    with mock.patch.dict('ig_bot.graph.CENTRALITY_METRIC_FUNCTIONS',
+                         {EIGENVECTOR_CENTRALITY: eigenvector_centrality}):
+        incremental(follow_graph, EIGENVECTOR_CENTRALITY)
+
+    (_, kwargs), = eigenvector_centrality.call_args_list
+    assert kwargs['nstart']['1'] == seeded['1']
+
+
+def assert_same_graph(compact_graph, graph):
+    converted = compact_graph.to_networkx()
+    assert list(converted.nodes(data=True)) == list(graph.nodes(data=True))
+    assert list(converted.edges) == list(graph.edges)
+    assert compact_graph.number_of_nodes() == graph.number_of_nodes()
+    assert compact_graph.number_of_edges() == graph.number_of_edges()
+
+
+@pytest.mark.parametrize('compact_every', (1, 3, 1000))
+def test_compact_graph_matches_networkx_graph(
+    compact_every, account_one, account_two, account_three
+):
+    compact_graph = CompactGraph(compact_every=compact_every)
+    graph = nx.DiGraph()
+
+    for target in (compact_graph, graph):
+        add_nodes(target, account_one)
+        add_edges(target, account_one, [account_two, account_three])
+        add_edges(target, account_two, [account_three, account_three])
+        add_nodes(target, account_three)
+        add_edges(target, account_one, [account_three, account_one])
+        add_edges(target, account_three, [account_two])
+
+    assert_same_graph(compact_graph, graph)
+    assert compact_graph.successors('1') == ['2', '3', '1']
+    assert compact_graph.has_edge('2', '3')
+    assert not compact_graph.has_edge('3', '1')
+
+
+def test_compact_graph_round_trips_networkx_graph(follow_graph):
+    for node in follow_graph:
+        follow_graph.add_node(node, identifier=node, username=f'user{node}',
+                              fullName=f'User {node}')
+    follow_graph.add_edge('0', 'undescribed')
+
+    compact_graph = CompactGraph.from_networkx(follow_graph)
+
+    assert_same_graph(compact_graph, follow_graph)
+    indptr, indices = compact_graph.csr()
+    assert indices.dtype == 'int32'
+    assert indptr[-1] == follow_graph.number_of_edges()
+
+
+def test_compact_graph_centrality_matches_networkx_graph(follow_graph):
+    for node in follow_graph:
+        follow_graph.add_node(node, identifier=node, username=f'user{node}',
+                              fullName=f'User {node}')
+    compact_graph = CompactGraph.from_networkx(follow_graph)
+
+    expected = {
+        account.identifier: account
+        for account in accounts_with_centrality(follow_graph,
+                                                EIGENVECTOR_CENTRALITY)
+    }
+    for backend in (SPARSE_BACKEND, 'NETWORKX'):
+        results = accounts_with_centrality(compact_graph,
+                                           EIGENVECTOR_CENTRALITY,
+                                           backend=backend)
+        for account in results:
+            assert account.username == expected[account.identifier].username
+            assert account.centrality == pytest.approx(
+                expected[account.identifier].centrality, abs=1e-4
+            )
+
+
+@pytest.mark.parametrize('graph_class', (nx.DiGraph, CompactGraph))
+def test_ingest_nodes_counts_new_updated_and_unchanged_nodes(graph_class):
+    graph = graph_class()
+    ingest_nodes(graph, ['1', '2'], ['one', 'two'], ['One', 'Two'])
+
+    counts = ingest_nodes(graph,
+                          ['1', '2', '3', '3'],
+                          ['one', 'deux', 'tri', 'three'],
+                          ['One', 'Two', 'Three', 'Three'])
+
+    assert counts == IngestCounts(new_nodes=1,
+                                  updated_nodes=1,
+                                  unchanged_nodes=1)
+    assert counts.saturation == pytest.approx(2 / 3)
+    converted = graph if graph_class is nx.DiGraph else graph.to_networkx()
+    assert dict(converted.nodes(data='username')) == {
+        '1': 'one', '2': 'deux', '3': 'three',
+    }
+
+
+def test_ingest_nodes_keeps_other_node_attributes():
+    graph = nx.DiGraph()
+    graph.add_node('1', identifier='1', username='one', fullName='One',
+                   followedByCount=3)
+
+    ingest_nodes(graph, ['1'], ['uno'], ['One'])
+
+    assert graph.nodes['1'] == {'identifier': '1', 'username': 'uno',
+                                'fullName': 'One', 'followedByCount': 3}
+
+
+@pytest.mark.parametrize('graph_class', (nx.DiGraph, CompactGraph))
+def test_ingest_follows_counts_new_edges(
+    graph_class, account_one, account_two, account_three
+):
+    graph = graph_class()
+    add_nodes(graph, account_one)
+
+    first = ingest_follows(graph, account_one, [account_two])
+    second = ingest_follows(graph, account_one, [account_two, account_three])
+
+    assert first == IngestCounts(new_nodes=1, new_edges=1)
+    assert second == IngestCounts(new_nodes=1, unchanged_nodes=1, new_edges=1)
+    assert first + second == IngestCounts(new_nodes=2,
+                                          unchanged_nodes=1,
+                                          new_edges=2)
+    assert graph.number_of_edges() == 2
+    assert ingest_follows(graph, account_two, []) == IngestCounts()
@@ -0,0 +1,143 @@
+from os import path
+import tempfile
+
+from datetime import datetime
+
+import networkx as nx
+import pytest
+
+from ig_bot.data import Account, AccountTable
+from ig_bot.factories import AccountFactory
+from ig_bot.graph import add_edges, add_nodes
+from ig_bot.journal import (
+    AccountJournal,
+    GraphJournal,
+    replay_account_journal,
+    replay_journal,
+)
+
+
+@pytest.fixture
+def account_one():
+    return AccountFactory(identifier='1', username='one', full_name='One')
+
+
+@pytest.fixture
+def account_two():
+    return AccountFactory(identifier='2', username='two', full_name='Two')
+
+
+@pytest.fixture
+def account_three():
+    return AccountFactory(identifier='3', username='three', full_name='Three')
+
+
+@pytest.fixture
+def journal_path():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield path.join(temp_dir, 'graph.journal.jsonl')
+
+
+def test_replay_journal_reproduces_recorded_graph(
+    journal_path, account_one, account_two, account_three
+):
+    expected_graph = nx.DiGraph()
+    add_nodes(expected_graph, account_one, account_two, account_three)
+    add_edges(expected_graph, account_one, [account_two, account_three])
+    add_edges(expected_graph, account_two, [account_three])
+
+    with GraphJournal(journal_path) as journal:
+        journal.record([account_one])
+        journal.record([account_two, account_three],
+                       account_one,
+                       [account_two, account_three])
+        journal.record([account_three], account_two, [account_three])
+
+    graph = nx.DiGraph()
+    records = replay_journal(graph, journal_path)
+
+    assert records == 3
+    assert graph.nodes(data=True) == expected_graph.nodes(data=True)
+    assert graph.edges == expected_graph.edges
+
+
+def test_replay_journal_records_root(journal_path, account_one, account_two):
+    with GraphJournal(journal_path) as journal:
+        journal.record([account_two])
+        journal.record_root(account_one)
+
+    graph = nx.DiGraph()
+    replay_journal(graph, journal_path)
+
+    assert list(graph) == ['2', '1']
+    assert graph.graph == {'root': '1'}
+    assert graph.nodes['1']['username'] == 'one'
+
+
+def test_replay_journal_ignores_torn_final_record(
+    journal_path, account_one, account_two
+):
+    with GraphJournal(journal_path) as journal:
+        journal.record([account_one])
+    with open(journal_path, 'a') as file_obj:
+        file_obj.write('{"nodes": [{"identifier": "2", "use')
+
+    graph = nx.DiGraph()
+    records = replay_journal(graph, journal_path)
+
+    assert records == 1
+    assert list(graph) == [account_one.identifier]
+
+
+def test_journal_discards_torn_record_when_reopened(
+    journal_path, account_one, account_two
+):
+    with GraphJournal(journal_path) as journal:
+        journal.record([account_one])
+    with open(journal_path, 'a') as file_obj:
+        file_obj.write('{"nodes": [{"identifier": "2", "use')
+
+    with GraphJournal(journal_path) as journal:
+        journal.record([account_two], account_one, [account_two])
+
+    graph = nx.DiGraph()
+    assert replay_journal(graph, journal_path) == 2
+    assert list(graph.edges) == [('1', '2')]
+
+
+def test_journal_clear_empties_journal(journal_path, account_one):
+    with GraphJournal(journal_path) as journal:
+        journal.record([account_one])
+        journal.clear()
+        assert journal.records_written == 0
+
+    assert replay_journal(nx.DiGraph(), journal_path) == 0
+
+
+def test_replay_journal_missing_file(journal_path):
+    assert replay_journal(nx.DiGraph(), journal_path) == 0
+
+
+def test_replay_account_journal_applies_recorded_changes(journal_path):
+    date_scraped = datetime(year=2020, month=10, day=4)
+    table = AccountTable.from_accounts([
+        Account('1', 'one', 'One', 0.5),
+        Account('2', 'two', 'Two', 0.25),
+    ])
+    replayed = AccountTable.from_accounts(table.to_accounts())
+
+    with AccountJournal(journal_path) as journal:
+        table.set_dates_scraped(['1'], date_scraped)
+        table.extend([Account('3', 'three', None, 0.75)])
+        journal.record(table, ['1', '3'])
+        table.set_centralities(['2'], [0.125])
+        journal.record(table, ['2'])
+
+    records = replay_account_journal(replayed, journal_path)
+
+    assert records == 2
+    assert replayed.to_accounts() == [
+        Account('1', 'one', 'One', 0.5, date_scraped),
+        Account('2', 'two', 'Two', 0.125),
+        Account('3', 'three', None, 0.75),
+    ]
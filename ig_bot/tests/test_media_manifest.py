@@ -0,0 +1,168 @@
+from datetime import datetime
+import json
+
+import pytest
+
+from ig_bot.media_manifest import MediaManifest, SavedImage
+
+
+POST_URL = 'https://www.instagram.com/p/B_sidecar1/'
+SIDECAR_IMAGES = [
+    ('1/images/10/children/11/image.jpg', '11', 'https://cdn/11.jpg'),
+    ('1/images/10/children/12/image.jpg', '12', 'https://cdn/12.jpg'),
+]
+TAKEN_AT = int(datetime(2020, 4, 4).timestamp())
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    with MediaManifest(str(tmp_path / 'manifest.sqlite')) as manifest:
+        yield manifest
+
+
+def record_sidecar(manifest):
+    manifest.record_media(POST_URL, 1, '10', '1/images/10/data.json',
+                          TAKEN_AT, SIDECAR_IMAGES)
+
+
+def test_account_completed(manifest):
+    assert not manifest.account_completed('1')
+
+    manifest.complete_account(1)
+
+    assert manifest.account_completed('1')
+    assert not manifest.account_completed('2')
+
+
+def test_media_completed_once_all_images_saved(manifest):
+    record_sidecar(manifest)
+    assert not manifest.complete_media(POST_URL)
+    assert not manifest.media_completed(POST_URL)
+
+    manifest.record_images_saved([(SIDECAR_IMAGES[0][0], 100)])
+    assert not manifest.complete_media(POST_URL)
+
+    manifest.record_images_saved([(SIDECAR_IMAGES[1][0], 200)])
+    assert manifest.complete_media(POST_URL)
+    assert manifest.media_completed(POST_URL)
+
+
+def test_record_media_again_keeps_saved_images(manifest):
+    record_sidecar(manifest)
+    manifest.record_images_saved([(SIDECAR_IMAGES[0][0], 100)])
+
+    record_sidecar(manifest)
+    manifest.record_images_saved([(SIDECAR_IMAGES[1][0], 200)])
+
+    assert manifest.complete_media(POST_URL)
+
+
+def test_saved_images_filters_by_account_and_date(manifest):
+    record_sidecar(manifest)
+    manifest.record_media('https://www.instagram.com/p/B_single01/', 2, '20',
+                          '2/images/20/data.json', TAKEN_AT - 86400,
+                          [('2/images/20/image.jpg', '20', 'https://cdn/20')])
+    manifest.record_images_saved([(SIDECAR_IMAGES[0][0], 100),
+                                  ('2/images/20/image.jpg', 300)])
+
+    first_image = SavedImage(SIDECAR_IMAGES[0][0], '11', '1', '10', TAKEN_AT)
+    assert list(manifest.saved_images()) == [
+        first_image,
+        SavedImage('2/images/20/image.jpg', '20', '2', '20', TAKEN_AT - 86400),
+    ]
+    assert list(manifest.saved_images(accounts=[1])) == [first_image]
+    assert list(manifest.saved_images(
+        oldest=datetime.utcfromtimestamp(TAKEN_AT)
+    )) == [first_image]
+
+
+def test_import_completed_markers(tmp_path, manifest):
+    for identifier in ('1', '3'):
+        (tmp_path / identifier).mkdir()
+        (tmp_path / identifier / 'completed').write_text(':-)\n')
+
+    assert manifest.import_completed_markers(str(tmp_path), [1, 2, 3]) == 2
+
+    assert manifest.account_completed('1')
+    assert not manifest.account_completed('2')
+    assert manifest.account_completed('3')
+
+
+def test_read_only_manifest_reads_while_written(tmp_path, manifest):
+    record_sidecar(manifest)
+    manifest.record_images_saved([(SIDECAR_IMAGES[0][0], 100)])
+
+    with MediaManifest(manifest.filepath, read_only=True) as reader:
+        assert [image.image_id for image in reader.saved_images()] == ['11']
+
+
+def save_legacy_post(users_directory, account, data, image_paths):
+    media_directory = users_directory / account / 'images' / data['id']
+    media_directory.mkdir(parents=True)
+    (media_directory / 'data.json').write_text(json.dumps(data))
+    for image_path in image_paths:
+        (users_directory / image_path).parent.mkdir(parents=True,
+                                                    exist_ok=True)
+        (users_directory / image_path).write_bytes(b'jpeg')
+
+
+def test_import_saved_media_records_posts_saved_before_manifest(
+    tmp_path, manifest
+):
+    users_directory = tmp_path / 'users'
+    save_legacy_post(users_directory, '1', {
+        'id': '10',
+        'shortcode': 'B_sidecar1',
+        'taken_at_timestamp': TAKEN_AT,
+        'edge_sidecar_to_children': {'edges': [
+            {'node': {'id': '11', 'display_url': 'https://cdn/11.jpg'}},
+            {'node': {'id': '12', 'display_url': 'https://cdn/12.jpg'}},
+        ]},
+    }, [SIDECAR_IMAGES[0][0]])
+    save_legacy_post(users_directory, '2', {
+        'id': '20',
+        'shortcode': 'B_single01',
+        'taken_at_timestamp': TAKEN_AT - 86400,
+        'display_url': 'https://cdn/20.jpg',
+    }, ['2/images/20/image.jpg'])
+
+    assert manifest.import_saved_media(str(users_directory)) == 2
+
+    assert list(manifest.saved_images()) == [
+        SavedImage(SIDECAR_IMAGES[0][0], '11', '1', '10', TAKEN_AT),
+        SavedImage('2/images/20/image.jpg', '20', '2', '20', TAKEN_AT - 86400),
+    ]
+    assert not manifest.media_completed(POST_URL)
+    assert manifest.media_completed('https://www.instagram.com/p/B_single01/')
+
+    save_legacy_post(users_directory, '3', {
+        'id': '30',
+        'shortcode': 'B_later001',
+        'taken_at_timestamp': TAKEN_AT,
+        'display_url': 'https://cdn/30.jpg',
+    }, ['3/images/30/image.jpg'])
+    assert manifest.import_saved_media(str(users_directory)) == 0
+
+
+def test_import_saved_media_skips_recorded_posts(tmp_path, manifest):
+    users_directory = tmp_path / 'users'
+    save_legacy_post(users_directory, '1', {
+        'id': '10',
+        'shortcode': 'B_other001',
+        'taken_at_timestamp': TAKEN_AT,
+        'display_url': 'https://cdn/10.jpg',
+    }, [])
+    record_sidecar(manifest)
+
+    assert manifest.import_saved_media(str(users_directory)) == 0
+    assert not manifest.media_completed(
+        'https://www.instagram.com/p/B_other001/'
+    )
+
+
+def test_saved_images_without_oldest_date(manifest):
+    record_sidecar(manifest)
+    manifest.record_images_saved([(SIDECAR_IMAGES[1][0], 200)])
+
+    assert [image.image_id
+            for image in manifest.saved_images(oldest=None)] == ['12']
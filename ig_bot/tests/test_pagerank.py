@@ -0,0 +1,117 @@
+import networkx as nx
+import pytest
+
+from ig_bot import sparse
+from ig_bot.data import Account
+from ig_bot.graph import (
+    APPROXIMATE_PAGERANK_CENTRALITY,
+    centrality_function,
+    CompactGraph,
+    PERSONALIZED_PAGERANK_CENTRALITY,
+    set_root,
+    SPARSE_BACKEND,
+)
+from ig_bot.pagerank import (
+    approximate_pagerank,
+    personalized_pagerank,
+    push_pagerank,
+)
+
+
+@pytest.fixture
+def follow_graph():
+    graph = nx.gnp_random_graph(300, 0.02, seed=5, directed=True)
+    return nx.relabel_nodes(graph, {n: str(n) for n in graph})
+
+
+@pytest.fixture
+def root_pagerank(follow_graph):
+    return nx.pagerank(follow_graph, personalization={'0': 1}, tol=1e-12)
+
+
+def assert_centrality_equal(result, expected, abs=1e-5):
+    assert result.keys() == expected.keys()
+    for node, value in expected.items():
+        assert result[node] == pytest.approx(value, abs=abs)
+
+
+@pytest.mark.parametrize('backend', ('NETWORKX', SPARSE_BACKEND))
+def test_personalized_pagerank_restarts_at_first_node(
+    follow_graph, root_pagerank, backend
+):
+    function = centrality_function(PERSONALIZED_PAGERANK_CENTRALITY, backend)
+
+    assert_centrality_equal(function(follow_graph), root_pagerank)
+
+
+@pytest.mark.parametrize('backend', ('NETWORKX', SPARSE_BACKEND))
+def test_approximate_pagerank_is_within_epsilon(
+    follow_graph, root_pagerank, backend
+):
+    function = centrality_function(APPROXIMATE_PAGERANK_CENTRALITY, backend)
+
+    assert_centrality_equal(function(follow_graph), root_pagerank, abs=1e-3)
+
+
+@pytest.mark.parametrize('algorithm', (PERSONALIZED_PAGERANK_CENTRALITY,
+                                       APPROXIMATE_PAGERANK_CENTRALITY))
+@pytest.mark.parametrize('backend', ('NETWORKX', SPARSE_BACKEND))
+@pytest.mark.parametrize('compact', (False, True))
+def test_pagerank_restarts_at_recorded_root(
+    follow_graph, algorithm, backend, compact
+):
+    set_root(follow_graph, Account('7', 'seven', 'Seven'))
+    expected = nx.pagerank(follow_graph, personalization={'7': 1}, tol=1e-12)
+    graph = follow_graph
+    if compact:
+        graph = CompactGraph.from_networkx(graph)
+        if backend == 'NETWORKX':
+            graph = graph.to_networkx()
+
+    result = centrality_function(algorithm, backend)(graph)
+
+    assert list(follow_graph)[0] == '0'
+    assert_centrality_equal(result, expected, abs=1e-3)
+    assert max(result, key=result.get) == '7'
+
+
+def test_approximate_pagerank_backends_agree(follow_graph):
+    seeds = ['3', '7']
+
+    assert (
+        sparse.approximate_pagerank(follow_graph, seeds, epsilon=1e-6)
+        == approximate_pagerank(follow_graph, seeds, epsilon=1e-6)
+    )
+
+
+@pytest.mark.parametrize('function', (
+    personalized_pagerank,
+    approximate_pagerank,
+    sparse.personalized_pagerank,
+    sparse.approximate_pagerank,
+))
+def test_pagerank_rejects_seeds_not_in_graph(follow_graph, function):
+    with pytest.raises(ValueError, match='missing'):
+        function(follow_graph, ['3', 'missing'])
+
+
+def test_push_pagerank_only_visits_nodes_reachable_from_seeds():
+    graph = nx.DiGraph([('a', 'b'), ('b', 'a'), ('b', 'c')])
+    nx.add_path(graph, [str(n) for n in range(1000)])
+    visited = set()
+
+    def successors(node):
+        visited.add(node)
+        return list(graph.succ[node])
+
+    estimate = push_pagerank(['a'], successors, graph.out_degree)
+
+    assert visited == {'a', 'b', 'c'}
+    assert estimate.keys() == {'a', 'b', 'c'}
+    assert sum(estimate.values()) == pytest.approx(1, abs=1e-3)
+
+
+def test_pagerank_of_empty_graph_is_empty():
+    assert personalized_pagerank(nx.DiGraph()) == {}
+    assert approximate_pagerank(nx.DiGraph()) == {}
+    assert sparse.approximate_pagerank(nx.DiGraph()) == {}
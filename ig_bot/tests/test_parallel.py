@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from scipy import sparse
+
+from ig_bot import parallel
+from ig_bot.parallel import ParallelProduct, row_blocks
+
+
+@pytest.fixture
+def matrix():
+    return sparse.random(300, 200, density=0.05, format='csr', random_state=3)
+
+
+def test_parallel_product_matches_matrix_product(matrix):
+    vectors = np.random.default_rng(5).random((3, 200))
+
+    with ParallelProduct(matrix, workers=3) as product:
+        results = [product(vector) for vector in vectors]
+
+    for vector, result in zip(vectors, results):
+        np.testing.assert_allclose(result, matrix @ vector)
+
+
+def test_parallel_product_handles_empty_rows():
+    matrix = sparse.csr_matrix((4, 4))
+
+    with ParallelProduct(matrix, workers=2) as product:
+        np.testing.assert_array_equal(product(np.ones(4)), np.zeros(4))
+
+
+def test_parallel_products_share_a_fork_server_pool(matrix):
+    vector = np.ones(200)
+
+    with ParallelProduct(matrix, workers=2) as product:
+        product(vector)
+    pool = parallel._pools[2]
+    with ParallelProduct(matrix.T.tocsr()[:, :300], workers=2) as product:
+        np.testing.assert_allclose(product(np.ones(300)),
+                                   matrix.T @ np.ones(300))
+
+    assert parallel._pools[2] is pool
+    assert pool._mp_context.get_start_method() == parallel.START_METHOD
+    assert parallel.START_METHOD != 'fork'
+
+
+def test_row_blocks_cover_rows_with_balanced_entries():
+    # Row 0 holds half of the entries
+    indptr = np.array([0, 6, 7, 8, 9, 10, 11, 12])
+
+    blocks = row_blocks(indptr, 2)
+
+    assert blocks == [(0, 1), (1, 7)]
+
+
+def test_row_blocks_never_exceed_row_count():
+    assert row_blocks(np.array([0, 1]), 4) == [(0, 1)]
+    assert row_blocks(np.array([0]), 4) == []
@@ -0,0 +1,176 @@
+from os import path
+from unittest import mock
+
+import pytest
+import yaml
+
+from ig_bot.factories import AccountFactory
+from ig_bot.fakes import FakeClient
+from ig_bot.rate_limiting import (
+    AdaptiveTokenBucket,
+    RateLimiter,
+    TokenBucket,
+)
+from ig_bot.scraping import (
+    followed_account_pages,
+    followed_accounts,
+    MaxRateLimitingRetriesExceeded,
+)
+
+EXAMPLE_CONFIG_PATH = path.join(path.dirname(__file__), '..', '..',
+                                'example_config.yaml')
+
+
+def example_rate_limits_config() -> dict:
+    """The commented-out rate_limits section of the example config."""
+    with open(EXAMPLE_CONFIG_PATH) as file_obj:
+        lines = file_obj.read().split('\n')
+    start = lines.index('# rate_limits:')
+    end = next(index for index in range(start, len(lines))
+               if not lines[index].startswith('#'))
+    return yaml.safe_load('\n'.join(line[2:] for line in lines[start:end]))
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, duration):
+        self.now += duration
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def rate_limits_config():
+    return {
+        'default': {'rate': 2, 'capacity': 2},
+        'endpoints': {'followed_accounts': {'rate': 0.5, 'capacity': 1}},
+        'backoff': {'decrease_factor': 0.5, 'increase': 0.1, 'min_rate': 0.1},
+    }
+
+
+def test_token_bucket_allows_burst_then_paces(clock):
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+
+    delays = [bucket.reserve() for _ in range(5)]
+
+    assert delays == [0, 0, 0, 0.5, 1.0]
+
+
+def test_token_bucket_refills_over_time(clock):
+    bucket = TokenBucket(rate=1, capacity=2, clock=clock)
+    bucket.reserve()
+    bucket.reserve()
+
+    clock.now += 1.5
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.5)
+
+
+def test_adaptive_bucket_backs_off_and_recovers(clock):
+    bucket = AdaptiveTokenBucket(rate=1, capacity=1, increase=0.25,
+                                 min_rate=0.3, clock=clock)
+
+    bucket.record_rate_limited()
+    assert bucket.rate == 0.5
+    bucket.record_rate_limited()
+    assert bucket.rate == 0.3
+
+    for _ in range(5):
+        bucket.record_success()
+    assert bucket.rate == 1
+
+
+def test_rate_limiter_has_bucket_per_credential_and_endpoint(
+    clock, rate_limits_config
+):
+    rate_limiter = RateLimiter(rate_limits_config, clock=clock)
+
+    followed = rate_limiter.bucket('foo', 'followed_accounts')
+    other = rate_limiter.bucket('foo', 'account_by_id')
+
+    assert followed is rate_limiter.bucket('foo', 'followed_accounts')
+    assert followed is not rate_limiter.bucket('bar', 'followed_accounts')
+    assert (followed.rate, followed.capacity) == (0.5, 1)
+    assert (other.rate, other.capacity) == (2, 2)
+
+
+def test_rate_limiter_acquire_sleeps_for_reserved_delay(
+    clock, rate_limits_config
+):
+    rate_limiter = RateLimiter(rate_limits_config, clock=clock,
+                               sleep=clock.sleep)
+    limiter = rate_limiter.for_credential('foo')
+
+    for _ in range(3):
+        limiter.acquire('followed_accounts', mock.Mock())
+
+    assert clock.now == 4
+
+
+def test_followed_accounts_paced_by_rate_limiter(clock, rate_limits_config):
+    accounts = [AccountFactory(identifier='1'), AccountFactory(identifier='2')]
+    client = FakeClient(accounts, {'1': ['2']}, failures=2)
+    rate_limiter = RateLimiter(rate_limits_config, clock=clock,
+                               sleep=clock.sleep).for_credential('foo')
+    config = {'rate_limit_retries': 3, 'max_followed_scraped': 999}
+
+    with mock.patch('ig_bot.scraping.exponential_sleep') as mock_sleep:
+        result = followed_accounts(accounts[0],
+                                   client,
+                                   config=config,
+                                   logger=mock.Mock(),
+                                   rate_limiter=rate_limiter)
+
+    assert [account.identifier for account in result] == ['2']
+    mock_sleep.assert_not_called()
+    bucket = rate_limiter.rate_limiter.bucket('foo', 'followed_accounts')
+    assert (bucket.rate_limited, bucket.successes) == (2, 1)
+    # One token immediately, then waits of 4s and 8s at the halved rates
+    assert clock.now == pytest.approx(12)
+
+
+def test_crawl_pages_paced_by_example_config_endpoint(clock):
+    example_config = example_rate_limits_config()
+    accounts = [AccountFactory(identifier='1'), AccountFactory(identifier='2')]
+    client = FakeClient(accounts, {'1': ['2']})
+    rate_limiter = RateLimiter(example_config['rate_limits'],
+                               clock=clock,
+                               sleep=clock.sleep).for_credential('foo')
+    config = {'rate_limit_retries': 3,
+              'max_followed_scraped': 999,
+              'follows_page_size': 10}
+
+    list(followed_account_pages(accounts[0],
+                                client,
+                                config=config,
+                                logger=mock.Mock(),
+                                rate_limiter=rate_limiter))
+
+    endpoint, = {endpoint for _, endpoint in
+                 rate_limiter.rate_limiter._buckets}
+    assert endpoint in example_config['rate_limits']['endpoints']
+
+
+def test_followed_accounts_gives_up_with_rate_limiter(clock, rate_limits_config):
+    accounts = [AccountFactory(identifier='1')]
+    client = FakeClient(accounts, failures=5)
+    rate_limiter = RateLimiter(rate_limits_config, clock=clock,
+                               sleep=clock.sleep).for_credential('foo')
+
+    with pytest.raises(MaxRateLimitingRetriesExceeded):
+        followed_accounts(accounts[0],
+                          client,
+                          config={'rate_limit_retries': 3,
+                                  'max_followed_scraped': 999},
+                          logger=mock.Mock(),
+                          rate_limiter=rate_limiter)
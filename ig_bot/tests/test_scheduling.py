@@ -0,0 +1,86 @@
+import logging
+import threading
+import time
+from unittest import mock
+
+from ig_bot.scheduling import run_sharded, shards
+
+
+def test_shards_deals_items_round_robin():
+    assert [list(shard) for shard in shards('abcde', 2)] == [
+        [('a', 0), ('c', 0), ('e', 0)],
+        [('b', 0), ('d', 0)],
+    ]
+
+
+def test_run_sharded_processes_every_item_once():
+    processed = []
+    lock = threading.Lock()
+
+    def worker(item):
+        with lock:
+            processed.append(item)
+
+    dead_letters = run_sharded(range(20), [worker] * 3, logging.getLogger())
+
+    assert dead_letters == []
+    assert sorted(processed) == list(range(20))
+
+
+def test_run_sharded_retries_then_dead_letters_failing_items():
+    attempts = {}
+    error = ValueError('bad account')
+
+    def worker(item):
+        attempts[item] = attempts.get(item, 0) + 1
+        if item == 'bad' or (item == 'flaky' and attempts[item] == 1):
+            raise error
+
+    dead_letters = run_sharded(['bad', 'flaky', 'good'], [worker],
+                               logging.getLogger(), max_attempts=3)
+
+    assert dead_letters == [('bad', 3, error)]
+    assert attempts == {'bad': 3, 'flaky': 2, 'good': 1}
+
+
+def test_run_sharded_retries_failures_behind_untried_items():
+    order = []
+
+    def worker(item):
+        order.append(item)
+        if item == 'bad':
+            raise ValueError()
+
+    run_sharded(['bad', 'a', 'b'], [worker], logging.getLogger(),
+                max_attempts=2)
+
+    assert order == ['bad', 'a', 'b', 'bad']
+
+
+def test_run_sharded_backs_off_by_consecutive_failures_per_worker():
+    backoff = mock.Mock()
+
+    def worker(item):
+        if item != 'good':
+            raise ValueError()
+
+    run_sharded(['bad', 'worse', 'good'], [worker], logging.getLogger(),
+                max_attempts=1, backoff=backoff)
+
+    assert backoff.call_args_list == [mock.call(0, 1), mock.call(0, 2)]
+
+
+def test_run_sharded_idle_workers_take_from_other_shards():
+    workers_by_item = {}
+
+    def worker(index):
+        def process(item):
+            workers_by_item[item] = index
+            # The first worker is stuck on its first item
+            if index == 0:
+                time.sleep(0.2)
+        return process
+
+    run_sharded(range(10), [worker(0), worker(1)], logging.getLogger())
+
+    assert list(workers_by_item.values()).count(0) == 1
@@ -4,10 +4,12 @@ from igramscraper.exception import InstagramException
 import pytest
 
 from ig_bot.factories import AccountFactory
+from ig_bot.fakes import FakeClient
 from ig_bot.scraping import (
     account_by_id,
     account_by_username,
     exponential_sleep,
+    followed_account_pages,
     followed_accounts,
     MaxRateLimitingRetriesExceeded,
 )
@@ -202,3 +204,62 @@ def test_account_by_username_retries_on_rate_limiting(mock_exponential_sleep,
     assert mock_logger.exception.call_count == 5
 
 
+
+
+@pytest.fixture
+def paged_client():
+    accounts = [AccountFactory(identifier=str(i)) for i in range(8)]
+    following = {'0': [str(i) for i in range(1, 8)]}
+    return accounts, FakeClient(accounts, following)
+
+
+def test_followed_account_pages_yields_pages_with_cursors(paged_client):
+    accounts, client = paged_client
+    config = {'rate_limit_retries': 1,
+              'max_followed_scraped': 999,
+              'follows_page_size': 3}
+
+    pages = list(followed_account_pages(accounts[0],
+                                        client,
+                                        config=config,
+                                        logger=mock.Mock()))
+
+    assert [[a.identifier for a in page.accounts] for page in pages] == [
+        ['1', '2', '3'], ['4', '5', '6'], ['7'],
+    ]
+    assert [page.end_cursor for page in pages] == ['3', '6', '']
+
+
+def test_followed_account_pages_fetched_lazily(paged_client):
+    accounts, client = paged_client
+    config = {'rate_limit_retries': 1,
+              'max_followed_scraped': 999,
+              'follows_page_size': 3}
+
+    pages = followed_account_pages(accounts[0],
+                                   client,
+                                   config=config,
+                                   logger=mock.Mock())
+    next(pages)
+
+    assert len(client.calls) == 1
+
+
+def test_followed_account_pages_resumes_from_cursor(paged_client):
+    accounts, client = paged_client
+    config = {'rate_limit_retries': 1,
+              'max_followed_scraped': 5,
+              'follows_page_size': 3}
+
+    pages = list(followed_account_pages(accounts[0],
+                                        client,
+                                        config=config,
+                                        logger=mock.Mock(),
+                                        end_cursor='3',
+                                        scraped=3))
+
+    assert [[a.identifier for a in page.accounts] for page in pages] == [
+        ['4', '5'],
+    ]
+    assert pages[0].end_cursor == ''
+    assert client.calls == [('user_following_gql_chunk', '0', 3, '3')]
@@ -0,0 +1,76 @@
+import glob
+import json
+from os import path
+
+import pytest
+
+from ig_bot.shared_data import scan_shared_data, shared_data_from_bytes
+
+
+POST_PAGES = sorted(glob.glob(
+    path.join(path.dirname(__file__), 'data', 'post_pages', '*.html')
+))
+
+
+def read_page(filepath):
+    with open(filepath, 'rb') as file_obj:
+        return file_obj.read()
+
+
+def parsed_shared_data(content):
+    """The shared data as found by the BeautifulSoup-based scraper."""
+    bs4 = pytest.importorskip('bs4')
+    html = bs4.BeautifulSoup(content.decode('utf-8'), features='html.parser')
+    for script in html.find_all('script'):
+        for line in script.contents:
+            if 'window._sharedData = ' in line:
+                return json.loads(line[20:-1])
+
+
+@pytest.mark.parametrize('filepath', POST_PAGES)
+def test_shared_data_from_bytes_matches_parsed_page(filepath):
+    content = read_page(filepath)
+
+    data = shared_data_from_bytes(content)
+
+    assert data['entry_data']['PostPage'][0]['graphql']['shortcode_media']
+    assert data == parsed_shared_data(content)
+
+
+@pytest.mark.parametrize('chunk_size', (1, 7, 1024))
+def test_scan_shared_data_stops_after_script(chunk_size):
+    content = read_page(POST_PAGES[0])
+    chunks = iter([content[i:i + chunk_size]
+                   for i in range(0, len(content), chunk_size)])
+
+    data, read = scan_shared_data(chunks)
+
+    assert data == shared_data_from_bytes(content)
+    assert content.startswith(read)
+    assert read.rfind(b'</script>') > read.find(b'window._sharedData = ')
+    assert len(read) < len(content)
+    assert read + b''.join(chunks) == content
+
+
+def test_scan_shared_data_reads_whole_page_without_assignment():
+    content = b'<html><script>window.other = {"a": 1};</script></html>'
+
+    data, read = scan_shared_data(iter([content[:20], content[20:]]))
+
+    assert data is None
+    assert read == content
+
+
+@pytest.mark.parametrize('content', (
+    b'<script>window._sharedData = {"a": ;</script>',
+    b'<script>window._sharedData = [1, 2];</script>',
+    b'<script>window._sharedData = {"a": 1',
+))
+def test_shared_data_from_bytes_rejects_malformed_data(content):
+    assert shared_data_from_bytes(content) is None
+
+
+def test_shared_data_from_bytes_decodes_unterminated_script():
+    assert shared_data_from_bytes(
+        b'<script>window._sharedData = {"a": "\xc3\xa9"};'
+    ) == {'a': 'é'}
@@ -0,0 +1,89 @@
+from os import path
+import tempfile
+
+import networkx as nx
+import pytest
+
+from ig_bot.snapshot import (
+    GraphSnapshot,
+    read_snapshot,
+    SnapshotFormatError,
+    write_snapshot,
+)
+
+
+TEST_GRAPH_PATH = path.join(path.dirname(__file__), 'three_accounts.gml')
+
+
+@pytest.fixture
+def snapshot_path():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield path.join(temp_dir, 'graph.igb')
+
+
+@pytest.fixture
+def attributed_graph():
+    graph = nx.DiGraph(root='1')
+    graph.add_node('1', username='one', fullName='Ünïcode Öne',
+                   followedByCount=10, isPrivate=False, score=0.5)
+    graph.add_node('2', username='two', followedByCount=3, score=1)
+    graph.add_node('3', username='three', isPrivate=True)
+    graph.add_edges_from([('1', '2'), ('1', '3'), ('3', '1'), ('2', '3')])
+    return graph
+
+
+def assert_graphs_equal(graph, expected):
+    assert list(graph) == list(expected)
+    assert dict(graph.nodes(data=True)) == dict(expected.nodes(data=True))
+    assert set(graph.edges) == set(expected.edges)
+    assert graph.graph == expected.graph
+
+
+def test_snapshot_round_trips_gml_graph(snapshot_path):
+    graph = nx.read_gml(TEST_GRAPH_PATH)
+
+    write_snapshot(graph, snapshot_path)
+
+    assert_graphs_equal(read_snapshot(snapshot_path), graph)
+
+
+def test_snapshot_round_trips_typed_and_missing_attributes(
+    snapshot_path, attributed_graph
+):
+    write_snapshot(attributed_graph, snapshot_path)
+    result = read_snapshot(snapshot_path)
+
+    assert_graphs_equal(result, attributed_graph)
+    assert isinstance(result.nodes['2']['score'], float)
+    assert result.nodes['3']['isPrivate'] is True
+
+
+def test_snapshot_exposes_memory_mapped_csr_arrays(
+    snapshot_path, attributed_graph
+):
+    write_snapshot(attributed_graph, snapshot_path)
+    snapshot = GraphSnapshot(snapshot_path)
+
+    assert len(snapshot) == 3
+    assert snapshot.indptr.tolist() == [0, 2, 3, 4]
+    assert snapshot.indices.tolist() == [1, 2, 2, 0]
+    assert snapshot.node_attribute('followedByCount') == [10, 3, None]
+
+
+def test_snapshot_of_empty_graph(snapshot_path):
+    write_snapshot(nx.DiGraph(), snapshot_path)
+
+    assert len(read_snapshot(snapshot_path)) == 0
+
+
+def test_read_snapshot_rejects_other_files(snapshot_path):
+    with open(snapshot_path, 'wb') as file_obj:
+        file_obj.write(b'graph [\n  directed 1\n]\n')
+
+    with pytest.raises(SnapshotFormatError):
+        read_snapshot(snapshot_path)
+
+
+def test_write_snapshot_rejects_non_string_node_keys(snapshot_path):
+    with pytest.raises(TypeError):
+        write_snapshot(nx.DiGraph([(1, 2)]), snapshot_path)
@@ -0,0 +1,89 @@
+import inspect
+
+import networkx as nx
+import pytest
+
+from ig_bot import sparse
+from ig_bot.graph import (
+    centrality_function,
+    EIGENVECTOR_CENTRALITY,
+    IN_DEGREE_CENTRALITY,
+    KATZ_CENTRALITY,
+    PAGERANK_CENTRALITY,
+    PARALLEL_ALGORITHMS,
+    PARALLEL_BACKEND,
+    SPARSE_BACKEND,
+    SPARSE_CENTRALITY_METRIC_FUNCTIONS,
+)
+
+
+@pytest.fixture
+def follow_graph():
+    graph = nx.gnp_random_graph(200, 0.03, seed=11, directed=True)
+    return nx.relabel_nodes(graph, {n: str(n) for n in graph})
+
+
+def assert_centrality_equal(result, expected):
+    assert result.keys() == expected.keys()
+    for node, value in expected.items():
+        assert result[node] == pytest.approx(value, abs=1e-5)
+
+
+@pytest.mark.parametrize('centrality_algorithm', [
+    IN_DEGREE_CENTRALITY,
+    EIGENVECTOR_CENTRALITY,
+    PAGERANK_CENTRALITY,
+    KATZ_CENTRALITY,
+])
+def test_sparse_backend_matches_networkx(follow_graph, centrality_algorithm):
+    result = centrality_function(centrality_algorithm,
+                                 SPARSE_BACKEND)(follow_graph)
+    expected = centrality_function(centrality_algorithm)(follow_graph)
+
+    assert_centrality_equal(result, expected)
+
+
+@pytest.mark.parametrize('centrality_algorithm', [
+    EIGENVECTOR_CENTRALITY,
+    PAGERANK_CENTRALITY,
+    KATZ_CENTRALITY,
+])
+def test_parallel_backend_matches_networkx(follow_graph, centrality_algorithm):
+    result = centrality_function(centrality_algorithm,
+                                 PARALLEL_BACKEND,
+                                 workers=2)(follow_graph)
+    expected = centrality_function(centrality_algorithm)(follow_graph)
+
+    assert_centrality_equal(result, expected)
+
+
+@pytest.mark.parametrize('centrality_algorithm',
+                         sorted(SPARSE_CENTRALITY_METRIC_FUNCTIONS))
+def test_parallel_algorithms_take_workers(centrality_algorithm):
+    function = SPARSE_CENTRALITY_METRIC_FUNCTIONS[centrality_algorithm]
+    takes_workers = 'workers' in inspect.signature(function).parameters
+
+    assert takes_workers == (centrality_algorithm in PARALLEL_ALGORITHMS)
+
+
+def test_pagerank_with_personalization_matches_networkx(follow_graph):
+    personalization = {'0': 1, '1': 3}
+
+    result = sparse.pagerank(follow_graph, personalization=personalization)
+    expected = nx.pagerank(follow_graph, personalization=personalization)
+
+    assert_centrality_equal(result, expected)
+
+
+def test_adjacency_matrix_reused_across_algorithms(follow_graph):
+    adjacency_matrix = sparse.AdjacencyMatrix.from_graph(follow_graph)
+
+    assert_centrality_equal(sparse.eigenvector_centrality(adjacency_matrix),
+                            nx.eigenvector_centrality(follow_graph))
+    assert_centrality_equal(sparse.in_degree_centrality(adjacency_matrix),
+                            nx.in_degree_centrality(follow_graph))
+
+
+def test_eigenvector_centrality_raises_when_not_converged(follow_graph):
+    with pytest.raises(nx.PowerIterationFailedConvergence):
+        sparse.eigenvector_centrality(follow_graph, max_iter=1)
@@ -0,0 +1,153 @@
+from datetime import datetime
+from os import path
+import tempfile
+
+import pytest
+
+from ig_bot.data import Account
+from ig_bot.frontier import Frontier
+from ig_bot.state import _TOP_CANDIDATE_SQL, CrawlDatabase
+
+
+DATE_SCRAPED = datetime(year=2020, month=10, day=4, hour=18, minute=8)
+
+
+def _account(identifier, centrality=None, date_scraped=None):
+    return Account(identifier=identifier,
+                   username=f'user{identifier}',
+                   full_name=f'User {identifier}',
+                   centrality=centrality,
+                   date_scraped=date_scraped)
+
+
+@pytest.fixture
+def database_path():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield path.join(temp_dir, 'crawl.sqlite')
+
+
+@pytest.fixture
+def database(database_path):
+    with CrawlDatabase(database_path) as database:
+        yield database
+
+
+def test_add_follows_builds_graph(database):
+    database.add_follows(_account('1'), [_account('2'), _account('3')])
+    database.add_follows(_account('2'), [_account('3')])
+
+    graph = database.graph()
+
+    assert set(graph.edges) == {('1', '2'), ('1', '3'), ('2', '3')}
+    assert graph.nodes['3'] == {'identifier': '3',
+                                'username': 'user3',
+                                'fullName': 'User 3'}
+
+
+def test_graph_has_root(database, database_path):
+    database.add_follows(_account('2'), [_account('3')])
+    assert 'root' not in database.graph().graph
+
+    database.set_root(_account('1'))
+    graph = database.graph()
+
+    assert graph.graph == {'root': '1'}
+    assert graph.nodes['1']['username'] == 'user1'
+
+    with CrawlDatabase(path.join(path.dirname(database_path),
+                                 'copy.sqlite')) as copy:
+        copy.replace_graph(graph)
+        assert copy.graph().graph == {'root': '1'}
+
+
+def test_add_follows_updates_renamed_accounts(database):
+    database.add_nodes([_account('1')])
+    database.add_follows(_account('1'), [_account('2')])
+    renamed = Account(identifier='2', username='two', full_name='Two')
+
+    database.add_follows(_account('1'), [renamed])
+    database.add_nodes([Account(identifier='1', username='one',
+                                full_name='User 1')])
+
+    graph = database.graph()
+    assert list(graph.nodes) == ['1', '2']
+    assert graph.nodes['1'] == {'identifier': '1',
+                                'username': 'one',
+                                'fullName': 'User 1'}
+    assert graph.nodes['2'] == {'identifier': '2',
+                                'username': 'two',
+                                'fullName': 'Two'}
+
+
+def test_follow_cursor_saved_with_page_and_cleared_once_scraped(database):
+    database.add_follows(_account('1'), [_account('2')], 'cursor', 1)
+
+    assert database.follow_cursor('1') == ('cursor', 1)
+
+    database.upsert_accounts([_account('1', 0.5, DATE_SCRAPED)])
+
+    assert database.follow_cursor('1') == (None, 0)
+
+
+def test_upsert_accounts_round_trips(database):
+    database.upsert_accounts([_account('1', 0.5), _account('2', None)])
+    database.upsert_accounts([_account('1', 0.25, DATE_SCRAPED)])
+
+    assert database.accounts().to_accounts() == [
+        _account('1', 0.25, DATE_SCRAPED),
+        _account('2', None),
+    ]
+
+
+def test_top_scraping_candidate_matches_frontier(database):
+    accounts = [
+        _account('1', 0.5, DATE_SCRAPED),
+        _account('2', 0.25),
+        _account('3', 0.25),
+        _account('4', 0.75, DATE_SCRAPED),
+        _account('5', None),
+    ]
+    database.upsert_accounts(accounts)
+    frontier = Frontier(accounts)
+
+    for rank in range(1, 6):
+        assert (
+            database.top_scraping_candidate(rank)
+            == frontier.top_candidate(rank)
+        )
+
+    database.upsert_accounts([_account('2', 0.25, DATE_SCRAPED),
+                              _account('3', 0.25, DATE_SCRAPED)])
+    frontier.mark_scraped('2', DATE_SCRAPED)
+    frontier.mark_scraped('3', DATE_SCRAPED)
+
+    for rank in range(1, 6):
+        assert (
+            database.top_scraping_candidate(rank)
+            == frontier.top_candidate(rank)
+        )
+
+
+def test_top_scraping_candidate_uses_index(database):
+    plan = str(database._query(f'EXPLAIN QUERY PLAN {_TOP_CANDIDATE_SQL}'))
+
+    assert 'accounts_unscraped_centrality' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_read_only_connection_sees_committed_writes(database, database_path):
+    database.add_follows(_account('1'), [_account('2')])
+
+    with CrawlDatabase(database_path, read_only=True) as reader:
+        assert set(reader.graph().edges) == {('1', '2')}
+
+
+def test_transaction_rolls_back_on_error(database):
+    with pytest.raises(RuntimeError):
+        with database.transaction() as connection:
+            connection.execute(
+                "INSERT INTO nodes VALUES ('1', 'one', 'One')"
+            )
+            raise RuntimeError
+
+    assert database.graph().number_of_nodes() == 0